@@ -0,0 +1,56 @@
+"""
+Seeded synthetic inputs for the benchmarks: intersections, query points
+and weather shaped like the real data, at any size.
+"""
+
+import numpy as np
+
+# NYC bounding box, same as src.preprocessing.nyc_grid.NYC_BOUNDS
+SOUTH, NORTH = 40.49612, 40.91553
+WEST, EAST = -74.25909, -73.70018
+
+BOROUGHS = ("Bronx", "Brooklyn", "Manhattan", "Queens", "Staten Island")
+
+# Row counts every case is measured at by default
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+
+def synthetic_points(n: int, seed: int = 0):
+    """(lats, lons) float64 arrays of n points spread uniformly over the NYC bounding box"""
+    rng = np.random.default_rng(seed)
+    return rng.uniform(SOUTH, NORTH, n), rng.uniform(WEST, EAST, n)
+
+
+def synthetic_intersections(n: int, seed: int = 1):
+    """
+    Columns of a synthetic intersection table.
+
+    Returns:
+        Tuple of (ids, lats, lons, borough names)
+    """
+    rng = np.random.default_rng(seed)
+    lats, lons = synthetic_points(n, seed)
+    ids = rng.permutation(np.arange(1, n + 1, dtype=np.int64))
+    boroughs = np.array(BOROUGHS)[rng.integers(0, len(BOROUGHS), n)]
+    return ids, lats, lons, boroughs
+
+
+def synthetic_weather(seed: int = 2):
+    """Borough -> weather dict, the format the prediction functions take"""
+    rng = np.random.default_rng(seed)
+    return {
+        borough: {
+            "tavg": float(rng.uniform(20, 90)),
+            "prcp": float(rng.uniform(0, 1)),
+            "snow": float(rng.uniform(0, 2)),
+            "wdir": float(rng.uniform(0, 360)),
+            "wspd": float(rng.uniform(0, 30)),
+            "pres": float(rng.uniform(990, 1030)),
+        }
+        for borough in BOROUGHS
+    }
+
+
+def grid_resolution_for(n: int) -> float:
+    """Grid spacing (degrees) at which generate_nyc_grid yields about n points"""
+    return float(np.sqrt((NORTH - SOUTH) * (EAST - WEST) / n))
@@ -0,0 +1,115 @@
+"""
+Import-time report for the API entry points.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters,
+parses the per-module timings and fails if the import is over budget or
+pulls in any of the heavy modules that must stay lazy.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module src.api.endpoints --budget-ms 1500 --output results.json
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import subprocess
+from typing import Dict, List
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+# Imported on first use only; importing the API must not load them
+FORBIDDEN_MODULES = ("pandas", "xgboost", "sklearn", "scipy", "joblib", "geopy")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Rows of {module, self_us, cumulative_us, depth} from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append({
+                "module": module,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(indent) - 1) // 2,
+            })
+    return rows
+
+
+def measure(module: str) -> List[Dict]:
+    """Import `module` once in a fresh interpreter and return the parsed timings"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def report(module: str, runs: int = 3, top: int = 15) -> Dict:
+    """Best-of-`runs` import time of `module`, its slowest imports and any forbidden modules it loads"""
+    best = None
+    for _ in range(runs):
+        rows = measure(module)
+        total = next(r["cumulative_us"] for r in rows if r["module"] == module)
+        if best is None or total < best[0]:
+            best = (total, rows)
+    total, rows = best
+
+    loaded = {r["module"] for r in rows}
+    return {
+        "module": module,
+        "python": sys.version.split()[0],
+        "runs": runs,
+        "total_ms": total / 1000,
+        "modules_imported": len(rows),
+        "forbidden_loaded": sorted(m for m in FORBIDDEN_MODULES if m in loaded),
+        "slowest_self": [
+            {"module": r["module"], "self_ms": r["self_us"] / 1000}
+            for r in sorted(rows, key=lambda r: r["self_us"], reverse=True)[:top]
+        ],
+        "slowest_direct_imports": [
+            {"module": r["module"], "cumulative_ms": r["cumulative_us"] / 1000}
+            for r in sorted((r for r in rows if r["depth"] == 1), key=lambda r: r["cumulative_us"], reverse=True)[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="src.api.main")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=None, help="fail if the import takes longer")
+    parser.add_argument("--output", default=None, help="write the report as JSON")
+    args = parser.parse_args()
+
+    result = report(args.module, runs=args.runs)
+    print(f"import {result['module']}: {result['total_ms']:.0f} ms, {result['modules_imported']} modules")
+    for row in result["slowest_direct_imports"][:10]:
+        print(f"  {row['cumulative_ms']:8.1f} ms  {row['module']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    failed = False
+    if result["forbidden_loaded"]:
+        print(f"FAIL: import pulled in {', '.join(result['forbidden_loaded'])}")
+        failed = True
+    if args.budget_ms is not None and result["total_ms"] > args.budget_ms:
+        print(f"FAIL: {result['total_ms']:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
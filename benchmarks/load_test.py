@@ -0,0 +1,194 @@
+"""
+End-to-end load test of the API against a local Open-Meteo stand-in.
+
+Starts src/api/fake_open_meteo.py and the FastAPI app under uvicorn (with
+OPEN_METEO_URL pointing at the fake), sends requests at a fixed rate for a
+while and reports latency percentiles, throughput and errors.
+
+Requests are sent open-loop: request i goes out at start + i / rps whether
+or not earlier ones have finished, and latency is measured from that
+scheduled time, so a saturated server shows up as growing latency instead
+of silently lowering the request rate.
+
+    python benchmarks/load_test.py --rps 50 --duration 30
+    python benchmarks/load_test.py --rps 200 --workers 4 --fake-latency-ms 80 --fake-error-rate 0.05 --output load.json
+    python benchmarks/load_test.py --base-url http://127.0.0.1:8000 --rps 20   # an already running server
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+@contextmanager
+def process(args: List[str], env: Dict[str, str], health_url: str, timeout: float = 120.0):
+    """Run `args` in the background until the block exits, once `health_url` answers"""
+    proc = subprocess.Popen(args, cwd=REPO_ROOT, env={**os.environ, "PYTHONPATH": REPO_ROOT, **env})
+    try:
+        wait_until_up(health_url, timeout)
+        yield proc
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, body, scheduled: float, results: list):
+    sent = time.perf_counter()
+    try:
+        response = await client.request(method, url, json=body)
+        outcome = str(response.status_code)
+        ok = response.status_code < 400
+    except httpx.HTTPError as e:
+        outcome = type(e).__name__
+        ok = False
+    done = time.perf_counter()
+    results.append((done - scheduled, done - sent, outcome, ok))
+
+
+async def generate_load(url: str, method: str, body, rps: float, duration: float, max_in_flight: int, timeout: float) -> Dict:
+    """Send requests at `rps` for `duration` seconds and summarize them"""
+    results: list = []
+    n_requests = int(rps * duration)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    async with httpx.AsyncClient(limits=limits, timeout=timeout) as client:
+        tasks = []
+        start = time.perf_counter()
+        for i in range(n_requests):
+            scheduled = start + i / rps
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(_send(client, method, url, body, scheduled, results)))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - start
+    return summarize(results, elapsed, rps)
+
+
+def summarize(results: list, elapsed: float, target_rps: float) -> Dict:
+    latency = np.array([r[0] for r in results]) * 1000
+    service = np.array([r[1] for r in results]) * 1000
+    outcomes: Dict[str, int] = {}
+    for _, _, outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    succeeded = sum(1 for r in results if r[3])
+
+    def percentiles(values: np.ndarray) -> Dict[str, Optional[float]]:
+        if len(values) == 0:
+            return {"p50": None, "p95": None, "p99": None, "max": None}
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        return {"p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(values.max())}
+
+    return {
+        "requests": len(results),
+        "succeeded": succeeded,
+        "errors": len(results) - succeeded,
+        "outcomes": outcomes,
+        "elapsed_s": elapsed,
+        "target_rps": target_rps,
+        "throughput_rps": succeeded / elapsed if elapsed > 0 else 0.0,
+        # from the scheduled send time (includes client-side queueing)
+        "latency_ms": percentiles(latency),
+        # from the actual send time
+        "service_time_ms": percentiles(service),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rps", type=float, default=20.0, help="target requests per second")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds of load")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of load before measuring")
+    parser.add_argument("--path", default="/api/accident-prediction")
+    parser.add_argument("--method", default="POST")
+    parser.add_argument("--body", default=None, help='JSON body (default: {"date": <now>})')
+    parser.add_argument("--max-in-flight", type=int, default=512, help="client connection limit")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--base-url", default=None, help="load an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--fake-latency-ms", type=float, default=50.0)
+    parser.add_argument("--fake-jitter-ms", type=float, default=20.0)
+    parser.add_argument("--fake-error-rate", type=float, default=0.0)
+    parser.add_argument("--fake-error-status", type=int, default=503)
+    parser.add_argument("--output", default=None, help="write the report as JSON")
+    args = parser.parse_args()
+
+    body = json.loads(args.body) if args.body else {"date": datetime.now().strftime("%Y-%m-%dT%H:00:00")}
+    if args.method.upper() == "GET":
+        body = None
+
+    def run(base_url: str) -> Dict:
+        url = base_url.rstrip("/") + args.path
+        if args.warmup > 0:
+            asyncio.run(generate_load(url, args.method, body, args.rps, args.warmup, args.max_in_flight, args.timeout))
+        return asyncio.run(generate_load(url, args.method, body, args.rps, args.duration, args.max_in_flight, args.timeout))
+
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "body")}
+    if args.base_url:
+        report = run(args.base_url)
+    else:
+        fake_port, api_port = free_port(), free_port()
+        fake_args = [
+            sys.executable, "-m", "src.api.fake_open_meteo", "--port", str(fake_port),
+            "--latency-ms", str(args.fake_latency_ms), "--jitter-ms", str(args.fake_jitter_ms),
+            "--error-rate", str(args.fake_error_rate), "--error-status", str(args.fake_error_status),
+        ]
+        api_args = [
+            sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(api_port),
+            "--workers", str(args.workers), "--log-level", "warning",
+        ]
+        api_env = {"OPEN_METEO_URL": f"http://127.0.0.1:{fake_port}/v1/forecast"}
+        with process(fake_args, {}, f"http://127.0.0.1:{fake_port}/health"):
+            with process(api_args, api_env, f"http://127.0.0.1:{api_port}/api/health"):
+                report = run(f"http://127.0.0.1:{api_port}")
+                fake_stats = httpx.get(f"http://127.0.0.1:{fake_port}/stats").json()
+        report["upstream"] = fake_stats
+
+    report["config"] = config
+    latency, service = report["latency_ms"], report["service_time_ms"]
+    print(f"{report['requests']} requests in {report['elapsed_s']:.1f}s at {args.rps:g} rps target: "
+          f"{report['throughput_rps']:.1f} rps succeeded, {report['errors']} errors {report['outcomes']}")
+    if latency["p50"] is not None:
+        print(f"  latency      p50 {latency['p50']:8.1f} ms  p95 {latency['p95']:8.1f} ms  p99 {latency['p99']:8.1f} ms  max {latency['max']:8.1f} ms")
+        print(f"  service time p50 {service['p50']:8.1f} ms  p95 {service['p95']:8.1f} ms  p99 {service['p99']:8.1f} ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Benchmarks for the prediction pipeline and the geo helpers.
+
+Every case runs on seeded synthetic data (benchmarks/fixtures.py) at
+1k/10k/100k/1M rows against a synthetic intersection store, and the timings
+are written as JSON so runs on different commits can be compared.
+
+    python benchmarks/pipeline.py
+    python benchmarks/pipeline.py --cases nearest_intersection,assign_boroughs --sizes 1000,100000
+    python benchmarks/pipeline.py --compare benchmarks/results/pipeline-abc1234.json --max-regression 1.2
+"""
+
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fixtures import SIZES, grid_resolution_for, synthetic_intersections, synthetic_points, synthetic_weather
+
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+# Intersections in the synthetic store the lookups run against (NYC has ~50k)
+DEFAULT_INTERSECTIONS = 50_000
+# Timestamp every prediction case scores
+DATE = "2025-05-06T17:00:00"
+
+# name -> setup(n) returning (callable to time, rows it processes)
+CASES: Dict[str, Callable[[int], tuple]] = {}
+
+
+def case(name: str):
+    def register(setup):
+        CASES[name] = setup
+        return setup
+    return register
+
+
+@case("predict_accident_probabilities")
+def _predict_accident_probabilities(n):
+    import pandas as pd
+    from src.modeling.inference import predict_accident_probabilities
+
+    _, lats, lons, boroughs = synthetic_intersections(n, seed=10)
+    grid_df = pd.DataFrame({"lat": lats, "lon": lons, "borough": boroughs})
+    weather = synthetic_weather()
+    return lambda: predict_accident_probabilities(grid_df, DATE, weather), n
+
+
+@case("predict_accident_arrays")
+def _predict_accident_arrays(n):
+    import numpy as np
+    from src.modeling.features import weather_matrix
+    from src.modeling.inference import predict_accident_arrays
+    from benchmarks.fixtures import BOROUGHS
+
+    ids, lats, lons, boroughs = synthetic_intersections(n, seed=11)
+    codes = np.searchsorted(BOROUGHS, boroughs).astype(np.int8)
+    weather = weather_matrix(synthetic_weather(), BOROUGHS)
+    return lambda: predict_accident_arrays(DATE, lats, lons, ids, codes, weather), n
+
+
+@case("nearest_intersection")
+def _nearest_intersection(n):
+    from src.preprocessing.spatial_index import get_intersection_index
+
+    index = get_intersection_index()
+    lats, lons = synthetic_points(n, seed=12)
+    return lambda: index.query(lats, lons), n
+
+
+@case("generate_nyc_grid")
+def _generate_nyc_grid(n):
+    from src.preprocessing.nyc_grid import generate_nyc_grid
+
+    resolution = grid_resolution_for(n)
+    rows = len(generate_nyc_grid(resolution))
+    return lambda: generate_nyc_grid(resolution), rows
+
+
+@case("assign_boroughs")
+def _assign_boroughs(n):
+    from src.preprocessing.nyc_grid import assign_boroughs
+
+    lats, lons = synthetic_points(n, seed=13)
+    return lambda: assign_boroughs(lats, lons), n
+
+
+def _prediction_columns(n):
+    import numpy as np
+    from src.api.encoding import PredictionColumns
+    from benchmarks.fixtures import BOROUGHS
+
+    lats, lons = synthetic_points(n, seed=14)
+    rng = np.random.default_rng(14)
+    return PredictionColumns(
+        lats.astype(np.float32), lons.astype(np.float32), rng.integers(0, len(BOROUGHS), n).astype(np.int8),
+        BOROUGHS, rng.random(n).astype(np.float32), date=DATE[:10], weather_age_seconds=12.5
+    )
+
+
+@case("serialize_json")
+def _serialize_json(n):
+    from src.api.models import AccidentPredictionResponse, CoordinatePrediction
+
+    columns = _prediction_columns(n)
+
+    def serialize():
+        # what the default endpoint path does: pydantic rows, then JSON
+        predictions = [
+            CoordinatePrediction(lat=lat, lon=lon, borough=columns.boroughs[code], probability=prob)
+            for lat, lon, code, prob in zip(
+                columns.lats.tolist(), columns.lons.tolist(), columns.borough_codes.tolist(), columns.probabilities.tolist()
+            )
+        ]
+        response = AccidentPredictionResponse(predictions=predictions, date=DATE[:10], weather_age_seconds=12.5)
+        return json.dumps(response.model_dump(mode="json"))
+
+    return serialize, n
+
+
+def _encoded_case(media_type_name: str):
+    def setup(n):
+        from src.api import encoding
+
+        columns = _prediction_columns(n)
+        media_type = getattr(encoding, media_type_name)
+        return lambda: encoding.encode_predictions(media_type, columns).body, n
+    return setup
+
+
+case("serialize_columnar_json")(_encoded_case("COLUMNAR_JSON"))
+case("serialize_msgpack")(_encoded_case("MSGPACK"))
+case("serialize_arrow")(_encoded_case("ARROW"))
+
+
+def prepare_store(n_intersections: int) -> str:
+    """
+    Write a synthetic intersection store and point the app at it. Must run
+    before anything under src/ is imported (the path is read at import).
+    """
+    directory = os.path.join(tempfile.mkdtemp(prefix="nyc-bench-"), "store")
+    os.environ["INTERSECTION_STORE_PATH"] = directory
+    from src.preprocessing.intersection_store import write_intersection_store
+
+    ids, lats, lons, boroughs = synthetic_intersections(n_intersections)
+    write_intersection_store(directory, ids=ids, lats=lats, lons=lons, boroughs=boroughs)
+    return directory
+
+
+def time_case(fn: Callable[[], object], repeats: int, max_seconds: float) -> List[float]:
+    """Wall-clock seconds of up to `repeats` calls (at least one), after one untimed warm-up call"""
+    fn()
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < repeats:
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - started > max_seconds:
+            break
+    return timings
+
+
+def run(cases: List[str], sizes: List[int], repeats: int = 5, max_seconds: float = 10.0) -> List[Dict]:
+    results = []
+    for name in cases:
+        for n in sizes:
+            try:
+                fn, rows = CASES[name](n)
+                timings = time_case(fn, repeats, max_seconds)
+            except ImportError as e:
+                # optional encoders (msgpack, pyarrow) may not be installed
+                print(f"  {name:32s} {n:>9,d}  skipped ({e})")
+                results.append({"case": name, "size": n, "skipped": str(e)})
+                continue
+            median = statistics.median(timings)
+            result = {
+                "case": name,
+                "size": n,
+                "rows": rows,
+                "repeats": len(timings),
+                "min_s": min(timings),
+                "median_s": median,
+                "mean_s": statistics.fmean(timings),
+                "stdev_s": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+                "rows_per_s": rows / median if median > 0 else None,
+            }
+            results.append(result)
+            print(f"  {name:32s} {n:>9,d}  {median * 1000:10.2f} ms  ({result['rows_per_s']:,.0f} rows/s)")
+    return results
+
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(n_intersections: int) -> Dict:
+    """What the numbers depend on: commit, interpreter, library versions, machine, model"""
+    import numpy as np
+    from src.modeling.inference import get_active_model
+
+    versions = {"numpy": np.__version__}
+    for module in ("pandas", "xgboost", "sklearn", "pydantic"):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+        "model_version": get_active_model().version,
+        "intersections": n_intersections,
+    }
+
+
+def compare(results: List[Dict], baseline: Dict, max_regression: float) -> List[Dict]:
+    """Median-time ratios against a previous run; returns the rows slower than `max_regression`x"""
+    previous = {(r["case"], r["size"]): r for r in baseline["results"] if "median_s" in r}
+    regressions = []
+    print(f"\nCompared with {baseline['environment'].get('commit')} ({baseline['environment'].get('timestamp')}):")
+    for result in results:
+        old = previous.get((result["case"], result["size"]))
+        if old is None or "median_s" not in result:
+            continue
+        ratio = result["median_s"] / old["median_s"]
+        flag = "  REGRESSION" if ratio > max_regression else ""
+        print(f"  {result['case']:32s} {result['size']:>9,d}  {old['median_s'] * 1000:10.2f} -> {result['median_s'] * 1000:10.2f} ms  x{ratio:.2f}{flag}")
+        if flag:
+            regressions.append({**result, "baseline_median_s": old["median_s"], "ratio": ratio})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cases", default=",".join(CASES), help=f"comma-separated subset of: {', '.join(CASES)}")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES), help="comma-separated row counts")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="stop repeating a case after this long")
+    parser.add_argument("--intersections", type=int, default=DEFAULT_INTERSECTIONS, help="size of the synthetic store")
+    parser.add_argument("--output", default=None, help="results JSON (default: benchmarks/results/pipeline-<commit>.json)")
+    parser.add_argument("--compare", default=None, help="previous results JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=1.2, help="fail if a median is this many times slower")
+    args = parser.parse_args()
+
+    cases = [c.strip() for c in args.cases.split(",") if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)}")
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    prepare_store(args.intersections)
+    env = environment(args.intersections)
+    print(f"Benchmarking {len(cases)} cases at sizes {sizes} on {env['commit']} (model {env['model_version']})")
+    results = run(cases, sizes, repeats=args.repeats, max_seconds=args.max_seconds)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pipeline-{env['commit'] or 'unknown'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"environment": env, "results": results}, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"FAIL: {len(regressions)} case(s) over x{args.max_regression} slower")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,11 @@
 import os
-import json
+import sys
+import argparse
 import pandas as pd
-from geopy.distance import great_circle
 
-# your five borough centroids
-BOROUGHS = {
-    "Manhattan": (40.776676, -73.971321),
-    "Brooklyn":  (40.650002, -73.949997),
-    "Queens":    (40.742054, -73.769417),
-    "Staten Island": (40.579021, -74.151535),
-    "Bronx":     (40.837048, -73.865433),
-}
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir))
+from src.preprocessing.intersection_store import STORE_PATH, write_intersection_store
+from src.preprocessing.borough_raster import lookup_borough_names
 
 # Build the path to src/data/intersections.json
 DATA_PATH = os.path.join(
@@ -19,34 +14,51 @@ DATA_PATH = os.path.join(
     "src", "data", "intersections.json"
 )
 
-# 1) Load the raw intersections
-with open(DATA_PATH, "r") as f:
-    raw = json.load(f)
-
-# 2) Enrich each point
-enriched = []
-for pt in raw:
-    # your JSON has keys 'id', 'lat', 'lon'
-    lat, lon = pt["lat"], pt["lon"]
-    # compute borough (example)
-    borough = min(
-        BOROUGHS.keys(),
-        key=lambda b: great_circle((lat, lon), BOROUGHS[b]).km
-    )
-    enriched.append({
-        "id":            pt["id"],
-        "lat":           lat,
-        "lon":           lon,
-        "nearest_borough": borough
-    })
-
-# 3) Save it back (or to a new file)
 OUT_PATH = os.path.join(
     os.path.dirname(__file__),
     os.pardir,
     "src", "data", "intersections_enriched.json"
 )
-with open(OUT_PATH, "w") as f:
-    json.dump(enriched, f, indent=2)
 
-print(f"Wrote {len(enriched)} points with boroughs to {OUT_PATH}")
\ No newline at end of file
+
+def enrich(raw: pd.DataFrame) -> pd.DataFrame:
+    """Add the borough of every intersection in one vectorized pass"""
+    return pd.DataFrame({
+        "id": raw["id"].to_numpy(),
+        "lat": raw["lat"].to_numpy(),
+        "lon": raw["lon"].to_numpy(),
+        "nearest_borough": lookup_borough_names(raw["lat"].to_numpy(), raw["lon"].to_numpy()),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign boroughs to intersections and write the binary store")
+    parser.add_argument("--input", default=DATA_PATH, help="intersections JSON (records with id, lat, lon)")
+    parser.add_argument("--store", default=str(STORE_PATH), help="output directory of the binary store")
+    parser.add_argument("--json-out", default=OUT_PATH, help="enriched JSON output ('' to skip)")
+    args = parser.parse_args()
+
+    # 1) Load the raw intersections straight into columns
+    raw = pd.read_json(args.input, orient="records", dtype={"id": "int64", "lat": "float64", "lon": "float64"})
+
+    # 2) Enrich all points at once
+    enriched = enrich(raw)
+
+    # 3) Write the binary columnar store the API memory-maps at startup
+    write_intersection_store(
+        args.store,
+        ids=enriched["id"].to_numpy(),
+        lats=enriched["lat"].to_numpy(),
+        lons=enriched["lon"].to_numpy(),
+        boroughs=enriched["nearest_borough"].to_numpy(),
+    )
+    print(f"Wrote {len(enriched)} intersections with boroughs to store {args.store}")
+
+    # 4) Keep the enriched JSON for tools that still read it
+    if args.json_out:
+        enriched.to_json(args.json_out, orient="records", indent=2)
+        print(f"Wrote {len(enriched)} points with boroughs to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
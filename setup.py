@@ -26,4 +26,10 @@ setup(
         'xgboost',
         'scikit-learn'
     ],
+    extras_require={
+        # MessagePack / Arrow IPC response encodings
+        'binary': ['msgpack', 'pyarrow'],
+        # Parquet training data (src/api/training)
+        'training': ['pyarrow'],
+    },
 )
\ No newline at end of file
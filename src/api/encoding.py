@@ -0,0 +1,126 @@
+import json
+import logging
+from typing import Optional, Sequence
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Response encodings for prediction arrays, negotiated via the Accept header.
+# MessagePack and Arrow need the optional `msgpack` / `pyarrow` packages.
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.nyc-risk.columnar+json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+
+_ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.apache.arrow.file": ARROW,
+}
+SUPPORTED = (JSON, COLUMNAR_JSON, MSGPACK, ARROW)
+
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Pick the response encoding for an Accept header.
+
+    The row-oriented JSON format stays the default for missing, wildcard or
+    unknown Accept values; otherwise the highest-q supported type wins.
+    """
+    if not accept:
+        return JSON
+
+    candidates = []
+    for i, part in enumerate(accept.split(",")):
+        media_type, *params = [p.strip() for p in part.split(";")]
+        media_type = _ALIASES.get(media_type.lower(), media_type.lower())
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0 and media_type in SUPPORTED:
+            # stable: earlier entries win ties
+            candidates.append((-q, i, media_type))
+    return min(candidates)[2] if candidates else JSON
+
+
+class PredictionColumns:
+    """Prediction results as parallel NumPy columns, ready to be encoded"""
+
+    def __init__(self, lats, lons, borough_codes, boroughs: Sequence[str], probabilities, **metadata):
+        self.lats = np.asarray(lats)
+        self.lons = np.asarray(lons)
+        self.borough_codes = np.asarray(borough_codes)
+        self.boroughs = list(boroughs)
+        self.probabilities = np.asarray(probabilities)
+        self.metadata = metadata
+
+    def borough_names(self) -> list:
+        return np.asarray(self.boroughs, dtype=object)[self.borough_codes].tolist()
+
+
+def _columnar_json(columns: PredictionColumns) -> bytes:
+    body = {
+        **columns.metadata,
+        "lat": columns.lats.tolist(),
+        "lon": columns.lons.tolist(),
+        "borough": columns.borough_names(),
+        "prob": columns.probabilities.tolist(),
+    }
+    return json.dumps(body, separators=(",", ":")).encode()
+
+
+def _msgpack(columns: PredictionColumns) -> bytes:
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=406, detail="MessagePack encoding requires the 'msgpack' package")
+    body = {
+        **columns.metadata,
+        "lat": columns.lats.tolist(),
+        "lon": columns.lons.tolist(),
+        "boroughs": columns.boroughs,
+        "borough_code": columns.borough_codes.tolist(),
+        "prob": columns.probabilities.tolist(),
+    }
+    # float32 on the wire: same precision the store and model use
+    return msgpack.packb(body, use_single_float=True)
+
+
+def _arrow(columns: PredictionColumns) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise HTTPException(status_code=406, detail="Arrow encoding requires the 'pyarrow' package")
+    table = pa.table({
+        "lat": pa.array(columns.lats, type=pa.float32()),
+        "lon": pa.array(columns.lons, type=pa.float32()),
+        # codes + categories, no per-row strings
+        "borough": pa.DictionaryArray.from_arrays(
+            pa.array(columns.borough_codes, type=pa.int8()), pa.array(columns.boroughs, type=pa.string())
+        ),
+        "prob": pa.array(columns.probabilities, type=pa.float32()),
+    })
+    table = table.replace_schema_metadata({k: json.dumps(v) for k, v in columns.metadata.items()})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+_ENCODERS = {
+    COLUMNAR_JSON: _columnar_json,
+    MSGPACK: _msgpack,
+    ARROW: _arrow,
+}
+
+
+def encode_predictions(media_type: str, columns: PredictionColumns) -> Response:
+    """Encode prediction columns in one of the non-default formats"""
+    return Response(content=_ENCODERS[media_type](columns), media_type=media_type)
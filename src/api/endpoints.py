@@ -1,28 +1,55 @@
-from fastapi import APIRouter, HTTPException
-import httpx
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 import asyncio
 import json
-import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Optional
 from .models import (
     WeatherRequest,
     WeatherResponse,
     AccidentPredictionRequest,
     AccidentPredictionResponse,
-    CoordinatePrediction
+    AccidentTimelineRequest,
+    AccidentTimelineResponse,
+    CoordinatePrediction,
+    ViewportResponse,
+    ModelInfoResponse,
+    ModelReloadRequest
 )
-from src.preprocessing.nyc_grid import get_nyc_grid
-from src.modeling.inference import predict_accident_probabilities
-from src.preprocessing.nyc_grid import get_nyc_grid
-from src.modeling.inference import predict_accident_probabilities
-from geopy.distance import great_circle
-from src.preprocessing.intersections import intersections_df
+from .weather_cache import weather_cache
+from .encoding import JSON, PredictionColumns, encode_predictions, negotiate
+from .weather import BOROUGHS, DEFAULT_VALUES, default_weather, get_hourly_weather, nyc_now
+from .viewport import aggregate_viewport, bbox_zoom, parse_bbox, should_aggregate
+from .tiles import (
+    EMPTY_TILE, point_radius, render_tile, encode_png, snapshot_cache, snapshot_id, tile_bounds, tile_cache, validate_tile
+)
+from .weather_refresher import WeatherSnapshot, get_weather_snapshot
+from .scoring_pool import scoring_pool
+from .http_client import UpstreamClient, get_http_client
+from .metrics import WEATHER_FALLBACKS, stage
+from src.modeling.inference import (
+    calibrate, get_active_model, predict_accident_arrays, predict_accident_timeline, predict_raw_probabilities, registry
+)
+from src.modeling.model_registry import ModelSchemaError, list_versions, set_current_version
+from src.modeling.features import build_feature_matrix, weather_matrix
+from src.preprocessing.intersection_store import get_intersection_store
+from src.preprocessing.spatial_index import get_grid_index
 import os
 
 
+# Number of intersections returned by the prediction endpoints
+PREDICTION_SAMPLE_SIZE = 500
+# Intersections scored per chunk by the streaming endpoint (bounds peak memory)
+STREAM_CHUNK_SIZE = 5000
+# Upper bound on timestamps per timeline request (one week plus a day of hourly steps)
+TIMELINE_MAX_STEPS = 24 * 8
+# Browser cache lifetime of a rendered tile (tile URLs change with the date parameter)
+TILE_MAX_AGE_SECONDS = int(os.getenv("TILE_MAX_AGE_SECONDS", "300"))
+# Shared secret for the admin endpoints; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,107 +69,93 @@ async def health_check():
     }
 
 
-BOROUGHS = {
-    "Manhattan": (40.776676, -73.971321),
-    "Brooklyn": (40.650002, -73.949997),
-    "Queens": (40.742054, -73.769417),
-    "Staten Island": (40.579021, -74.151535),
-    "Bronx": (40.837048, -73.865433)
-}
-def _assign_borough(lat: float, lon: float) -> str:
-    # find the borough whose centroid is closest
-    return min(
-        BOROUGHS.keys(),
-        key=lambda b: great_circle((lat, lon), BOROUGHS[b]).km
-    )
+async def _get_hourly_weather(client: UpstreamClient, snapshot: Optional[WeatherSnapshot], endpoint: str):
+    """
+    Hourly weather for all boroughs, read from the background refresher's
+    latest snapshot, falling back to one (cached) all-borough Open-Meteo
+    call until a snapshot is available.
 
-async def fetch_borough_weather(client: httpx.AsyncClient, borough: str, lat: float, lon: float, date_str: Optional[str] = None):
-    """Fetch weather data for a single borough"""
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "timezone": "America/New_York",
-        "temperature_unit": "fahrenheit",
-        "wind_speed_unit": "mph",
-        "precipitation_unit": "inch",
-        "current": ["temperature_2m", "precipitation", "wind_speed_10m",
-                    "wind_direction_10m", "pressure_msl"]
-    }
+    Args:
+        endpoint: Name used to label the default-weather fallback counter
+
+    Returns:
+        Tuple of (HourlyWeather or None if unavailable, snapshot age in seconds or None)
+    """
+    if snapshot is not None:
+        return snapshot.hourly, snapshot.age_seconds()
 
     try:
-        logger.info(f"Fetching weather for {borough} at coordinates ({lat}, {lon})")
-        logger.info(f"Request params: {params}")
-
-        response = await client.get(url, params=params, timeout=10.0)
-        response.raise_for_status()
-        data = response.json()
-        logger.info(f"Weather API response for {borough}: {data}")
-
-        # Handle current data and convert to model format
-        current = data.get("current", {})
-
-        return borough, {
-            "tavg": float(current.get("temperature_2m", 60.0)),  # Use temperature as average
-            "tmin": float(current.get("temperature_2m", 50.0)) - 5.0,  # Estimate min temp
-            "tmax": float(current.get("temperature_2m", 70.0)) + 5.0,  # Estimate max temp
-            "prcp": float(current.get("precipitation", 0.0)),
-            "snow": 0.0,  # Default to 0 since it's current data
-            "wdir": float(current.get("wind_direction_10m", 180.0)),
-            "wspd": float(current.get("wind_speed_10m", 10.0)),
-            "pres": float(current.get("pressure_msl", 1010.0)),
-            "weather_borough": borough
-        }
+        return await get_hourly_weather(client), None
     except Exception as e:
-        logger.error(f"Error fetching weather for {borough}: {str(e)}")
+        logger.error(f"Error fetching weather: {str(e)}")
+        # the caller serves default weather
+        WEATHER_FALLBACKS.inc(endpoint=endpoint)
+        return None, None
+
+async def _get_borough_weather(client: UpstreamClient, snapshot: Optional[WeatherSnapshot], endpoint: str, when: Optional[str] = None):
+    """
+    Borough weather for the hour of `when`.
+
+    Returns:
+        Tuple of (borough -> weather dict, snapshot age in seconds or None)
+    """
+    hourly, weather_age = await _get_hourly_weather(client, snapshot, endpoint)
+    if hourly is None:
         # Return default values if there's an error
-        return borough, {
-            "tavg": 60.0,
-            "tmin": 50.0,
-            "tmax": 70.0,
-            "prcp": 0.0,
-            "snow": 0.0,
-            "wdir": 180.0,
-            "wspd": 10.0,
-            "pres": 1010.0,
-            "weather_borough": borough
-        }
+        return {borough: default_weather(borough) for borough in BOROUGHS}, weather_age
+    return hourly.borough_weather(when), weather_age
+
+def _score_in_stages(endpoint: str, date: str, lats, lons, intersection_ids, borough_codes, weather) -> np.ndarray:
+    """
+    predict_accident_arrays with feature build, model predict and calibration
+    timed as separate stages (runs on the scoring pool).
+    """
+    model = get_active_model()
+    with stage(endpoint, "feature_build"):
+        X = build_feature_matrix(date, lats, lons, intersection_ids, borough_codes, weather)
+    with stage(endpoint, "model_predict"):
+        raw = predict_raw_probabilities(X, model)
+    with stage(endpoint, "calibration"):
+        return calibrate(raw, model)
+
+@router.get("/scoring/stats")
+async def scoring_stats():
+    """Admission-control counters of the scoring pool"""
+    return scoring_pool.stats
+
+@router.get("/weather/cache-stats")
+async def weather_cache_stats():
+    """Hit/miss counters for the Open-Meteo weather cache"""
+    return weather_cache.stats
 
 @router.post("/weather", response_model=WeatherResponse)
-async def get_weather(request: WeatherRequest):
+async def get_weather(
+    request: WeatherRequest,
+    client: UpstreamClient = Depends(get_http_client),
+    snapshot: Optional[WeatherSnapshot] = Depends(get_weather_snapshot),
+):
     try:
         # Parse the datetime
         dt = datetime.fromisoformat(request.datetime)
 
-        # Create async HTTP client
-        async with httpx.AsyncClient() as client:
-            # Create tasks for all boroughs
-            tasks = [
-                fetch_borough_weather(client, borough, lat, lon)
-                for borough, (lat, lon) in BOROUGHS.items()
-            ]
-
-            # Wait for all tasks to complete
-            results = await asyncio.gather(*tasks)
-
-            # Convert results to dictionary
-            borough_weather = dict(results)
+        # Latest snapshot (or live fetch) for all boroughs
+        borough_weather, weather_age = await _get_borough_weather(client, snapshot, "weather", dt.isoformat())
 
-            # Check for errors
-            errors = [borough for borough, data in borough_weather.items() if "error" in data]
-            if errors:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error fetching weather for boroughs: {', '.join(errors)}"
-                )
+        # Check for errors
+        errors = [borough for borough, data in borough_weather.items() if "error" in data]
+        if errors:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching weather for boroughs: {', '.join(errors)}"
+            )
 
-            # Convert any error values to float to satisfy the model
-            weather_data: Dict[str, Dict[str, float]] = {}
-            for borough, data in borough_weather.items():
-                weather_data[borough] = {k: float(v) if isinstance(v, (int, float)) else 0.0
-                                        for k, v in data.items()}
+        # Convert any error values to float to satisfy the model
+        weather_data: Dict[str, Dict[str, float]] = {}
+        for borough, data in borough_weather.items():
+            weather_data[borough] = {k: float(v) if isinstance(v, (int, float)) else 0.0
+                                    for k, v in data.items()}
 
-            return WeatherResponse(borough_weather=weather_data)
+        return WeatherResponse(borough_weather=weather_data, weather_age_seconds=weather_age)
 
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid datetime format")
@@ -151,85 +164,398 @@ async def get_weather(request: WeatherRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/accident-prediction", response_model=AccidentPredictionResponse)
-async def predict_accidents(request: AccidentPredictionRequest):
+async def predict_accidents(
+    request: AccidentPredictionRequest,
+    http_request: Request,
+    client: UpstreamClient = Depends(get_http_client),
+    snapshot: Optional[WeatherSnapshot] = Depends(get_weather_snapshot),
+):
     try:
         # Validate date format
         date = datetime.fromisoformat(request.date)
         date_str = date.strftime("%Y-%m-%d")
         logger.info(f"Processing accident prediction request for date: {date_str}")
 
-        # Create async HTTP client
-        async with httpx.AsyncClient() as client:
-            # Fetch weather data for all boroughs for the specified date
-            tasks = [
-                fetch_borough_weather(client, borough, lat, lon, date_str)
-                for borough, (lat, lon) in BOROUGHS.items()
-            ]
-
-            # Wait for all tasks to complete
-            results = await asyncio.gather(*tasks)
-
-            # Convert results to dictionary
-            borough_weather_raw = dict(results)
-
-            # Check for errors
-            errors = [f"{borough}: {data.get('error', 'Unknown error')}"
-                     for borough, data in borough_weather_raw.items()
-                     if "error" in data]
-
-            if errors:
-                error_details = "; ".join(errors)
-                logger.error(f"Weather API errors: {error_details}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Error fetching weather for boroughs: {', '.join([e.split(':')[0] for e in errors])}"
-                )
-
-            # Clean up data for model input
-            borough_weather = {}
-            for borough, data in borough_weather_raw.items():
-                if "error" not in data:
-                    borough_weather[borough] = data
-
-            logger.info(f"Weather data retrieved successfully for all boroughs")
-
-            # JSON INFO
-            with open(os.path.join(os.path.dirname(__file__), "data", "intersections_enriched.json")) as f:
-                enriched = json.load(f)
-
-            # 2) Build your grid_df
-            grid_df = (
-            pd.DataFrame(enriched)
-            .rename(columns={
-          "lat": "lat",
-          "lon": "lon",
-          "nearest_borough": "borough"
-            })
-            .sample(n=500, random_state=42)
-            .reset_index(drop=True))
+        # Fetch weather data for all boroughs for the specified date
+        with stage("prediction", "weather_fetch"):
+            borough_weather_raw, weather_age = await _get_borough_weather(client, snapshot, "prediction", date.isoformat())
+
+        # Check for errors
+        errors = [f"{borough}: {data.get('error', 'Unknown error')}"
+                 for borough, data in borough_weather_raw.items()
+                 if "error" in data]
+
+        if errors:
+            error_details = "; ".join(errors)
+            logger.error(f"Weather API errors: {error_details}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching weather for boroughs: {', '.join([e.split(':')[0] for e in errors])}"
+            )
 
-            predictions_df = predict_accident_probabilities(grid_df, date_str, borough_weather)
+        # Clean up data for model input
+        borough_weather = {}
+        for borough, data in borough_weather_raw.items():
+            if "error" not in data:
+                borough_weather[borough] = data
+
+        logger.info(f"Weather data retrieved successfully for all boroughs")
+
+        # 2) Score the sampled intersections straight from the store's columns
+        with stage("prediction", "intersection_load"):
+            store = get_intersection_store()
+            positions = store.sample_positions(PREDICTION_SAMPLE_SIZE, seed=42)
+            lats = store.lat[positions]
+            lons = store.lon[positions]
+            borough_codes = store.borough_code[positions]
+
+        # full timestamp so the model sees the requested hour
+        # CPU-bound scoring runs on the bounded pool, not the event loop
+        probabilities = await scoring_pool.run(
+            _score_in_stages,
+            "prediction", date.isoformat(), lats, lons, store.id[positions], borough_codes,
+            weather_matrix(borough_weather, store.boroughs)
+        )
+
+        with stage("prediction", "serialization"):
+            # Column-oriented / binary encodings straight from the arrays (opt-in via Accept)
+            media_type = negotiate(http_request.headers.get("accept"))
+            if media_type != JSON:
+                logger.info(f"Returning {len(probabilities)} predictions as {media_type}")
+                return encode_predictions(media_type, PredictionColumns(
+                    lats, lons, borough_codes, store.boroughs, probabilities,
+                    date=date_str, weather_age_seconds=weather_age
+                ))
 
             # Convert to response format
+            borough_names = store.boroughs
             predictions = [
-               CoordinatePrediction(
-                    lat=float(row["lat"]),
-                    lon=float(row["lon"]),
-                    borough=row["borough"],
-                    probability=float(row["probability"])
+                CoordinatePrediction(
+                    lat=float(lat),
+                    lon=float(lon),
+                    borough=borough_names[code],
+                    probability=float(prob)
                 )
-                for _, row in predictions_df.iterrows()
+                for lat, lon, code, prob in zip(lats.tolist(), lons.tolist(), borough_codes.tolist(), probabilities.tolist())
             ]
 
             logger.info(f"Returning {len(predictions)} predictions")
             return AccidentPredictionResponse(
                 predictions=predictions,
-                date=date_str
+                date=date_str,
+                weather_age_seconds=weather_age
             )
 
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"ValueError in predict_accidents: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in predict_accidents: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/accident-prediction/timeline", response_model=AccidentTimelineResponse)
+async def predict_accident_timeline_endpoint(
+    request: AccidentTimelineRequest,
+    client: UpstreamClient = Depends(get_http_client),
+    snapshot: Optional[WeatherSnapshot] = Depends(get_weather_snapshot),
+):
+    """
+    Predictions for the sampled intersections at every step between start
+    and end (inclusive), scored as one stacked [hour x intersection] batch.
+    """
+    try:
+        start = datetime.fromisoformat(request.start)
+        end = datetime.fromisoformat(request.end)
+        if request.step_hours < 1:
+            raise ValueError("step_hours must be at least 1")
+        if end < start:
+            raise ValueError("end must not be before start")
+        n_steps = int((end - start) / timedelta(hours=request.step_hours)) + 1
+        if n_steps > TIMELINE_MAX_STEPS:
+            raise ValueError(f"Timeline has {n_steps} steps, the maximum is {TIMELINE_MAX_STEPS}")
+        times = [start + i * timedelta(hours=request.step_hours) for i in range(n_steps)]
+        logger.info(f"Processing timeline prediction for {n_steps} steps from {start.isoformat()}")
+
+        store = get_intersection_store()
+        positions = store.sample_positions(PREDICTION_SAMPLE_SIZE, seed=42)
+        borough_codes = store.borough_code[positions]
+
+        # [time, borough, feature] weather lined up with the store's borough codes
+        hourly, weather_age = await _get_hourly_weather(client, snapshot, "timeline")
+        if hourly is not None:
+            weather = hourly.stack(times, store.boroughs)
+        else:
+            weather = np.broadcast_to(DEFAULT_VALUES, (n_steps, len(store.boroughs), len(DEFAULT_VALUES)))
+
+        probabilities = await scoring_pool.run(
+            predict_accident_timeline,
+            times, store.lat[positions], store.lon[positions], store.id[positions], borough_codes, weather
+        )
+
+        return AccidentTimelineResponse(
+            times=[t.isoformat() for t in times],
+            lat=store.lat[positions].tolist(),
+            lon=store.lon[positions].tolist(),
+            borough=store.borough_names(positions).tolist(),
+            probabilities=probabilities.tolist(),
+            weather_age_seconds=weather_age
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"ValueError in predict_accident_timeline: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in predict_accident_timeline: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _stream_chunk(when: str, store, start: int, stop: int, weather: np.ndarray, quoted_boroughs, model) -> str:
+    """Score store rows [start, stop) and format them as NDJSON lines (runs on the scoring pool)"""
+    lats = store.lat[start:stop]
+    lons = store.lon[start:stop]
+    borough_codes = store.borough_code[start:stop]
+    probabilities = predict_accident_arrays(
+        when, lats, lons, store.id[start:stop], borough_codes, weather, model=model
+    )
+    return "".join(
+        f'{{"lat":{lat},"lon":{lon},"borough":{quoted_boroughs[code]},"probability":{prob}}}\n'
+        for lat, lon, code, prob in zip(lats.tolist(), lons.tolist(), borough_codes.tolist(), probabilities.tolist())
+    )
+
+async def _stream_predictions(when: str, store, weather: np.ndarray, chunk_size: int, model=None) -> AsyncIterator[str]:
+    """
+    Score every intersection in the store chunk by chunk, yielding one
+    NDJSON line per intersection as each chunk finishes.
+
+    Every chunk is a separate scoring pool job, so streams share the worker
+    cap, queue limit and deadline with the other endpoints. If the pool
+    turns a chunk away, the error ends the stream early. All chunks use
+    `model`, so a model swap mid-stream cannot mix two versions.
+    """
+    # borough names are JSON-encoded once, not per row
+    quoted_boroughs = [json.dumps(b) for b in store.boroughs]
+    for start in range(0, len(store), chunk_size):
+        stop = min(start + chunk_size, len(store))
+        yield await scoring_pool.run(_stream_chunk, when, store, start, stop, weather, quoted_boroughs, model)
+
+@router.post("/accident-prediction/stream")
+async def stream_accident_predictions(
+    request: AccidentPredictionRequest,
+    chunk_size: int = Query(STREAM_CHUNK_SIZE, ge=100, le=50000),
+    client: UpstreamClient = Depends(get_http_client),
+    snapshot: Optional[WeatherSnapshot] = Depends(get_weather_snapshot),
+):
+    """
+    Full-city predictions for every intersection, streamed as NDJSON
+    (one {"lat", "lon", "borough", "probability"} object per line).
+    """
+    # turn the request away before any headers go out if the pool is already full;
+    # each chunk is then admitted (and bounded by the deadline) on its own
+    scoring_pool.check_admission()
+    try:
+        date = datetime.fromisoformat(request.date)
+        borough_weather, weather_age = await _get_borough_weather(client, snapshot, "stream", date.isoformat())
+
+        store = get_intersection_store()
+        weather = weather_matrix(borough_weather, store.boroughs)
+        # pinned for the whole stream (loading it may read from disk, so off the loop)
+        model = await asyncio.to_thread(get_active_model)
+        logger.info(f"Streaming predictions for {len(store)} intersections in chunks of {chunk_size}")
+
+    except ValueError as e:
+        logger.error(f"ValueError in stream_accident_predictions: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {"X-Total-Count": str(len(store)), "X-Prediction-Date": date.strftime("%Y-%m-%d")}
+    if weather_age is not None:
+        headers["X-Weather-Age-Seconds"] = f"{weather_age:.1f}"
+    # chunks are scored on the scoring pool as the client reads them
+    return StreamingResponse(
+        _stream_predictions(date.isoformat(), store, weather, chunk_size, model),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
+
+@router.get("/accident-prediction/viewport", response_model=ViewportResponse)
+async def predict_viewport(
+    bbox: str = Query(..., description="west,south,east,north in degrees"),
+    zoom: int = Query(..., ge=0, le=22),
+    date: Optional[str] = None,
+    client: UpstreamClient = Depends(get_http_client),
+    snapshot: Optional[WeatherSnapshot] = Depends(get_weather_snapshot),
+):
+    """
+    Predictions for the intersections inside a map viewport. Views with
+    more than VIEWPORT_MAX_POINTS intersections are aggregated server-side
+    into grid cells (count, mean and max risk) and read from the shared
+    full-city snapshot, so payload and per-request scoring stay bounded
+    whatever zoom the client claims.
+    """
+    try:
+        south, west, north, east = parse_bbox(bbox)
+        when = datetime.fromisoformat(date) if date else nyc_now()
+
+        store = get_intersection_store()
+        positions = get_grid_index().query_bbox(south, west, north, east)
+
+        borough_weather, weather_age = await _get_borough_weather(client, snapshot, "viewport", when.isoformat())
+        weather = weather_matrix(borough_weather, store.boroughs)
+        lats = store.lat[positions]
+        lons = store.lon[positions]
+
+        aggregated = should_aggregate(len(positions))
+        if aggregated:
+            # large areas reuse the full-city scores shared with the tiles
+            _, city_probabilities = await _prediction_snapshot(when, weather)
+            # cells no finer than the bbox fits on a screen at, whatever zoom was claimed
+            cell_zoom, (lats, lons, count, mean_prob, max_prob) = aggregate_viewport(
+                lats, lons, city_probabilities[positions], min(zoom, bbox_zoom(south, west, north, east))
+            )
+            logger.info(f"Viewport at zoom {zoom}: {len(positions)} intersections -> {len(count)} cells at zoom {cell_zoom}")
+        else:
+            probabilities = await scoring_pool.run(
+                _score_in_stages,
+                "viewport", when.isoformat(), lats, lons, store.id[positions], store.borough_code[positions], weather
+            )
+            count = np.ones(len(positions), dtype=np.int64)
+            mean_prob = max_prob = probabilities
+            logger.info(f"Viewport at zoom {zoom}: {len(positions)} points")
+        return ViewportResponse(
+            date=when.isoformat(),
+            zoom=zoom,
+            aggregated=aggregated,
+            lat=lats.tolist(),
+            lon=lons.tolist(),
+            count=count.tolist(),
+            mean_probability=mean_prob.tolist(),
+            max_probability=max_prob.tolist(),
+            weather_age_seconds=weather_age
+        )
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"ValueError in predict_viewport: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in predict_viewport: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _prediction_snapshot(when: datetime, weather: np.ndarray):
+    """
+    Full-city probabilities (one per store position) for the hour of `when`,
+    computed once per (hour, weather) snapshot and shared by every tile.
+
+    Returns:
+        Tuple of (snapshot id, float32 probability array)
+    """
+    model = await asyncio.to_thread(get_active_model)
+    key = snapshot_id(when, weather, model.version)
+    store = get_intersection_store()
+
+    async def compute():
+        logger.info(f"Scoring {len(store)} intersections for tile snapshot {key}")
+        return await scoring_pool.run(
+            predict_accident_arrays,
+            when.isoformat(), store.lat, store.lon, store.id, store.borough_code, weather, model
+        )
+
+    return key, await snapshot_cache.get_or_fetch(key, compute)
+
+def _render_tile_png(z: int, x: int, y: int, probabilities: np.ndarray) -> bytes:
+    store = get_intersection_store()
+    # include points just off the tile whose discs reach onto it
+    south, west, north, east = tile_bounds(z, x, y, margin=point_radius(z) + 1)
+    positions = get_grid_index().query_bbox(south, west, north, east)
+    if len(positions) == 0:
+        return EMPTY_TILE
+    return encode_png(render_tile(z, x, y, store.lat[positions], store.lon[positions], probabilities[positions]))
+
+@router.get("/accident-prediction/tiles/{z}/{x}/{y}.png")
+async def prediction_tile(
+    z: int,
+    x: int,
+    y: int,
+    date: Optional[str] = None,
+    client: UpstreamClient = Depends(get_http_client),
+    snapshot: Optional[WeatherSnapshot] = Depends(get_weather_snapshot),
+):
+    """
+    Pre-rendered risk heatmap tile (Web Mercator z/x/y, 256px PNG) for the
+    hour of `date` (default: now), for use as a map overlay layer.
+    """
+    try:
+        validate_tile(z, x, y)
+        when = datetime.fromisoformat(date) if date else nyc_now()
+        borough_weather, _ = await _get_borough_weather(client, snapshot, "tiles", when.isoformat())
+        weather = weather_matrix(borough_weather, get_intersection_store().boroughs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        key, probabilities = await _prediction_snapshot(when, weather)
+        png = await tile_cache.get_or_fetch(
+            (key, z, x, y), lambda: scoring_pool.run(_render_tile_png, z, x, y, probabilities)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error rendering tile {z}/{x}/{y}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    return Response(
+        content=png,
+        media_type="image/png",
+        headers={
+            "Cache-Control": f"public, max-age={TILE_MAX_AGE_SECONDS}",
+            "ETag": f'"{key}-{z}-{x}-{y}"',
+            "X-Prediction-Snapshot": key,
+        }
+    )
+
+@router.get("/accident-prediction/tiles/cache-stats")
+async def tile_cache_stats():
+    """Hit/miss counters for the rendered tile and prediction snapshot caches"""
+    return {"tiles": tile_cache.stats, "snapshots": snapshot_cache.stats}
+
+def _model_info(model) -> ModelInfoResponse:
+    return ModelInfoResponse(**model.info(), available_versions=list_versions(registry.models_dir))
+
+@router.get("/model", response_model=ModelInfoResponse)
+async def model_info():
+    """The model version currently serving predictions"""
+    return _model_info(await asyncio.to_thread(get_active_model))
+
+@router.post("/admin/model/reload", response_model=ModelInfoResponse)
+async def reload_model(request: ModelReloadRequest, x_admin_token: Optional[str] = Header(None)):
+    """
+    Load a model version (default: the registry's current one) and swap it
+    in. Requests already running finish on the previous version.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN is not set)")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+    def reload():
+        # reload() only accepts versions listed in the registry (404 otherwise),
+        # so an unknown or path-like version is never loaded or persisted
+        loaded = registry.reload(request.version)
+        if request.version:
+            # make the choice stick: the file watcher (and other workers) follow CURRENT
+            set_current_version(request.version, registry.models_dir)
+        return loaded
+
+    try:
+        loaded = await asyncio.to_thread(reload)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ModelSchemaError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reloading model: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return _model_info(loaded)
@@ -0,0 +1,338 @@
+"""
+Local stand-in for the Open-Meteo forecast API, for tests and load tests.
+
+Answers /v1/forecast with payloads in the real response schema (`current`,
+`hourly` and `daily` blocks with their `*_units`, one object per location
+or a list for several) generated deterministically from the coordinates
+and the hour. Latency, jitter, the error rate and missing readings are
+configurable.
+
+In-process, as an httpx transport:
+
+    client = create_http_client(transport=FakeOpenMeteo(FakeOpenMeteoConfig(latency_ms=50)).transport())
+
+As a server the API can be pointed at with OPEN_METEO_URL:
+
+    python -m src.api.fake_open_meteo --port 8081 --latency-ms 80 --error-rate 0.02
+    OPEN_METEO_URL=http://127.0.0.1:8081/v1/forecast uvicorn src.api.main:app
+"""
+
+import math
+import json
+import random
+import asyncio
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+import httpx
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FORECAST_PATH = "/v1/forecast"
+
+# Hourly/current variables the fake knows: name -> quantity the values are generated for
+HOURLY_VARIABLES = {
+    "temperature_2m": "temperature",
+    "apparent_temperature": "temperature",
+    "relative_humidity_2m": "humidity",
+    "precipitation": "precipitation",
+    "rain": "precipitation",
+    "snowfall": "snowfall",
+    "cloud_cover": "cloud_cover",
+    "weather_code": "weather_code",
+    "pressure_msl": "pressure",
+    "surface_pressure": "pressure",
+    "wind_speed_10m": "wind_speed",
+    "wind_direction_10m": "wind_direction",
+    "wind_gusts_10m": "wind_speed",
+}
+# Daily variables: name -> (hourly variable it aggregates, aggregation)
+DAILY_VARIABLES = {
+    "temperature_2m_max": ("temperature_2m", "max"),
+    "temperature_2m_min": ("temperature_2m", "min"),
+    "temperature_2m_mean": ("temperature_2m", "mean"),
+    "precipitation_sum": ("precipitation", "sum"),
+    "rain_sum": ("rain", "sum"),
+    "snowfall_sum": ("snowfall", "sum"),
+    "wind_speed_10m_max": ("wind_speed_10m", "max"),
+    "wind_gusts_10m_max": ("wind_gusts_10m", "max"),
+    "wind_direction_10m_dominant": ("wind_direction_10m", "mean"),
+    "weather_code": ("weather_code", "max"),
+}
+
+# Unit labels and conversions from the metric values the fake generates
+TEMPERATURE_UNITS = {"celsius": ("°C", lambda c: c), "fahrenheit": ("°F", lambda c: c * 9 / 5 + 32)}
+WIND_SPEED_UNITS = {
+    "kmh": ("km/h", lambda v: v),
+    "mph": ("mp/h", lambda v: v / 1.609344),
+    "ms": ("m/s", lambda v: v / 3.6),
+    "kn": ("kn", lambda v: v / 1.852),
+}
+PRECIPITATION_UNITS = {"mm": ("mm", lambda v: v), "inch": ("inch", lambda v: v / 25.4)}
+FIXED_UNITS = {
+    "humidity": "%",
+    "cloud_cover": "%",
+    "weather_code": "wmo code",
+    "pressure": "hPa",
+    "wind_direction": "°",
+}
+
+
+class FakeRequestError(ValueError):
+    """A request the real API would answer with 400 {"error": true, "reason": ...}"""
+
+
+@dataclass
+class FakeOpenMeteoConfig:
+    """
+    Behaviour of the fake.
+
+    Args:
+        latency_ms: Added delay of every response
+        jitter_ms: Extra uniformly random delay in [0, jitter_ms]
+        error_rate: Fraction of requests answered with `error_status`
+        error_status: Status of injected errors (e.g. 429, 500, 503)
+        null_rate: Fraction of hourly readings returned as null
+        seed: Seed for latency jitter, errors and nulls
+    """
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    null_rate: float = 0.0
+    seed: Optional[int] = None
+
+
+def _split(value: Optional[str]) -> List[str]:
+    return [v for v in (value or "").split(",") if v]
+
+
+def _metric_series(quantity: str, lat: float, lon: float, hours: np.ndarray) -> np.ndarray:
+    """Plausible metric values of one quantity at the given epoch hours (deterministic)"""
+    day_phase = 2 * math.pi * ((hours - 5) % 24) / 24  # local-ish afternoon peak
+    year_phase = 2 * math.pi * (hours / 24 % 365.25) / 365.25
+    # a per-location offset so boroughs differ a little
+    offset = math.sin(lat * 13.7) + math.cos(lon * 7.3)
+    wave = np.sin(hours / 17.0 + offset)
+    if quantity == "temperature":
+        return 12 - 10 * np.cos(year_phase) - 4 * np.cos(day_phase) + offset
+    if quantity == "humidity":
+        return np.clip(65 + 20 * wave, 5, 100)
+    if quantity == "precipitation":
+        return np.clip(2.0 * np.sin(hours / 7.0 + offset) - 1.2, 0, None)
+    if quantity == "snowfall":
+        cold = 12 - 10 * np.cos(year_phase) < 2
+        return np.where(cold, np.clip(1.5 * np.sin(hours / 9.0 + offset) - 0.8, 0, None), 0.0)
+    if quantity == "cloud_cover":
+        return np.clip(50 + 50 * wave, 0, 100)
+    if quantity == "weather_code":
+        return np.where(np.sin(hours / 7.0 + offset) > 0.6, 61, np.where(wave > 0.5, 3, 0)).astype(np.float64)
+    if quantity == "pressure":
+        return 1013 + 8 * np.sin(hours / 40.0 + offset)
+    if quantity == "wind_speed":
+        return np.clip(15 + 10 * np.sin(hours / 11.0 + offset), 0, None)
+    if quantity == "wind_direction":
+        return (200 + 120 * np.sin(hours / 30.0 + offset)) % 360
+    raise KeyError(quantity)
+
+
+class FakeOpenMeteo:
+    """Generates forecast responses and serves them as an httpx transport or an ASGI app"""
+
+    def __init__(self, config: Optional[FakeOpenMeteoConfig] = None):
+        self.config = config or FakeOpenMeteoConfig()
+        self._random = random.Random(self.config.seed)
+        self.stats = {"requests": 0, "errors_injected": 0, "bad_requests": 0}
+
+    def _units(self, params: Mapping[str, str]):
+        try:
+            return (
+                TEMPERATURE_UNITS[params.get("temperature_unit", "celsius")],
+                WIND_SPEED_UNITS[params.get("wind_speed_unit", "kmh")],
+                PRECIPITATION_UNITS[params.get("precipitation_unit", "mm")],
+            )
+        except KeyError as e:
+            raise FakeRequestError(f"Invalid unit {e.args[0]}")
+
+    def _convert(self, variable: str, values: np.ndarray, units) -> Tuple[str, np.ndarray]:
+        temperature, wind, precipitation = units
+        quantity = HOURLY_VARIABLES[variable]
+        if quantity == "temperature":
+            label, convert = temperature
+        elif quantity == "wind_speed":
+            label, convert = wind
+        elif quantity == "precipitation":
+            label, convert = precipitation
+        elif quantity == "snowfall":
+            # Open-Meteo reports snowfall in cm (inch with precipitation_unit=inch)
+            label, convert = ("inch", lambda v: v / 2.54) if precipitation[0] == "inch" else ("cm", lambda v: v)
+        else:
+            return FIXED_UNITS[quantity], values
+        return label, convert(values)
+
+    def _nullify(self, values: List[float]) -> List[Optional[float]]:
+        if self.config.null_rate <= 0:
+            return values
+        return [None if self._random.random() < self.config.null_rate else v for v in values]
+
+    def location(self, lat: float, lon: float, params: Mapping[str, str], now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Response object for one location"""
+        timezone = params.get("timezone", "GMT")
+        # a fake for NYC: "auto" resolves to New York
+        try:
+            tz = ZoneInfo("America/New_York" if timezone == "auto" else timezone)
+        except ZoneInfoNotFoundError:
+            raise FakeRequestError(f"Invalid timezone {timezone}")
+        now = (now or datetime.now(tz)).astimezone(tz)
+        units = self._units(params)
+
+        past_days = int(params.get("past_days", 0))
+        forecast_days = int(params.get("forecast_days", 7))
+        first_day = now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=past_days)
+        n_hours = 24 * (past_days + forecast_days)
+        local_hours = [first_day + timedelta(hours=h) for h in range(n_hours)]
+        epoch_hours = np.array([t.timestamp() / 3600 for t in local_hours])
+
+        body: Dict[str, Any] = {
+            "latitude": round(lat, 4),
+            "longitude": round(lon, 4),
+            "generationtime_ms": 0.05,
+            "utc_offset_seconds": int(now.utcoffset().total_seconds()),
+            "timezone": str(tz.key),
+            "timezone_abbreviation": now.tzname(),
+            "elevation": 10.0,
+        }
+
+        def series(variable: str, hours: np.ndarray) -> Tuple[str, np.ndarray]:
+            if variable not in HOURLY_VARIABLES:
+                raise FakeRequestError(f"Cannot initialize WeatherVariable from invalid String value {variable}")
+            return self._convert(variable, _metric_series(HOURLY_VARIABLES[variable], lat, lon, hours), units)
+
+        hourly = _split(params.get("hourly"))
+        if hourly:
+            body["hourly_units"] = {"time": "iso8601"}
+            body["hourly"] = {"time": [t.strftime("%Y-%m-%dT%H:%M") for t in local_hours]}
+            for variable in hourly:
+                unit, values = series(variable, epoch_hours)
+                body["hourly_units"][variable] = unit
+                body["hourly"][variable] = self._nullify(np.round(values, 1).tolist())
+
+        daily = _split(params.get("daily"))
+        if daily:
+            n_days = past_days + forecast_days
+            body["daily_units"] = {"time": "iso8601"}
+            body["daily"] = {"time": [(first_day + timedelta(days=d)).strftime("%Y-%m-%d") for d in range(n_days)]}
+            for variable in daily:
+                if variable not in DAILY_VARIABLES:
+                    raise FakeRequestError(f"Cannot initialize WeatherVariable from invalid String value {variable}")
+                source, aggregate = DAILY_VARIABLES[variable]
+                unit, values = series(source, epoch_hours)
+                per_day = getattr(values.reshape(n_days, 24), aggregate)(axis=1)
+                body["daily_units"][variable] = unit
+                body["daily"][variable] = np.round(per_day, 1).tolist()
+
+        current = _split(params.get("current"))
+        if current:
+            # current conditions are reported for the last full 15 minutes
+            quarter = now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+            body["current_units"] = {"time": "iso8601", "interval": "seconds"}
+            body["current"] = {"time": quarter.strftime("%Y-%m-%dT%H:%M"), "interval": 900}
+            for variable in current:
+                unit, values = series(variable, np.array([quarter.timestamp() / 3600]))
+                body["current_units"][variable] = unit
+                body["current"][variable] = round(float(values[0]), 1)
+        return body
+
+    def respond(self, params: Mapping[str, str], now: Optional[datetime] = None) -> Tuple[int, Any]:
+        """(status, JSON body) for a forecast request, including injected errors"""
+        self.stats["requests"] += 1
+        if self.config.error_rate > 0 and self._random.random() < self.config.error_rate:
+            self.stats["errors_injected"] += 1
+            return self.config.error_status, {"error": True, "reason": "Injected error"}
+        try:
+            lats = [float(v) for v in _split(params.get("latitude"))]
+            lons = [float(v) for v in _split(params.get("longitude"))]
+            if not lats or len(lats) != len(lons):
+                raise FakeRequestError("Parameter 'latitude' and 'longitude' must have the same number of elements")
+            locations = [self.location(lat, lon, params, now) for lat, lon in zip(lats, lons)]
+        except (FakeRequestError, ValueError) as e:
+            self.stats["bad_requests"] += 1
+            return 400, {"error": True, "reason": str(e)}
+        # several coordinates -> one object per location, in request order
+        return 200, locations if len(locations) > 1 else locations[0]
+
+    async def delay(self):
+        seconds = (self.config.latency_ms + self._random.uniform(0, self.config.jitter_ms)) / 1000
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        """httpx transport handler"""
+        await self.delay()
+        if request.url.path != FORECAST_PATH:
+            return httpx.Response(404, json={"error": True, "reason": "Not found"})
+        status, body = self.respond(dict(request.url.params))
+        return httpx.Response(status, json=body)
+
+    def transport(self) -> httpx.MockTransport:
+        """In-process transport for create_http_client(transport=...)"""
+        return httpx.MockTransport(self.handle)
+
+    def app(self):
+        """ASGI app serving /v1/forecast (plus /health and /stats) for uvicorn"""
+        from starlette.applications import Starlette
+        from starlette.responses import JSONResponse, Response
+        from starlette.routing import Route
+
+        async def forecast(request):
+            await self.delay()
+            status, body = self.respond(dict(request.query_params))
+            return Response(json.dumps(body), status_code=status, media_type="application/json")
+
+        async def health(request):
+            return JSONResponse({"status": "healthy"})
+
+        async def stats(request):
+            return JSONResponse(self.stats)
+
+        return Starlette(routes=[
+            Route(FORECAST_PATH, forecast),
+            Route("/health", health),
+            Route("/stats", stats),
+        ])
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local Open-Meteo stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--null-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    fake = FakeOpenMeteo(FakeOpenMeteoConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        null_rate=args.null_rate,
+        seed=args.seed,
+    ))
+    logger.info(f"Fake Open-Meteo on http://{args.host}:{args.port}{FORECAST_PATH} ({fake.config})")
+    uvicorn.run(fake.app(), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import random
+import asyncio
+import logging
+import importlib.util
+from typing import Dict, Optional
+import httpx
+from fastapi import Request
+from .metrics import UPSTREAM_ERRORS, UPSTREAM_RETRIES
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connection pool / timeout settings for upstream calls (Open-Meteo)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+HTTP_PER_HOST_CONCURRENCY = int(os.getenv("HTTP_PER_HOST_CONCURRENCY", "8"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.2"))
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP_HTTP2 = os.getenv("HTTP_HTTP2", "0") == "1"
+
+# Status codes worth retrying; anything else is returned to the caller as-is
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class UpstreamClient:
+    """
+    App-scoped wrapper around a pooled httpx.AsyncClient.
+
+    Adds a per-host concurrency cap and bounded retries with exponential
+    backoff and full jitter on transport errors and retryable statuses.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        per_host_concurrency: int = HTTP_PER_HOST_CONCURRENCY,
+        max_retries: int = HTTP_MAX_RETRIES,
+        retry_backoff: float = HTTP_RETRY_BACKOFF,
+    ):
+        self.client = client
+        self.per_host_concurrency = per_host_concurrency
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return limit
+
+    async def _backoff(self, attempt: int):
+        # full jitter: sleep somewhere in [0, backoff * 2^attempt]
+        await asyncio.sleep(random.uniform(0, self.retry_backoff * (2 ** attempt)))
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET `url`, retrying transient failures up to max_retries times"""
+        host = httpx.URL(url).host
+        async with self._host_limit(url):
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                try:
+                    response = await self.client.get(url, **kwargs)
+                except httpx.TransportError as e:
+                    if last_attempt:
+                        UPSTREAM_ERRORS.inc(host=host, reason=type(e).__name__)
+                        raise
+                    logger.warning(f"GET {url} failed ({e!r}), retrying ({attempt + 1}/{self.max_retries})")
+                else:
+                    if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+                        if response.status_code >= 400:
+                            UPSTREAM_ERRORS.inc(host=host, reason=str(response.status_code))
+                        return response
+                    logger.warning(f"GET {url} returned {response.status_code}, retrying ({attempt + 1}/{self.max_retries})")
+                UPSTREAM_RETRIES.inc(host=host)
+                await self._backoff(attempt)
+
+    async def aclose(self):
+        await self.client.aclose()
+
+
+def create_http_client(transport: Optional[httpx.AsyncBaseTransport] = None, **overrides) -> UpstreamClient:
+    """
+    Build the shared upstream client.
+
+    Args:
+        transport: Optional transport, e.g. httpx.MockTransport in tests
+        **overrides: per_host_concurrency / max_retries / retry_backoff
+
+    Returns:
+        UpstreamClient wrapping a pooled httpx.AsyncClient
+    """
+    http2 = HTTP_HTTP2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP_HTTP2=1 but the 'h2' package is not installed, falling back to HTTP/1.1")
+        http2 = False
+
+    client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(HTTP_READ_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        http2=http2,
+        transport=transport,
+    )
+    return UpstreamClient(client, **overrides)
+
+
+def get_http_client(request: Request) -> UpstreamClient:
+    """FastAPI dependency returning the client created in the app lifespan"""
+    client = getattr(request.app.state, "http_client", None)
+    if client is None:
+        # lifespan didn't run (e.g. some serverless adapters) -> create it lazily
+        logger.warning("Shared HTTP client missing from app state, creating one lazily")
+        client = request.app.state.http_client = create_http_client()
+    return client
@@ -1,8 +1,76 @@
-from fastapi import FastAPI
+import os
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from .endpoints import router
+from .http_client import create_http_client
+from .weather_refresher import WEATHER_REFRESH_INTERVAL_SECONDS, WeatherRefresher
+from .scoring_pool import scoring_pool
+from .weather_cache import weather_cache
+from .tiles import snapshot_cache, tile_cache
+from . import metrics, profiling
 
-app = FastAPI(title="NYC Road Safety Weather API")
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load the model and build the indexes at startup instead of on the first request.
+# Leave off where cold starts matter more than first-request latency (serverless).
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1").lower() in ("1", "true", "yes")
+# How often the model registry is checked for a new version (0 disables hot reload)
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "30"))
+
+
+def warm_up():
+    """Pay every first-use cost of the prediction endpoints up front"""
+    from src.modeling import inference
+    from src.preprocessing.spatial_index import get_grid_index
+
+    start = time.perf_counter()
+    inference.warm_up()
+    get_grid_index()
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+async def watch_model_registry(interval: float):
+    """Swap in a new model version when its files change, without a restart"""
+    from src.modeling.inference import registry
+
+    while True:
+        await asyncio.sleep(interval)
+        # loading a model is blocking work, keep it off the event loop
+        await asyncio.to_thread(registry.check_for_update)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled, keep-alive HTTP client for all upstream calls
+    app.state.http_client = create_http_client()
+    # Keep a fresh weather snapshot so prediction requests never wait on Open-Meteo
+    # (an interval of 0 leaves it stopped, e.g. in tests without network)
+    app.state.weather_refresher = WeatherRefresher(app.state.http_client, interval=WEATHER_REFRESH_INTERVAL_SECONDS)
+    app.state.weather_refresher.start()
+    if WARMUP_ON_STARTUP:
+        # in a thread so the weather refresher keeps running meanwhile
+        await asyncio.to_thread(warm_up)
+    model_watcher = None
+    if MODEL_WATCH_INTERVAL_SECONDS > 0:
+        model_watcher = asyncio.create_task(watch_model_registry(MODEL_WATCH_INTERVAL_SECONDS))
+    try:
+        yield
+    finally:
+        if model_watcher is not None:
+            model_watcher.cancel()
+        await app.state.weather_refresher.stop()
+        await app.state.http_client.aclose()
+        scoring_pool.shutdown()
+
+
+app = FastAPI(title="NYC Road Safety Weather API", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -16,6 +84,73 @@ app.add_middleware(
 # Add router with /api prefix
 app.include_router(router, prefix="/api")
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # label by route template, not raw path, so tile URLs don't explode the series count
+        route = request.scope.get("route")
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
+
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    # opt-in per request, and only where PROFILING_ENABLED (and the token) allow it
+    captures = profiling.requested_captures(request.headers, request.query_params)
+    if captures is None:
+        return await call_next(request)
+
+    trace = profiling.RequestTrace(captures)
+    capture = profiling.ProfileCapture(trace)
+    capture.start()
+    token = profiling.current_trace.set(trace)
+    try:
+        response = await call_next(request)
+    finally:
+        profiling.current_trace.reset(token)
+        # writing the profile files is blocking I/O
+        await asyncio.to_thread(capture.stop)
+
+    response.headers["Server-Timing"] = trace.server_timing()
+    response.headers["Timing-Allow-Origin"] = "*"
+    response.headers["X-Profile-Id"] = trace.profile_id
+    return response
+
+
+def _cache_stats() -> dict:
+    values = {}
+    for name, cache in (("weather", weather_cache), ("tiles", tile_cache), ("snapshots", snapshot_cache)):
+        for stat, value in cache.stats.items():
+            if isinstance(value, (int, float)):
+                values[(name, stat)] = value
+    return values
+
+
+# Existing in-process counters, read at scrape time
+metrics.registry.gauge(
+    "scoring_pool", "Scoring pool counters and limits", ("stat",),
+    lambda: {(stat,): value for stat, value in scoring_pool.stats.items()},
+)
+metrics.registry.gauge("cache", "In-memory cache counters", ("cache", "stat"), _cache_stats)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus text exposition of latency histograms and error counters"""
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/")
 async def root():
     return {"message": "NYC Road Safety Live Prediction API"}
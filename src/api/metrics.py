@@ -0,0 +1,206 @@
+import os
+import time
+import math
+import random
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from .profiling import record_stage
+
+# Opt-in logging of upstream request/response payloads (off by default, they are large)
+LOG_UPSTREAM_PAYLOADS = os.getenv("LOG_UPSTREAM_PAYLOADS", "0").lower() in ("1", "true", "yes")
+# Fraction of upstream calls whose payload is logged when enabled
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01"))
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+# (suffix, label pairs, value) as rendered by the text format
+Sample = Tuple[str, Tuple[Tuple[str, str], ...], float]
+
+
+def should_log_payload() -> bool:
+    """True for the sampled share of upstream calls whose payload may be logged"""
+    return LOG_UPSTREAM_PAYLOADS and random.random() < LOG_PAYLOAD_SAMPLE_RATE
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, one series per label combination"""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            values = dict(self._values)
+        return [("", tuple(zip(self.labelnames, key)), value) for key, value in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (cumulative buckets, sum and count)"""
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # label key -> [per-bucket counts..., sum, count]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the `with` block, also when it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return int(series[-1]) if series else 0
+
+    def samples(self) -> List[Sample]:
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        samples = []
+        for key, values in sorted(series.items()):
+            labels = tuple(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, values):
+                cumulative += n
+                samples.append(("_bucket", labels + (("le", _format_value(bound)),), cumulative))
+            samples.append(("_sum", labels, values[-2]))
+            samples.append(("_count", labels, values[-1]))
+        return samples
+
+
+class Gauge(_Metric):
+    """Point-in-time value read from a callback at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], collect: Callable[[], Dict[Labels, float]]):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def samples(self) -> List[Sample]:
+        return [("", tuple(zip(self.labelnames, key)), value) for key, value in sorted(self._collect().items())]
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Iterable[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str], collect: Callable[[], Dict[Labels, float]]) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                name = metric.name + suffix
+                label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status")
+)
+STAGE_LATENCY = registry.histogram(
+    "prediction_stage_duration_seconds", "Latency of each stage of a prediction request", ("endpoint", "stage")
+)
+UPSTREAM_ERRORS = registry.counter(
+    "upstream_errors_total", "Failed upstream calls (after retries), by host and reason", ("host", "reason")
+)
+UPSTREAM_RETRIES = registry.counter(
+    "upstream_retries_total", "Upstream calls retried after a transient failure", ("host",)
+)
+WEATHER_FALLBACKS = registry.counter(
+    "weather_default_fallbacks_total", "Requests served with default weather because none was available", ("endpoint",)
+)
+
+
+@contextmanager
+def stage(endpoint: str, name: str):
+    """Time one stage of a prediction request into STAGE_LATENCY (and the request's profile trace)"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_LATENCY.observe(seconds, endpoint=endpoint, stage=name)
+        record_stage(name, seconds)
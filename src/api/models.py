@@ -6,6 +6,8 @@ class WeatherRequest(BaseModel):
 
 class WeatherResponse(BaseModel):
     borough_weather: Dict[str, Dict[str, float]]
+    # Age of the background weather snapshot used (None if fetched for this request)
+    weather_age_seconds: Optional[float] = None
 
 class AccidentPredictionRequest(BaseModel):
     date: str
@@ -19,3 +21,44 @@ class CoordinatePrediction(BaseModel):
 class AccidentPredictionResponse(BaseModel):
     predictions: List[CoordinatePrediction]
     date: str
+    weather_age_seconds: Optional[float] = None
+
+class AccidentTimelineRequest(BaseModel):
+    start: str
+    end: str
+    step_hours: int = 1
+
+class AccidentTimelineResponse(BaseModel):
+    # One entry per timestamp
+    times: List[str]
+    # One entry per intersection
+    lat: List[float]
+    lon: List[float]
+    borough: List[str]
+    # [time][intersection] probabilities
+    probabilities: List[List[float]]
+    weather_age_seconds: Optional[float] = None
+
+class ViewportResponse(BaseModel):
+    date: str
+    zoom: int
+    # True when points were summarised into grid cells
+    aggregated: bool
+    # One entry per point (count 1, mean == max) or per cell
+    lat: List[float]
+    lon: List[float]
+    count: List[int]
+    mean_probability: List[float]
+    max_probability: List[float]
+    weather_age_seconds: Optional[float] = None
+
+class ModelInfoResponse(BaseModel):
+    version: str
+    source: str
+    loaded_at: str
+    n_features: int
+    available_versions: List[str]
+
+class ModelReloadRequest(BaseModel):
+    # None: whatever the registry currently points at
+    version: Optional[str] = None
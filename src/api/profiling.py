@@ -0,0 +1,210 @@
+import os
+import sys
+import time
+import uuid
+import logging
+import tempfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-request profiling is off unless explicitly enabled for the deployment
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+# When set, a request must also present this token (X-Profile-Token header or profile_token query)
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+# Where sampling profiles and allocation snapshots are written
+PROFILE_OUTPUT_DIR = Path(os.getenv("PROFILE_OUTPUT_DIR", Path(tempfile.gettempdir()) / "nyc-api-profiles"))
+# Seconds between stack samples of the sampling profiler
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+# Frames kept per tracemalloc allocation traceback
+PROFILE_TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "10"))
+
+PROFILE_HEADER = "x-debug-profile"
+PROFILE_QUERY_PARAM = "debug_profile"
+TOKEN_HEADER = "x-profile-token"
+TOKEN_QUERY_PARAM = "profile_token"
+
+# What a profiled request can ask for: "timing" (Server-Timing only), "cpu", "memory"
+CAPTURES = frozenset({"timing", "cpu", "memory"})
+
+
+@dataclass
+class RequestTrace:
+    """Stage timings (and requested captures) of one profiled request"""
+    captures: FrozenSet[str]
+    profile_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started: float = field(default_factory=time.perf_counter)
+    stages: List[Tuple[str, float]] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, name: str, seconds: float):
+        # stages run on the event loop and on scoring threads
+        with self._lock:
+            self.stages.append((name, seconds))
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one metric per stage plus the total, in milliseconds"""
+        with self._lock:
+            stages = list(self.stages)
+        totals: Dict[str, float] = {}
+        for name, seconds in stages:
+            totals[name] = totals.get(name, 0.0) + seconds
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in totals.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+# Set for the duration of a profiled request; copied into scoring threads with the context
+current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+
+def record_stage(name: str, seconds: float):
+    """Add a stage timing to the current request's trace, if it is being profiled"""
+    trace = current_trace.get()
+    if trace is not None:
+        trace.record(name, seconds)
+
+
+def requested_captures(headers, query_params) -> Optional[FrozenSet[str]]:
+    """
+    Captures a request opted into, or None when it did not opt in or is not
+    allowed to. The opt-in value is a comma-separated subset of CAPTURES;
+    "1"/"true" means timing only.
+    """
+    if not PROFILING_ENABLED:
+        return None
+    value = headers.get(PROFILE_HEADER) or query_params.get(PROFILE_QUERY_PARAM)
+    if not value:
+        return None
+    if PROFILING_TOKEN and (headers.get(TOKEN_HEADER) or query_params.get(TOKEN_QUERY_PARAM)) != PROFILING_TOKEN:
+        logger.warning("Ignoring profiling request without a valid profile token")
+        return None
+    names = {v.strip().lower() for v in value.split(",")}
+    if names & {"1", "true", "yes"}:
+        names = {"timing"}
+    return frozenset((names & CAPTURES) | {"timing"})
+
+
+class StackSampler:
+    """
+    Sampling profiler: a background thread records the stacks of all other
+    threads every `interval` seconds and aggregates them as collapsed stacks
+    ("thread;module:function;...  count"), the input format of flamegraph tools.
+
+    Samples cover the whole process, so requests running concurrently show
+    up too; stacks are prefixed with the thread name to tell them apart.
+    """
+
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{frame.f_globals.get('__name__', code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.samples[";".join([names.get(ident, str(ident))] + stack[::-1])] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+class ProfileCapture:
+    """
+    CPU sampling profile and/or tracemalloc snapshot around one request,
+    written to PROFILE_OUTPUT_DIR as <profile id>.collapsed,
+    <profile id>.tracemalloc and <profile id>-memory.txt.
+
+    Captures are process-wide, so only one request is captured at a time;
+    others asking meanwhile get their Server-Timing breakdown only.
+    """
+
+    _busy = threading.Lock()
+
+    def __init__(self, trace: RequestTrace, output_dir: Optional[Path] = None):
+        self.trace = trace
+        self.output_dir = Path(output_dir or PROFILE_OUTPUT_DIR)
+        self.sampler: Optional[StackSampler] = None
+        self.tracing_memory = False
+        self.active = False
+
+    def start(self) -> bool:
+        if not self.trace.captures & {"cpu", "memory"}:
+            return False
+        if not self._busy.acquire(blocking=False):
+            logger.warning(f"Profile {self.trace.profile_id}: another capture is running, timing only")
+            return False
+        self.active = True
+        if "memory" in self.trace.captures and not tracemalloc.is_tracing():
+            tracemalloc.start(PROFILE_TRACEMALLOC_FRAMES)
+            self.tracing_memory = True
+        if "cpu" in self.trace.captures:
+            self.sampler = StackSampler()
+            self.sampler.start()
+        return True
+
+    def stop(self) -> List[Path]:
+        """End the capture and write its files; returns the paths written"""
+        if not self.active:
+            return []
+        written = []
+        try:
+            # stop sampling before writing anything, so the write itself isn't profiled
+            if self.sampler is not None:
+                self.sampler.stop()
+            snapshot = None
+            if self.tracing_memory:
+                # leave out the profiler's own bookkeeping
+                snapshot = tracemalloc.take_snapshot().filter_traces([
+                    tracemalloc.Filter(False, __file__),
+                    tracemalloc.Filter(False, tracemalloc.__file__),
+                ])
+                tracemalloc.stop()
+
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            prefix = self.output_dir / self.trace.profile_id
+            if self.sampler is not None:
+                path = prefix.with_suffix(".collapsed")
+                path.write_text(self.sampler.collapsed())
+                written.append(path)
+            if snapshot is not None:
+                path = prefix.with_suffix(".tracemalloc")
+                snapshot.dump(str(path))
+                written.append(path)
+                summary = self.output_dir / f"{self.trace.profile_id}-memory.txt"
+                summary.write_text("".join(f"{stat}\n" for stat in snapshot.statistics("lineno")[:50]))
+                written.append(summary)
+        finally:
+            if self.tracing_memory and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self.active = False
+            self._busy.release()
+        logger.info(f"Profile {self.trace.profile_id} written to {', '.join(str(p) for p in written)}")
+        return written
@@ -0,0 +1,155 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Scoring jobs running at once (XGBoost and NumPy release the GIL, so threads scale)
+SCORING_MAX_WORKERS = int(os.getenv("SCORING_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Jobs allowed to wait for a worker before new ones are turned away with 503
+SCORING_MAX_QUEUE = int(os.getenv("SCORING_MAX_QUEUE", "16"))
+# Longest a request waits for its scoring (queueing included) before a 504
+SCORING_DEADLINE_SECONDS = float(os.getenv("SCORING_DEADLINE_SECONDS", "10"))
+# Retry-After sent with 503 responses
+SCORING_RETRY_AFTER_SECONDS = int(os.getenv("SCORING_RETRY_AFTER_SECONDS", "1"))
+
+
+class DeadlineExceeded(Exception):
+    """A queued job's deadline passed before a worker picked it up"""
+
+
+class ScoringPool:
+    """
+    Bounded thread pool for CPU-bound scoring with admission control.
+
+    At most `max_workers` jobs run and `max_queue` wait; further submissions
+    are rejected immediately with 503 + Retry-After instead of piling up.
+    Every job has a deadline: the caller gets a 504 once it passes, and a
+    job still queued at its deadline is dropped without running.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = SCORING_MAX_WORKERS,
+        max_queue: int = SCORING_MAX_QUEUE,
+        deadline: float = SCORING_DEADLINE_SECONDS,
+        retry_after: int = SCORING_RETRY_AFTER_SECONDS,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.retry_after = retry_after
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        # jobs submitted and not yet finished or dropped; touched from the event loop only
+        self._admitted = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "expired_in_queue": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "in_flight": self._admitted,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+        }
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # threads are only started once scoring is actually used
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scoring")
+        return self._executor
+
+    def check_admission(self):
+        """Raise 503 + Retry-After if the pool cannot take another job right now"""
+        if self._admitted >= self.max_workers + self.max_queue:
+            self._stats["rejected"] += 1
+            logger.warning(f"Scoring pool full ({self._admitted} in flight), rejecting request")
+            raise HTTPException(
+                status_code=503,
+                detail="Server is busy scoring other requests, retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+    async def run(self, fn: Callable[..., Any], *args, deadline: Optional[float] = None) -> Any:
+        """
+        Run `fn(*args)` on the pool and return its result.
+
+        Args:
+            fn: Blocking, CPU-bound callable
+            deadline: Seconds the caller is willing to wait (default: the pool's deadline)
+
+        Raises:
+            HTTPException: 503 when the queue is full, 504 when the deadline passes
+        """
+        self.check_admission()
+
+        timeout = self.deadline if deadline is None else deadline
+        expires = time.monotonic() + timeout
+
+        def job():
+            if time.monotonic() > expires:
+                raise DeadlineExceeded()
+            return fn(*args)
+
+        self._admitted += 1
+        self._stats["submitted"] += 1
+        # run in a copy of the caller's context so request-scoped state (profiling) follows the job
+        future = self._get_executor().submit(contextvars.copy_context().run, job)
+        # a slot is freed when the job itself ends, not when its caller gives up,
+        # so timed-out jobs still running keep counting against the limit
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: self._release_from(loop))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except (asyncio.TimeoutError, DeadlineExceeded) as e:
+            # a job still queued is dropped; one already running finishes in the background
+            future.cancel()
+            self._stats["timed_out"] += 1
+            if isinstance(e, DeadlineExceeded):
+                self._stats["expired_in_queue"] += 1
+            raise HTTPException(status_code=504, detail=f"Scoring did not finish within {timeout:g}s")
+        except Exception:
+            self._stats["failed"] += 1
+            raise
+        else:
+            self._stats["completed"] += 1
+            return result
+
+    def _release(self):
+        self._admitted -= 1
+
+    def _release_from(self, loop: asyncio.AbstractEventLoop):
+        # called on the worker thread; the counter belongs to the loop
+        try:
+            loop.call_soon_threadsafe(self._release)
+        except RuntimeError:
+            # loop already closed (shutdown), nothing left to account for
+            pass
+
+    def shutdown(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# Shared by all scoring endpoints
+scoring_pool = ScoringPool()
@@ -0,0 +1,25 @@
+import subprocess
+import sys
+
+# Must stay out of the import path of the API (see benchmarks/import_time.py)
+HEAVY_MODULES = ("pandas", "xgboost", "sklearn", "scipy", "joblib", "geopy")
+
+
+def test_importing_api_does_not_load_heavy_modules():
+    code = (
+        "import sys, src.api.main\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
+
+
+def test_model_loads_on_first_use():
+    code = (
+        "import sys\n"
+        "from src.modeling import inference\n"
+        "assert inference.registry._active is None and 'xgboost' not in sys.modules\n"
+        "assert inference.booster is inference.get_booster()\n"
+        "assert 'xgboost' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
@@ -0,0 +1,57 @@
+import json
+import numpy as np
+import pytest
+from src.api.encoding import (
+    ARROW,
+    COLUMNAR_JSON,
+    JSON,
+    MSGPACK,
+    PredictionColumns,
+    encode_predictions,
+    negotiate,
+)
+
+
+def make_columns():
+    return PredictionColumns(
+        np.array([40.7, 40.8], dtype=np.float32),
+        np.array([-73.9, -73.8], dtype=np.float32),
+        np.array([1, 0], dtype=np.int8),
+        ["Bronx", "Queens"],
+        np.array([0.25, 0.75]),
+        date="2025-05-06",
+    )
+
+
+def test_negotiate():
+    assert negotiate(None) == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate("text/html") == JSON
+    assert negotiate(COLUMNAR_JSON) == COLUMNAR_JSON
+    assert negotiate(f"{JSON};q=0.5, {MSGPACK}") == MSGPACK
+    assert negotiate(f"application/x-msgpack;q=0.2, {ARROW};q=0.9") == ARROW
+    assert negotiate(f"{ARROW};q=0") == JSON
+
+
+def test_columnar_json():
+    response = encode_predictions(COLUMNAR_JSON, make_columns())
+    body = json.loads(response.body)
+    assert response.media_type == COLUMNAR_JSON
+    assert body["date"] == "2025-05-06"
+    assert body["borough"] == ["Queens", "Bronx"]
+    assert body["prob"] == [0.25, 0.75]
+
+
+def test_msgpack():
+    msgpack = pytest.importorskip("msgpack")
+    body = msgpack.unpackb(encode_predictions(MSGPACK, make_columns()).body)
+    assert body["boroughs"] == ["Bronx", "Queens"]
+    assert body["borough_code"] == [1, 0]
+    assert np.allclose(body["lat"], [40.7, 40.8])
+
+
+def test_arrow():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.ipc.open_stream(encode_predictions(ARROW, make_columns()).body).read_all()
+    assert table.column("borough").to_pylist() == ["Queens", "Bronx"]
+    assert np.allclose(table.column("prob").to_numpy(), [0.25, 0.75])
@@ -0,0 +1,65 @@
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+import httpx
+import pytest
+from src.api.fake_open_meteo import FakeOpenMeteo, FakeOpenMeteoConfig
+from src.api.http_client import create_http_client
+from src.api.weather import BOROUGHS, WEATHER_FEATURES, request_hourly_weather
+
+NOW = datetime(2025, 5, 6, 10, 20, tzinfo=ZoneInfo("America/New_York"))
+
+
+def fetch(fake, **overrides):
+    async def run():
+        client = create_http_client(transport=fake.transport(), retry_backoff=0, **overrides)
+        try:
+            return await request_hourly_weather(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def test_hourly_payload_decodes_like_the_real_api():
+    fake = FakeOpenMeteo(FakeOpenMeteoConfig(null_rate=0.1, seed=1))
+    hourly = fetch(fake)
+    assert hourly.boroughs == tuple(BOROUGHS)
+    # past_days=1 + forecast_days=7
+    assert hourly.values.shape == (len(BOROUGHS), 24 * 8, len(WEATHER_FEATURES))
+    # nulls were filled with the defaults
+    assert not (hourly.values != hourly.values).any()
+    assert fake.stats["requests"] == 1
+
+
+def test_current_daily_and_units():
+    status, body = FakeOpenMeteo().respond({
+        "latitude": "40.78",
+        "longitude": "-73.97",
+        "timezone": "America/New_York",
+        "temperature_unit": "fahrenheit",
+        "current": "temperature_2m,wind_speed_10m",
+        "daily": "temperature_2m_max,temperature_2m_min,precipitation_sum",
+        "forecast_days": "3",
+    }, now=NOW)
+    assert status == 200
+    # one location -> a single object
+    assert body["timezone_abbreviation"] == "EDT"
+    assert body["current"]["time"] == "2025-05-06T10:15"
+    assert body["current_units"]["temperature_2m"] == "°F"
+    assert body["daily"]["time"] == ["2025-05-06", "2025-05-07", "2025-05-08"]
+    assert all(hi >= lo for hi, lo in zip(body["daily"]["temperature_2m_max"], body["daily"]["temperature_2m_min"]))
+    assert "hourly" not in body
+
+
+def test_bad_requests_and_injected_errors():
+    fake = FakeOpenMeteo()
+    status, body = fake.respond({"latitude": "40.7", "longitude": "-74.0", "hourly": "not_a_variable"})
+    assert status == 400 and body["error"] is True
+    status, body = fake.respond({"latitude": "40.7", "longitude": "-74.0", "timezone": "Mars/Olympus_Mons"})
+    assert status == 400 and "timezone" in body["reason"]
+
+    fake = FakeOpenMeteo(FakeOpenMeteoConfig(error_rate=1.0, error_status=503))
+    with pytest.raises(httpx.HTTPStatusError):
+        fetch(fake, max_retries=2)
+    # the client retried every injected 503
+    assert fake.stats["errors_injected"] == 3
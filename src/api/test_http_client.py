@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime
+import httpx
+from fastapi.testclient import TestClient
+from src.api.http_client import create_http_client, get_http_client
+from src.api.weather import get_hourly_weather
+from src.api.weather_cache import AsyncTTLCache, weather_cache
+from src.api.weather_refresher import get_weather_snapshot
+from src.api import main, weather
+from src.api.main import app
+
+
+def open_meteo_handler(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        lats = request.url.params["latitude"].split(",")
+        times = [f"2024-03-14T{h:02d}:00" for h in range(24)]
+        return httpx.Response(200, json=[{"hourly": {
+            "time": times,
+            "temperature_2m": [71.0] * 24, "precipitation": [0.1] * 24, "snowfall": [0.0] * 24,
+            "wind_direction_10m": [90.0] * 24, "wind_speed_10m": [8.0] * 24, "pressure_msl": [1015.0] * 24,
+        }} for _ in lats])
+    return handler
+
+
+def test_retries_transient_errors():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"ok": True})
+
+    async def run():
+        client = create_http_client(transport=httpx.MockTransport(handler), max_retries=2, retry_backoff=0)
+        try:
+            return await client.get("https://api.open-meteo.com/v1/forecast")
+        finally:
+            await client.aclose()
+
+    response = asyncio.run(run())
+    assert response.status_code == 200
+    assert len(attempts) == 3
+
+
+def test_per_host_concurrency_cap():
+    active, peak = [0], [0]
+
+    async def handler(request):
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.01)
+        active[0] -= 1
+        return httpx.Response(200)
+
+    async def run():
+        client = create_http_client(transport=httpx.MockTransport(handler), per_host_concurrency=3)
+        try:
+            await asyncio.gather(*[client.get("https://api.open-meteo.com/") for _ in range(12)])
+        finally:
+            await client.aclose()
+
+    asyncio.run(run())
+    assert peak[0] == 3
+
+
+def test_weather_endpoint_uses_injected_client(monkeypatch):
+    # no background refresh, warm-up or model watcher: the test must not need network or a model
+    monkeypatch.setattr(main, "WEATHER_REFRESH_INTERVAL_SECONDS", 0)
+    monkeypatch.setattr(main, "WARMUP_ON_STARTUP", False)
+    monkeypatch.setattr(main, "MODEL_WATCH_INTERVAL_SECONDS", 0)
+    calls = []
+    weather_cache.clear()
+    app.dependency_overrides[get_http_client] = lambda: create_http_client(
+        transport=httpx.MockTransport(open_meteo_handler(calls))
+    )
+    # bypass the background refresher so the request goes through the client
+    app.dependency_overrides[get_weather_snapshot] = lambda: None
+    try:
+        with TestClient(app) as client:
+            response = client.post("/api/weather", json={"datetime": "2024-03-14T12:00:00"})
+    finally:
+        app.dependency_overrides.clear()
+        weather_cache.clear()
+
+    assert response.status_code == 200
+    assert response.json()["borough_weather"]["Queens"]["tavg"] == 71.0
+    # one batched call for all five boroughs
+    assert len(calls) == 1
+
+
+def test_hourly_weather_cache_survives_the_hour_boundary(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(weather, "weather_cache", AsyncTTLCache(ttl=600, stale_ttl=3600, clock=lambda: clock[0]))
+    monkeypatch.setattr(weather, "nyc_now", lambda: datetime(2024, 3, 14, 9, 59))
+    calls = []
+
+    async def run():
+        client = create_http_client(transport=httpx.MockTransport(open_meteo_handler(calls)))
+        try:
+            await get_hourly_weather(client)
+            # a minute later it is a new hour, but the cached horizon still covers it
+            clock[0] += 60
+            monkeypatch.setattr(weather, "nyc_now", lambda: datetime(2024, 3, 14, 10, 0))
+            return await get_hourly_weather(client)
+        finally:
+            await client.aclose()
+
+    hourly = asyncio.run(run())
+    assert hourly.borough_weather("2024-03-14T10:00:00")["Queens"]["tavg"] == 71.0
+    assert len(calls) == 1
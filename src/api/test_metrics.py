@@ -0,0 +1,72 @@
+import asyncio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from src.api import metrics
+from src.api.http_client import create_http_client
+from src.api.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("stage_seconds", "Stage latency", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, stage="predict")
+
+    text = registry.render()
+    assert "# TYPE stage_seconds histogram" in text
+    assert 'stage_seconds_bucket{stage="predict",le="0.1"} 1' in text
+    assert 'stage_seconds_bucket{stage="predict",le="1"} 3' in text
+    assert 'stage_seconds_bucket{stage="predict",le="+Inf"} 4' in text
+    assert 'stage_seconds_count{stage="predict"} 4' in text
+    assert 'stage_seconds_sum{stage="predict"} 4.05' in text
+
+
+def test_counter_labels_and_timer():
+    registry = MetricsRegistry()
+    errors = registry.register(Counter("errors_total", "Errors", ("reason",)))
+    errors.inc(reason="503")
+    errors.inc(2, reason="503")
+    assert errors.value(reason="503") == 3
+    assert 'errors_total{reason="503"} 3' in registry.render()
+    with pytest.raises(ValueError):
+        errors.inc(host="x")
+
+    timer = Histogram("t_seconds", "Timer")
+    with pytest.raises(RuntimeError):
+        with timer.time():
+            raise RuntimeError("boom")
+    # failed blocks are still observed
+    assert timer.count() == 1
+
+
+def test_upstream_errors_and_retries_are_counted():
+    transport = httpx.MockTransport(lambda request: httpx.Response(503))
+
+    async def run():
+        client = create_http_client(transport=transport, max_retries=2, retry_backoff=0)
+        try:
+            return await client.get("https://metrics-test.invalid/x")
+        finally:
+            await client.aclose()
+
+    before_errors = metrics.UPSTREAM_ERRORS.value(host="metrics-test.invalid", reason="503")
+    before_retries = metrics.UPSTREAM_RETRIES.value(host="metrics-test.invalid")
+    assert asyncio.run(run()).status_code == 503
+    assert metrics.UPSTREAM_ERRORS.value(host="metrics-test.invalid", reason="503") == before_errors + 1
+    assert metrics.UPSTREAM_RETRIES.value(host="metrics-test.invalid") == before_retries + 2
+
+
+def test_metrics_endpoint_exposes_request_latency():
+    from src.api.main import app
+
+    # no `with`: the lifespan (weather refresher, warm-up) is not needed here
+    client = TestClient(app)
+    assert client.get("/api/health").status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}' in response.text
+    assert "# TYPE weather_default_fallbacks_total counter" in response.text
+    assert 'scoring_pool{stat="max_workers"}' in response.text
@@ -0,0 +1,78 @@
+import asyncio
+import time
+from fastapi.testclient import TestClient
+from src.api import profiling
+from src.api.metrics import stage
+from src.api.profiling import ProfileCapture, RequestTrace, current_trace, requested_captures
+from src.api.scoring_pool import ScoringPool
+
+
+def test_requested_captures_needs_config_and_token(monkeypatch):
+    headers = {"x-debug-profile": "cpu,memory,bogus"}
+    assert requested_captures(headers, {}) is None
+
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    assert requested_captures(headers, {}) == {"timing", "cpu", "memory"}
+    assert requested_captures({}, {"debug_profile": "1"}) == {"timing"}
+    assert requested_captures({}, {}) is None
+
+    monkeypatch.setattr(profiling, "PROFILING_TOKEN", "s3cret")
+    assert requested_captures(headers, {}) is None
+    assert requested_captures({**headers, "x-profile-token": "s3cret"}, {}) == {"timing", "cpu", "memory"}
+
+
+def test_stages_reach_the_trace_from_scoring_threads():
+    def score():
+        with stage("prediction", "model_predict"):
+            time.sleep(0.01)
+        return 1
+
+    async def run():
+        trace = RequestTrace(frozenset({"timing"}))
+        token = current_trace.set(trace)
+        pool = ScoringPool(max_workers=1, max_queue=1)
+        try:
+            await pool.run(score)
+        finally:
+            current_trace.reset(token)
+            pool.shutdown()
+        return trace
+
+    trace = asyncio.run(run())
+    assert [name for name, _ in trace.stages] == ["model_predict"]
+    header = trace.server_timing()
+    assert header.startswith("model_predict;dur=")
+    assert ", total;dur=" in header
+
+
+def test_capture_writes_profile_and_allocation_snapshot(tmp_path):
+    trace = RequestTrace(frozenset({"timing", "cpu", "memory"}))
+    capture = ProfileCapture(trace, output_dir=tmp_path)
+    assert capture.start()
+    # a second capture has to wait its turn
+    assert not ProfileCapture(RequestTrace(frozenset({"cpu"})), output_dir=tmp_path).start()
+
+    deadline = time.perf_counter() + 0.1
+    blocks = []
+    while time.perf_counter() < deadline:
+        blocks.append(bytearray(1024))
+
+    written = capture.stop()
+    assert {p.name for p in written} == {
+        f"{trace.profile_id}.collapsed", f"{trace.profile_id}.tracemalloc", f"{trace.profile_id}-memory.txt"
+    }
+    assert (tmp_path / f"{trace.profile_id}.collapsed").read_text()
+    assert "test_profiling.py" in (tmp_path / f"{trace.profile_id}-memory.txt").read_text()
+
+
+def test_profiled_request_gets_server_timing(monkeypatch):
+    from src.api.main import app
+
+    client = TestClient(app)
+    assert "server-timing" not in client.get("/api/health", headers={"X-Debug-Profile": "1"}).headers
+
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    response = client.get("/api/health?debug_profile=1")
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("total;dur=")
+    assert response.headers["x-profile-id"]
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from src.api.scoring_pool import ScoringPool
+
+
+def test_runs_off_the_event_loop():
+    pool = ScoringPool(max_workers=2, max_queue=2, deadline=5)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        worker_thread = await pool.run(threading.get_ident)
+        return loop_thread, worker_thread
+
+    loop_thread, worker_thread = asyncio.run(main())
+    assert loop_thread != worker_thread
+    assert pool.stats["completed"] == 1
+    pool.shutdown()
+
+
+def test_rejects_with_503_when_queue_is_full():
+    pool = ScoringPool(max_workers=1, max_queue=1, deadline=5, retry_after=3)
+    release = threading.Event()
+
+    async def main():
+        busy = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(HTTPException) as err:
+            await pool.run(time.sleep, 0)
+        release.set()
+        await asyncio.gather(*busy)
+        return err.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "3"
+    assert pool.stats["rejected"] == 1 and pool.stats["in_flight"] == 0
+    pool.shutdown()
+
+
+def test_deadline_returns_504_and_drops_queued_job():
+    pool = ScoringPool(max_workers=1, max_queue=4, deadline=0.1)
+    release = threading.Event()
+    ran = []
+
+    async def main():
+        slow = asyncio.ensure_future(pool.run(release.wait, deadline=5))
+        await asyncio.sleep(0.02)
+        with pytest.raises(HTTPException) as err:
+            await pool.run(ran.append, 1)
+        release.set()
+        await slow
+        await asyncio.sleep(0.05)
+        return err.value
+
+    error = asyncio.run(main())
+    assert error.status_code == 504
+    assert ran == []  # expired while queued, never executed
+    assert pool.stats["timed_out"] == 1 and pool.stats["in_flight"] == 0
+    pool.shutdown()
+
+
+def test_stream_chunks_are_scored_on_the_pool(monkeypatch):
+    import json
+    import numpy as np
+    from src.api import endpoints
+    from src.preprocessing.intersection_store import IntersectionStore
+
+    store = IntersectionStore(
+        np.linspace(40.6, 40.8, 7, dtype=np.float32), np.linspace(-74.0, -73.8, 7, dtype=np.float32),
+        np.arange(7, dtype=np.int32), np.zeros(7, dtype=np.int8), ["Queens"]
+    )
+    threads, models = set(), []
+
+    def fake_predict(when, lats, *args, model=None):
+        threads.add(threading.current_thread().name)
+        models.append(model)
+        return np.full(len(lats), 0.5, dtype=np.float32)
+
+    model = object()
+    pool = ScoringPool(max_workers=1, max_queue=1, deadline=5)
+    monkeypatch.setattr(endpoints, "scoring_pool", pool)
+    monkeypatch.setattr(endpoints, "predict_accident_arrays", fake_predict)
+
+    async def collect():
+        return [chunk async for chunk in endpoints._stream_predictions("2025-05-06T10:00", store, None, 3, model)]
+
+    chunks = asyncio.run(collect())
+    lines = "".join(chunks).splitlines()
+    assert len(chunks) == 3 and len(lines) == 7
+    assert json.loads(lines[0])["borough"] == "Queens"
+    # one pool job per chunk, all on the pool's worker threads
+    assert pool.stats["completed"] == 3
+    assert all(name.startswith("scoring") for name in threads)
+    # every chunk is scored with the model pinned at the start of the stream
+    assert models == [model] * 3
+    pool.shutdown()
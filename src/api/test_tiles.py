@@ -0,0 +1,48 @@
+from datetime import datetime
+import struct
+import zlib
+import numpy as np
+from src.api.tiles import TILE_SIZE, encode_png, render_tile, snapshot_id, tile_bounds
+
+
+def decode_png(data):
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, idat = 8, b""
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        kind, body = data[pos + 4:pos + 8], data[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            width, height = struct.unpack(">II", body[:8])
+        elif kind == b"IDAT":
+            idat += body
+        pos += 12 + length
+    rows = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, 1 + width * 4)
+    return rows[:, 1:].reshape(height, width, 4)
+
+
+def test_png_round_trip():
+    rgba = np.random.default_rng(0).integers(0, 256, (TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    assert np.array_equal(decode_png(encode_png(rgba)), rgba)
+
+
+def test_render_tile_draws_points_inside_bounds():
+    z, x, y = 12, 1205, 1539
+    south, west, north, east = tile_bounds(z, x, y)
+    lats = np.array([(south + north) / 2, north + 1.0])
+    lons = np.array([(west + east) / 2, east + 1.0])
+
+    rgba = render_tile(z, x, y, lats, lons, np.array([0.9, 0.1]))
+    covered = rgba[..., 3] > 0
+    rows, cols = np.nonzero(covered)
+    # one disc, around the tile centre, in the high-risk colour
+    assert abs(rows.mean() - TILE_SIZE / 2) < 2 and abs(cols.mean() - TILE_SIZE / 2) < 2
+    assert (rgba[covered, 0] > rgba[covered, 1]).all()
+    assert not rgba[~covered].any()
+
+
+def test_snapshot_id_tracks_hour_and_weather():
+    weather = np.ones((5, 6), dtype=np.float32)
+    a = snapshot_id(datetime(2024, 3, 14, 8, 5), weather)
+    assert a == snapshot_id(datetime(2024, 3, 14, 8, 55), weather)
+    assert a != snapshot_id(datetime(2024, 3, 14, 9, 5), weather)
+    assert a != snapshot_id(datetime(2024, 3, 14, 8, 5), weather + 1)
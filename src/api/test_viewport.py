@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from src.api import viewport
+from src.api.viewport import aggregate_to_cells, aggregate_viewport, bbox_zoom, parse_bbox
+
+
+def test_parse_bbox():
+    assert parse_bbox("-74.1,40.6,-73.9,40.8") == (40.6, -74.1, 40.8, -73.9)
+    with pytest.raises(ValueError):
+        parse_bbox("-74.1,40.6,-73.9")
+    with pytest.raises(ValueError):
+        parse_bbox("-73.9,40.6,-74.1,40.8")
+
+
+def test_aggregate_to_cells():
+    lats = np.array([40.701, 40.702, 40.751])
+    lons = np.array([-73.901, -73.902, -73.951])
+    probs = np.array([0.2, 0.6, 0.5])
+
+    lat, lon, count, mean_prob, max_prob = aggregate_to_cells(lats, lons, probs, cell_deg=0.01)
+    order = np.argsort(count)
+    assert count[order].tolist() == [1, 2]
+    assert np.allclose(mean_prob[order], [0.5, 0.4])
+    assert np.allclose(max_prob[order], [0.5, 0.6])
+    assert np.allclose(lat[order], [40.751, 40.7015])
+    assert count.sum() == len(lats)
+
+
+def test_bbox_zoom_bounds_the_claimed_detail():
+    # the whole city fits a screen only at a low zoom, a few blocks at a high one
+    assert bbox_zoom(40.49, -74.26, 40.92, -73.70) <= 12
+    assert bbox_zoom(40.700, -74.000, 40.705, -73.995) >= 16
+    assert bbox_zoom(40.7, -74.0, 40.7, -74.0) == viewport.MAX_ZOOM
+
+
+def test_aggregate_viewport_caps_the_cells(monkeypatch):
+    monkeypatch.setattr(viewport, "VIEWPORT_MAX_POINTS", 50)
+    rng = np.random.default_rng(0)
+    lats, lons = rng.uniform(40.5, 40.9, 5000), rng.uniform(-74.2, -73.7, 5000)
+    # a high zoom would give thousands of cells; it is coarsened until the cap holds
+    zoom, (lat, lon, count, mean_prob, max_prob) = aggregate_viewport(lats, lons, rng.random(5000), 18)
+    assert zoom < 18
+    assert 0 < len(count) <= 50
+    assert count.sum() == 5000
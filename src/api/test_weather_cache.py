@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from src.api.weather_cache import AsyncTTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_fetch(calls, value="sunny", delay=0.01):
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return value
+    return fetch
+
+
+def test_concurrent_misses_trigger_one_upstream_call():
+    cache = AsyncTTLCache(ttl=60, stale_ttl=0)
+    calls = []
+
+    async def run():
+        return await asyncio.gather(*[
+            cache.get_or_fetch(("Queens", "2025-05-06T14"), make_fetch(calls))
+            for _ in range(200)
+        ])
+
+    results = asyncio.run(run())
+    assert results == ["sunny"] * 200
+    assert len(calls) == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["coalesced"] == 199
+
+
+def test_ttl_expiry_and_stale_while_revalidate():
+    clock = FakeClock()
+    cache = AsyncTTLCache(ttl=10, stale_ttl=100, clock=clock)
+    calls = []
+
+    async def run():
+        assert await cache.get_or_fetch("k", make_fetch(calls, "v1")) == "v1"
+        clock.now = 5
+        assert await cache.get_or_fetch("k", make_fetch(calls, "v2")) == "v1"
+        # past the TTL: the stale value is served while a refresh runs
+        clock.now = 20
+        assert await cache.get_or_fetch("k", make_fetch(calls, "v2")) == "v1"
+        await asyncio.sleep(0.05)
+        assert await cache.get_or_fetch("k", make_fetch(calls, "v3")) == "v2"
+        # past TTL + stale window: a blocking refetch
+        clock.now = 500
+        assert await cache.get_or_fetch("k", make_fetch(calls, "v4")) == "v4"
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert cache.stats["stale_hits"] == 1
+
+
+def test_lru_eviction_and_errors_not_cached():
+    cache = AsyncTTLCache(ttl=60, stale_ttl=0, max_entries=2)
+    calls = []
+
+    async def failing():
+        raise RuntimeError("upstream down")
+
+    async def run():
+        await cache.get_or_fetch("a", make_fetch(calls))
+        await cache.get_or_fetch("b", make_fetch(calls))
+        await cache.get_or_fetch("a", make_fetch(calls))
+        await cache.get_or_fetch("c", make_fetch(calls))  # evicts "b"
+        await cache.get_or_fetch("b", make_fetch(calls))
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("d", failing)
+        assert await cache.get_or_fetch("d", make_fetch(calls, "ok")) == "ok"
+
+    asyncio.run(run())
+    assert cache.stats["evictions"] == 3
+    assert cache.stats["upstream_errors"] == 1
+    assert len(calls) == 5
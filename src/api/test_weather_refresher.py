@@ -0,0 +1,68 @@
+import asyncio
+from datetime import datetime
+import httpx
+import numpy as np
+from src.api.http_client import create_http_client
+from src.api.weather import BOROUGHS, WEATHER_FEATURES, decode_hourly_response
+from src.api.weather_refresher import WeatherRefresher
+
+TIMES = [f"2025-05-0{d}T{h:02d}:00" for d in (6, 7) for h in range(24)]
+
+
+def hourly_payload(offset=0.0):
+    # borough b, hour h -> temperature 50 + 10*b + h (+ offset)
+    return [{"hourly": {
+        "time": TIMES,
+        "temperature_2m": [50.0 + 10 * b + h + offset for h in range(len(TIMES))],
+        "precipitation": [0.1] * len(TIMES),
+        "snowfall": [None] * len(TIMES),
+        "wind_direction_10m": [180.0] * len(TIMES),
+        "wind_speed_10m": [5.0] * len(TIMES),
+        "pressure_msl": [1012.0] * len(TIMES),
+    }} for b in range(len(BOROUGHS))]
+
+
+def test_decode_hourly_response():
+    hourly = decode_hourly_response(hourly_payload(), list(BOROUGHS))
+    assert hourly.values.shape == (len(BOROUGHS), len(TIMES), len(WEATHER_FEATURES))
+    assert hourly.values.dtype == np.float32
+    assert not hourly.values.flags.writeable
+
+    weather = hourly.borough_weather(datetime(2025, 5, 7, 3))
+    queens = list(BOROUGHS).index("Queens")
+    assert weather["Queens"]["tavg"] == 50.0 + 10 * queens + 27
+    assert weather["Queens"]["tmin"] == 50.0 + 10 * queens + 24
+    # missing readings are filled with defaults
+    assert weather["Queens"]["snow"] == 0.0
+    assert np.array_equal(hourly.at("2025-05-06T05:00")[:, 0], hourly.values[:, 5, 0])
+
+
+def test_refresh_publishes_and_keeps_last_good_snapshot():
+    state = {"down": False}
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if state["down"]:
+            return httpx.Response(500)
+        return httpx.Response(200, json=hourly_payload())
+
+    async def run():
+        client = create_http_client(transport=httpx.MockTransport(handler), max_retries=0)
+        refresher = WeatherRefresher(client, interval=0)
+        try:
+            assert refresher.snapshot is None
+            assert await refresher.refresh_once()
+            first = refresher.snapshot
+
+            state["down"] = True
+            assert not await refresher.refresh_once()
+            assert refresher.snapshot is first
+            return first
+        finally:
+            await client.aclose()
+
+    snapshot = asyncio.run(run())
+    assert len(calls) == 2
+    assert snapshot.hourly.borough_weather("2025-05-06T00:00")["Manhattan"]["tavg"] == 50.0
+    assert snapshot.age_seconds() >= 0
@@ -0,0 +1,148 @@
+import os
+import math
+import struct
+import zlib
+import hashlib
+from datetime import datetime
+from typing import Tuple
+import numpy as np
+from .weather_cache import AsyncTTLCache
+
+TILE_SIZE = 256
+# Deepest zoom a tile may be requested at
+TILE_MAX_ZOOM = 18
+
+# Rendered PNGs kept in memory, keyed by (prediction snapshot, z, x, y)
+TILE_CACHE_MAX_ENTRIES = int(os.getenv("TILE_CACHE_MAX_ENTRIES", "4096"))
+# Full-city prediction arrays kept in memory, one per (model, hour, weather) snapshot
+TILE_SNAPSHOT_MAX_ENTRIES = int(os.getenv("TILE_SNAPSHOT_MAX_ENTRIES", "4"))
+# Snapshots and tiles are keyed by content, so they only expire through LRU eviction
+_NEVER = float("inf")
+
+tile_cache = AsyncTTLCache(ttl=_NEVER, stale_ttl=0.0, max_entries=TILE_CACHE_MAX_ENTRIES)
+snapshot_cache = AsyncTTLCache(ttl=_NEVER, stale_ttl=0.0, max_entries=TILE_SNAPSHOT_MAX_ENTRIES)
+
+# Probability -> colour ramp, matching the webapp's green/orange/red marker thresholds
+_RAMP_STOPS = np.array([0.0, 0.3, 0.7, 1.0])
+_RAMP_COLORS = np.array([
+    [26, 152, 80],
+    [254, 224, 139],
+    [244, 109, 67],
+    [215, 25, 28],
+], dtype=np.float64)
+_ALPHA = 200
+
+
+def snapshot_id(when: datetime, weather: np.ndarray, model_version: str = "") -> str:
+    """
+    Identifier for the predictions of one hour under one weather matrix
+    and model version.
+
+    Minutes are dropped because the model only sees the hour; the weather
+    digest changes whenever a refresh brings new values for that hour.
+    """
+    digest = hashlib.sha1(np.ascontiguousarray(weather, dtype=np.float32).tobytes()).hexdigest()[:12]
+    return f"{model_version}-{when.strftime('%Y-%m-%dT%H')}-{digest}".lstrip("-")
+
+
+def validate_tile(z: int, x: int, y: int):
+    if not 0 <= z <= TILE_MAX_ZOOM:
+        raise ValueError(f"Zoom must be between 0 and {TILE_MAX_ZOOM}")
+    if not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise ValueError(f"Tile {x}/{y} is outside zoom level {z}")
+
+
+def _mercator_pixels(lats: np.ndarray, lons: np.ndarray, z: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Global Web Mercator pixel coordinates at zoom z"""
+    scale = TILE_SIZE * 2 ** z
+    lat_rad = np.radians(np.asarray(lats, dtype=np.float64))
+    px = (np.asarray(lons, dtype=np.float64) + 180.0) / 360.0 * scale
+    py = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / math.pi) / 2.0 * scale
+    return px, py
+
+
+def _pixel_to_lat(py: float, z: int) -> float:
+    n = math.pi - 2.0 * math.pi * py / (TILE_SIZE * 2 ** z)
+    return math.degrees(math.atan(math.sinh(n)))
+
+
+def _pixel_to_lon(px: float, z: int) -> float:
+    return px / (TILE_SIZE * 2 ** z) * 360.0 - 180.0
+
+
+def point_radius(z: int) -> int:
+    """Marker radius in pixels: one pixel when zoomed out, growing to a disc when zoomed in"""
+    return int(min(max(2 ** (z - 11), 1), 12))
+
+
+def tile_bounds(z: int, x: int, y: int, margin: int = 0) -> Tuple[float, float, float, float]:
+    """(south, west, north, east) of a tile, grown by `margin` pixels on every side"""
+    x0, y0 = x * TILE_SIZE - margin, y * TILE_SIZE - margin
+    x1, y1 = (x + 1) * TILE_SIZE + margin, (y + 1) * TILE_SIZE + margin
+    return _pixel_to_lat(y1, z), _pixel_to_lon(x0, z), _pixel_to_lat(y0, z), _pixel_to_lon(x1, z)
+
+
+def _disc_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    dy, dx = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    inside = dx * dx + dy * dy <= radius * radius
+    return dy[inside], dx[inside]
+
+
+def render_tile(z: int, x: int, y: int, lats: np.ndarray, lons: np.ndarray, probabilities: np.ndarray) -> np.ndarray:
+    """
+    Rasterize point probabilities into one RGBA tile.
+
+    Every point is drawn as a disc of point_radius(z) pixels; where discs
+    overlap the pixel shows the highest probability. Pixels without any
+    point stay transparent.
+
+    Args:
+        z, x, y: Tile coordinates
+        lats, lons, probabilities: Points to draw (already narrowed to the tile plus margin)
+
+    Returns:
+        (256, 256, 4) uint8 array
+    """
+    risk = np.full(TILE_SIZE * TILE_SIZE, -1.0)
+    if len(lats):
+        px, py = _mercator_pixels(lats, lons, z)
+        col = np.floor(px - x * TILE_SIZE).astype(np.int64)
+        row = np.floor(py - y * TILE_SIZE).astype(np.int64)
+
+        dy, dx = _disc_offsets(point_radius(z))
+        rows = (row[:, None] + dy[None, :]).ravel()
+        cols = (col[:, None] + dx[None, :]).ravel()
+        values = np.repeat(np.asarray(probabilities, dtype=np.float64), len(dy))
+        on_tile = (rows >= 0) & (rows < TILE_SIZE) & (cols >= 0) & (cols < TILE_SIZE)
+        np.maximum.at(risk, rows[on_tile] * TILE_SIZE + cols[on_tile], values[on_tile])
+
+    risk = risk.reshape(TILE_SIZE, TILE_SIZE)
+    covered = risk >= 0
+    rgba = np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(risk, _RAMP_STOPS, _RAMP_COLORS[:, channel]).round().astype(np.uint8)
+    rgba[..., 3] = np.where(covered, _ALPHA, 0)
+    rgba[~covered, :3] = 0
+    return rgba
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (h, w, 4) uint8 array as an 8-bit RGBA PNG (no Pillow needed)"""
+    height, width, _ = rgba.shape
+    # filter type 0 (None) in front of every scanline
+    scanlines = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, width * 4)], axis=1)
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(scanlines.tobytes(), 6))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+# Tiles with no intersections on them are all identical
+EMPTY_TILE = encode_png(np.zeros((TILE_SIZE, TILE_SIZE, 4), dtype=np.uint8))
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.api.training.training_data import TRAINING_COLUMNS, convert_csv_to_parquet, load_training_frame
+
+pytest.importorskip("pyarrow")
+
+
+def write_csv(path, n=10, **overrides):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "crash_date": [f"{2021 + i % 2}-0{1 + i % 9}-15T00:00:00.000" for i in range(n)],
+        "crash_time": [f"{i % 24}:{(7 * i) % 60:02d}" for i in range(n)],
+        "day_of_week": [i % 7 for i in range(n)],
+        "month": [1 + i % 9 for i in range(n)],
+        "is_weekend": [str(i % 7 >= 5) for i in range(n)],
+        "tavg": rng.uniform(-5, 30, n),
+        "prcp": rng.uniform(0, 5, n),
+        "snow": np.zeros(n),
+        "wdir": rng.uniform(0, 360, n),
+        "wspd": rng.uniform(0, 40, n),
+        "pres": rng.uniform(990, 1030, n),
+        "nearest_intersection_lat": rng.uniform(40.5, 40.9, n),
+        "nearest_intersection_lon": rng.uniform(-74.2, -73.7, n),
+        "nearest_intersection_id": np.arange(n) + 1000,
+        "is_crash": [i % 2 for i in range(n)],
+        "unused_text": ["ignored"] * n,
+    })
+    for column, values in overrides.items():
+        df[column] = values
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_conversion_round_trip(tmp_path):
+    raw = write_csv(tmp_path / "train.csv")
+    out = convert_csv_to_parquet(tmp_path / "train.csv", tmp_path / "train.parquet", chunk_rows=3)
+    assert sorted(p.name for p in out.iterdir()) == ["year=2021", "year=2022"]
+
+    df = load_training_frame(out).sort_values("nearest_intersection_id").reset_index(drop=True)
+    assert list(df.columns) == TRAINING_COLUMNS
+    assert df["hour"].dtype == pd.Int8Dtype()
+    assert df["tavg"].dtype == np.float32
+    assert df["nearest_intersection_id"].dtype == pd.Int32Dtype()
+    assert df["hour"].tolist() == [i % 24 for i in range(10)]
+    assert df["is_weekend"].tolist() == [int(i % 7 >= 5) for i in range(10)]
+    np.testing.assert_allclose(df["tavg"], raw["tavg"].astype(np.float32))
+
+    only_2022 = load_training_frame(out, columns=["hour", "is_crash"], years=[2022])
+    assert list(only_2022.columns) == ["hour", "is_crash"]
+    assert len(only_2022) == 5
+
+
+def test_missing_integer_values_keep_one_schema(tmp_path):
+    # a gap in one chunk only must not give that file a different schema
+    write_csv(tmp_path / "train.csv", month=[1, 2, 3, 4, None, 6, 7, 8, 9, 1])
+    out = convert_csv_to_parquet(tmp_path / "train.csv", tmp_path / "train.parquet", chunk_rows=3)
+    df = load_training_frame(out)
+    assert len(df) == 10
+    assert df["month"].isna().sum() == 1
+    # nullable Int8 from every file, not float64 for the one with the gap
+    assert df["month"].dtype == pd.Int8Dtype()
+
+
+def test_missing_time_and_unknown_flags_become_nulls(tmp_path):
+    write_csv(
+        tmp_path / "train.csv",
+        crash_time=["0:05", None, "2:10", "3:15", "4:20", "5:25", "6:30", "7:35", "8:40", "9:45"],
+        is_weekend=["True", "False", "maybe", "False", "False", "True", None, "False", "False", "False"],
+    )
+    out = convert_csv_to_parquet(tmp_path / "train.csv", tmp_path / "train.parquet", chunk_rows=3)
+    df = load_training_frame(out).sort_values("nearest_intersection_id").reset_index(drop=True)
+    assert df["hour"].dtype == pd.Int8Dtype()
+    assert df["hour"].isna().tolist() == [i == 1 for i in range(10)]
+    assert df["hour"].iloc[9] == 9
+    assert df["is_weekend"].isna().tolist() == [i in (2, 6) for i in range(10)]
+    assert df["is_weekend"].iloc[5] == 1
+
+
+def test_missing_columns_are_reported(tmp_path):
+    write_csv(tmp_path / "train.csv").drop(columns=["pres"]).to_csv(tmp_path / "bad.csv", index=False)
+    with pytest.raises(ValueError, match="pres"):
+        convert_csv_to_parquet(tmp_path / "bad.csv", tmp_path / "out")
+    assert not (tmp_path / "out").exists()
@@ -1,21 +1,27 @@
 # src/models/train_xgb.py
 
 import os
+import sys
 import joblib
-import pandas as pd
 from xgboost import XGBClassifier
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+from src.modeling.calibration import QuantileCalibrator
+from src.modeling.model_registry import MODELS_DIR, write_model_version
+from src.api.training.training_data import TARGET_COLUMN, convert_csv_to_parquet, load_training_frame
+
 # for reproducibility
 RANDOM_SEED = 1
 
 path = "../../../data/final_balanced.csv"
-# 1) Load your historical CSV (with correct path)
-df = pd.read_csv(path, parse_dates=["crash_date"])
+parquet_path = "../../../data/final_balanced.parquet"
 
-# 2) Derive 'hour' from crash_time
-df["hour"] = pd.to_datetime(df["crash_time"], format="%H:%M").dt.hour
+# 1) Convert the historical CSV (streamed in chunks) to partitioned Parquet
+#    with compact dtypes and 'hour' precomputed; only redone when the CSV changes
+if os.path.exists(path) and (not os.path.exists(parquet_path) or os.path.getmtime(path) > os.path.getmtime(parquet_path)):
+    convert_csv_to_parquet(path, parquet_path)
 
-# 3) Define features + target
+# 2) Define features + target
 feature_columns = [
     "hour",
     "day_of_week",
@@ -31,8 +37,13 @@ feature_columns = [
     "nearest_intersection_lon",
     "nearest_intersection_id"
 ]
+
+# 3) Read only those columns (nullable Int8/Int32, float32) instead of the whole CSV;
+#    missing feature values are left to XGBoost, rows without a label are dropped
+df = load_training_frame(parquet_path, columns=feature_columns + [TARGET_COLUMN])
+df = df.dropna(subset=[TARGET_COLUMN])
 X = df[feature_columns]
-y = df["is_crash"]  # 0/1 target
+y = df[TARGET_COLUMN].astype("int8")  # 0/1 target
 
 # 4) Instantiate the classifier with the same parameters you used for xgboost.train
 model = XGBClassifier(
@@ -53,3 +64,19 @@ model.fit(X, y, verbose=True)
 os.makedirs("models", exist_ok=True)
 joblib.dump(model, "models/xgb_clf_full.joblib")
 print("✅ Model trained on full data and saved to models/xgb_clf_full.joblib")
+
+# 7) Learn the probability calibration once, on the training scores, and
+#    persist it next to the model so inference only needs a lookup table
+calibrator = QuantileCalibrator.fit(model.predict_proba(X)[:, 1])
+calibrator.save("models/xgb_clf_full.calibration.json")
+print("✅ Calibration saved to models/xgb_clf_full.calibration.json")
+
+# 8) Export the native Booster (UBJSON) with a manifest as a new registry
+#    version; running servers pick it up without a restart
+version_dir = write_model_version(
+    model.get_booster(),
+    calibrator,
+    MODELS_DIR,
+    extra={"training_rows": int(len(X)), "random_seed": RANDOM_SEED}
+)
+print(f"✅ Model version exported to {version_dir}")
@@ -0,0 +1,211 @@
+# src/api/training/training_data.py
+
+"""
+Training data as partitioned Parquet.
+
+The crash history CSV is streamed in chunks, reduced to the model features
+plus the target with compact dtypes (hour precomputed from crash_time), and
+written as one Parquet file per chunk and crash year:
+
+    <output>/year=2021/part-00000.parquet
+    <output>/year=2022/part-00001.parquet ...
+
+Training then reads just the columns it needs. Needs `pyarrow`
+(`pip install -e .[training]`).
+
+    python src/api/training/training_data.py --csv data/final_balanced.csv --output data/final_balanced.parquet
+"""
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir))
+from src.modeling.features import FEATURE_COLUMNS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TARGET_COLUMN = "is_crash"
+TRAINING_COLUMNS = FEATURE_COLUMNS + [TARGET_COLUMN]
+# Rows parsed per CSV chunk (bounds peak memory of the conversion)
+CSV_CHUNK_ROWS = int(os.getenv("TRAINING_CSV_CHUNK_ROWS", "500000"))
+
+# Stored dtype of every training column. XGBoost trains on float32 anyway,
+# so float32 features lose nothing; small integers fit in int8.
+COLUMN_DTYPES: Dict[str, str] = {
+    "hour": "int8",
+    "day_of_week": "int8",
+    "month": "int8",
+    "is_weekend": "int8",
+    "tavg": "float32",    # °C
+    "prcp": "float32",    # mm
+    "snow": "float32",    # mm
+    "wdir": "float32",    # °
+    "wspd": "float32",    # km/h
+    "pres": "float32",    # hPa
+    "nearest_intersection_lat": "float32",
+    "nearest_intersection_lon": "float32",
+    "nearest_intersection_id": "int32",
+    TARGET_COLUMN: "int8",
+}
+_FLOAT_COLUMNS = [c for c, dtype in COLUMN_DTYPES.items() if dtype == "float32"]
+# Spellings of a 0/1 flag in the CSV; anything else is treated as missing
+_FLAG_VALUES = {"true": 1, "false": 0, "1": 1, "0": 0, "1.0": 1, "0.0": 0}
+
+
+def _hour_from_time(crash_time: "pd.Series") -> "pd.Series":
+    """Hour of "H:MM" / "HH:MM" strings, without a full datetime parse (<NA> if missing or malformed)"""
+    import pandas as pd
+
+    return pd.to_numeric(crash_time.astype(str).str.partition(":")[0], errors="coerce").astype("Int8")
+
+
+def _flag(values: "pd.Series") -> "pd.Series":
+    """0/1 from a bool, numeric or "True"/"False" column (<NA> for anything else)"""
+    if values.dtype == object:
+        values = values.astype(str).str.lower().map(_FLAG_VALUES)
+    else:
+        values = values.where(values.isin([0, 1]))
+    return values.astype("Int8")
+
+
+def prepare_chunk(chunk: "pd.DataFrame") -> "pd.DataFrame":
+    """
+    Training columns of one raw CSV chunk, in COLUMN_DTYPES.
+
+    Integer columns are nullable, so a chunk with missing or unreadable
+    values writes the same Parquet schema as every other chunk.
+    """
+    import pandas as pd
+
+    columns = {}
+    for name in TRAINING_COLUMNS:
+        dtype = COLUMN_DTYPES[name]
+        if name == "hour" and "hour" not in chunk:
+            columns[name] = _hour_from_time(chunk["crash_time"])
+        elif name in ("is_weekend", TARGET_COLUMN):
+            columns[name] = _flag(chunk[name])
+        elif dtype == "float32":
+            columns[name] = chunk[name].to_numpy(dtype=np.float32)
+        else:
+            # "int8" -> pandas' nullable "Int8", stored as int8 with a null bitmap
+            columns[name] = chunk[name].astype(dtype.capitalize())
+    return pd.DataFrame(columns)
+
+
+def _years(chunk: "pd.DataFrame") -> np.ndarray:
+    import pandas as pd
+
+    if "crash_date" not in chunk:
+        return np.zeros(len(chunk), dtype=np.int16)
+    dates = pd.to_datetime(chunk["crash_date"], errors="coerce", format="ISO8601")
+    return dates.dt.year.fillna(0).astype(np.int16).to_numpy()
+
+
+def convert_csv_to_parquet(csv_path, output, chunk_rows: int = CSV_CHUNK_ROWS) -> Path:
+    """
+    Stream a training CSV into a Parquet dataset partitioned by crash year.
+
+    Args:
+        csv_path: Raw crash history CSV (crash_date, crash_time, features, is_crash)
+        output: Destination directory (replaced atomically if it exists)
+        chunk_rows: Rows parsed at a time
+
+    Returns:
+        Path of the written dataset
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output = Path(output)
+    header = set(pd.read_csv(csv_path, nrows=0).columns)
+    # hour is derived from crash_time unless the CSV already has it
+    required = [c for c in TRAINING_COLUMNS if c != "hour"] + (["hour"] if "hour" in header else ["crash_time"])
+    missing = [c for c in required if c not in header]
+    if missing:
+        raise ValueError(f"{csv_path} is missing columns: {', '.join(missing)}")
+    # crash_date only decides the partition
+    source_columns = required + (["crash_date"] if "crash_date" in header else [])
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{output.name}-", dir=output.parent))
+    rows = 0
+    try:
+        # parse floats straight into float32, everything else is fixed up per chunk
+        reader = pd.read_csv(
+            csv_path,
+            usecols=source_columns,
+            dtype={c: np.float32 for c in _FLOAT_COLUMNS if c in source_columns},
+            chunksize=chunk_rows,
+        )
+        for i, chunk in enumerate(reader):
+            prepared = prepare_chunk(chunk)
+            years = _years(chunk)
+            for year in np.unique(years):
+                part = prepared[years == year]
+                partition = tmp_dir / f"year={year}"
+                partition.mkdir(exist_ok=True)
+                pq.write_table(pa.Table.from_pandas(part, preserve_index=False), partition / f"part-{i:05d}.parquet")
+            rows += len(prepared)
+            logger.info(f"Converted {rows} rows")
+
+        if output.exists():
+            shutil.rmtree(output)
+        os.replace(tmp_dir, output)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    logger.info(f"Wrote {rows} training rows to {output}")
+    return output
+
+
+def load_training_frame(path, columns: Optional[Sequence[str]] = None, years: Optional[List[int]] = None) -> "pd.DataFrame":
+    """
+    Read only `columns` (default: features + target) of a dataset written by
+    convert_csv_to_parquet.
+
+    Float columns come back as float32 and integer columns as pandas'
+    nullable Int8/Int32, whether or not a column has missing values.
+
+    Args:
+        path: Dataset directory
+        columns: Columns to read
+        years: Only these crash-year partitions (default: all)
+    """
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(str(path), format="parquet", partitioning="hive")
+    row_filter = ds.field("year").isin(years) if years is not None else None
+    table = dataset.to_table(columns=list(columns or TRAINING_COLUMNS), filter=row_filter)
+    # integers map to nullable dtypes here rather than through the pandas metadata of
+    # whichever file came first (plain NumPy ints with nulls would turn into float64)
+    nullable = {pa.int8(): pd.Int8Dtype(), pa.int16(): pd.Int16Dtype(), pa.int32(): pd.Int32Dtype()}
+    # hand the Arrow buffers over column by column instead of holding two full copies
+    return table.to_pandas(split_blocks=True, self_destruct=True, ignore_metadata=True, types_mapper=nullable.get)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the training CSV to partitioned Parquet")
+    parser.add_argument("--csv", required=True, help="crash history CSV")
+    parser.add_argument("--output", required=True, help="output dataset directory")
+    parser.add_argument("--chunk-rows", type=int, default=CSV_CHUNK_ROWS)
+    args = parser.parse_args()
+    convert_csv_to_parquet(args.csv, args.output, chunk_rows=args.chunk_rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import os
+import math
+from typing import Tuple
+import numpy as np
+
+# Most points (or cells) a viewport response holds, whatever zoom the client sends
+VIEWPORT_MAX_POINTS = int(os.getenv("VIEWPORT_MAX_POINTS", "2000"))
+# Aggregation cell edge on screen, in pixels of a 256px web-map tile
+VIEWPORT_CELL_PIXELS = 32
+# Largest screen edge a viewport is assumed to cover; bounds the zoom a bbox can claim
+VIEWPORT_SCREEN_PIXELS = 2048
+MAX_ZOOM = 22
+
+
+def parse_bbox(bbox: str) -> Tuple[float, float, float, float]:
+    """Parse 'west,south,east,north' into (south, west, north, east)"""
+    try:
+        west, south, east, north = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise ValueError("bbox must be 'west,south,east,north' in degrees")
+    if north < south or east < west:
+        raise ValueError("bbox must satisfy south <= north and west <= east")
+    return south, west, north, east
+
+
+def cell_size_deg(zoom: int) -> float:
+    """Edge length in degrees of an aggregation cell at a web-map zoom level"""
+    return 360.0 / (256 * 2 ** zoom) * VIEWPORT_CELL_PIXELS
+
+
+def bbox_zoom(south: float, west: float, north: float, east: float) -> int:
+    """Highest web-map zoom at which the bbox still fits on a VIEWPORT_SCREEN_PIXELS screen"""
+    span = max(north - south, east - west)
+    if span <= 0:
+        return MAX_ZOOM
+    return max(0, min(MAX_ZOOM, math.floor(math.log2(360.0 * VIEWPORT_SCREEN_PIXELS / (256 * span)))))
+
+
+def should_aggregate(n_points: int) -> bool:
+    return n_points > VIEWPORT_MAX_POINTS
+
+
+def aggregate_to_cells(lats: np.ndarray, lons: np.ndarray, probabilities: np.ndarray, cell_deg: float):
+    """
+    Bin points into a square lat/lon grid and summarise each occupied cell.
+
+    Returns:
+        Tuple of (lat, lon, count, mean_probability, max_probability) arrays,
+        one entry per occupied cell; lat/lon are the cell's mean point position
+    """
+    if len(lats) == 0:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=np.int64), empty, empty
+
+    rows = np.floor(np.asarray(lats, dtype=np.float64) / cell_deg).astype(np.int64)
+    cols = np.floor(np.asarray(lons, dtype=np.float64) / cell_deg).astype(np.int64)
+    _, cell = np.unique(np.stack((rows, cols), axis=1), axis=0, return_inverse=True)
+    cell = cell.ravel()
+
+    count = np.bincount(cell)
+    mean_lat = np.bincount(cell, weights=lats) / count
+    mean_lon = np.bincount(cell, weights=lons) / count
+    mean_prob = np.bincount(cell, weights=probabilities) / count
+    max_prob = np.full(len(count), -np.inf)
+    np.maximum.at(max_prob, cell, probabilities)
+    return mean_lat, mean_lon, count, mean_prob, max_prob
+
+
+def aggregate_viewport(lats: np.ndarray, lons: np.ndarray, probabilities: np.ndarray, zoom: int):
+    """
+    aggregate_to_cells at the cell size of `zoom`, coarsened one zoom level
+    at a time until at most VIEWPORT_MAX_POINTS cells remain.
+
+    Returns:
+        Tuple of (zoom the cells were built at, aggregate_to_cells result)
+    """
+    cells = aggregate_to_cells(lats, lons, probabilities, cell_size_deg(zoom))
+    while len(cells[2]) > VIEWPORT_MAX_POINTS and zoom > 0:
+        zoom -= 1
+        cells = aggregate_to_cells(lats, lons, probabilities, cell_size_deg(zoom))
+    return zoom, cells
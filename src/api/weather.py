@@ -0,0 +1,198 @@
+import os
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+from zoneinfo import ZoneInfo
+import numpy as np
+from src.modeling.features import WEATHER_FEATURES
+from .weather_cache import weather_cache
+from .http_client import UpstreamClient
+from .metrics import should_log_payload
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Forecast endpoint; point it at src/api/fake_open_meteo.py for offline load tests
+OPEN_METEO_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+
+BOROUGHS = {
+    "Manhattan": (40.776676, -73.971321),
+    "Brooklyn": (40.650002, -73.949997),
+    "Queens": (40.742054, -73.769417),
+    "Staten Island": (40.579021, -74.151535),
+    "Bronx": (40.837048, -73.865433)
+}
+
+NYC_TZ = ZoneInfo("America/New_York")
+
+# Hourly horizon fetched in one call: yesterday (so "now" is always covered) + 7 days
+PAST_DAYS = 1
+FORECAST_DAYS = 7
+# One cache entry for the whole horizon: it spans hour boundaries, so TTL and
+# stale-while-revalidate decide when to refetch rather than the clock
+HOURLY_CACHE_KEY = ("hourly",)
+
+# Model weather feature -> Open-Meteo hourly variable
+HOURLY_VARIABLES = {
+    "tavg": "temperature_2m",
+    "prcp": "precipitation",
+    "snow": "snowfall",
+    "wdir": "wind_direction_10m",
+    "wspd": "wind_speed_10m",
+    "pres": "pressure_msl",
+}
+
+# Fallback weather (same order as WEATHER_FEATURES) for missing readings, unreachable
+# upstream and the reference sample the startup calibration is fitted on
+DEFAULT_VALUES = np.array([60.0, 0.0, 0.0, 180.0, 10.0, 1010.0], dtype=np.float32)
+
+# Units the model was trained on
+UNIT_PARAMS = {
+    "timezone": "America/New_York",
+    "temperature_unit": "fahrenheit",
+    "wind_speed_unit": "mph",
+    "precipitation_unit": "inch",
+}
+
+
+def nyc_now() -> datetime:
+    """Current wall-clock time in New York, as a naive datetime like the API's timestamps"""
+    return datetime.now(NYC_TZ).replace(tzinfo=None)
+
+
+def default_weather(borough: str) -> Dict[str, Any]:
+    """Fallback values used when no weather is available for a borough"""
+    weather = {name: float(value) for name, value in zip(WEATHER_FEATURES, DEFAULT_VALUES)}
+    return {
+        **weather,
+        "tmin": weather["tavg"] - 10.0,
+        "tmax": weather["tavg"] + 10.0,
+        "weather_borough": borough
+    }
+
+
+@dataclass(frozen=True)
+class HourlyWeather:
+    """
+    Hourly weather for all boroughs from one Open-Meteo call.
+
+    `values` is a read-only float32 array indexed [borough, hour, feature]
+    with features in WEATHER_FEATURES order; `times` holds the local
+    (America/New_York) hour of each column as datetime64[h].
+    """
+    boroughs: Tuple[str, ...]
+    times: np.ndarray
+    values: np.ndarray
+
+    def hour_index(self, when: Union[datetime, str, None] = None) -> int:
+        """
+        Column of `when` in the hourly arrays. Times outside the fetched
+        horizon use the current hour, like the old 'current conditions' call.
+        """
+        if isinstance(when, str):
+            when = datetime.fromisoformat(when)
+        if when is not None:
+            target = np.datetime64(when.replace(tzinfo=None), "h")
+            idx = int(np.searchsorted(self.times, target))
+            if idx < len(self.times) and self.times[idx] == target:
+                return idx
+        idx = int(np.searchsorted(self.times, np.datetime64(nyc_now(), "h"), side="right")) - 1
+        return min(max(idx, 0), len(self.times) - 1)
+
+    def at(self, when: Union[datetime, str, None] = None) -> np.ndarray:
+        """[borough, feature] weather for one hour (a view, no copy)"""
+        return self.values[:, self.hour_index(when), :]
+
+    def stack(self, times: Sequence[Union[datetime, str]], boroughs: Sequence[str]) -> np.ndarray:
+        """[time, borough, feature] weather for several hours, rows in `boroughs` order"""
+        rows = [self.boroughs.index(b) for b in boroughs]
+        cols = [self.hour_index(t) for t in times]
+        return self.values[np.ix_(rows, cols)].transpose(1, 0, 2)
+
+    def borough_weather(self, when: Union[datetime, str, None] = None) -> Dict[str, Dict[str, Any]]:
+        """Per-borough feature dicts for one hour, in the format the endpoints return"""
+        idx = self.hour_index(when)
+        # tmin/tmax from that calendar day's hourly temperatures
+        day = self.times[idx].astype("datetime64[D]")
+        same_day = self.times.astype("datetime64[D]") == day
+        temps = self.values[:, same_day, WEATHER_FEATURES.index("tavg")]
+
+        weather = {}
+        for b, borough in enumerate(self.boroughs):
+            features = {name: float(v) for name, v in zip(WEATHER_FEATURES, self.values[b, idx])}
+            features["tmin"] = float(temps[b].min())
+            features["tmax"] = float(temps[b].max())
+            features["weather_borough"] = borough
+            weather[borough] = features
+        return weather
+
+
+def decode_hourly_response(payload, boroughs: Sequence[str]) -> HourlyWeather:
+    """
+    Decode a (multi-location) Open-Meteo hourly response into HourlyWeather.
+
+    Open-Meteo returns a list with one object per requested location (or a
+    single object for one location), in request order.
+    """
+    locations = payload if isinstance(payload, list) else [payload]
+    if len(locations) != len(boroughs):
+        raise ValueError(f"Expected {len(boroughs)} locations from Open-Meteo, got {len(locations)}")
+
+    times = np.array(locations[0]["hourly"]["time"], dtype="datetime64[h]")
+    values = np.empty((len(boroughs), len(times), len(WEATHER_FEATURES)), dtype=np.float32)
+    for b, location in enumerate(locations):
+        hourly = location["hourly"]
+        for f, feature in enumerate(WEATHER_FEATURES):
+            variable = HOURLY_VARIABLES[feature]
+            # None -> NaN, then fill gaps with the defaults
+            column = np.array(hourly.get(variable) or [np.nan] * len(times), dtype=np.float32)
+            if len(column) != len(times):
+                raise ValueError(f"Open-Meteo returned {len(column)} '{variable}' values for {len(times)} hours")
+            values[b, :, f] = column
+    values = np.where(np.isnan(values), DEFAULT_VALUES, values)
+    values.setflags(write=False)
+    times.setflags(write=False)
+    return HourlyWeather(boroughs=tuple(boroughs), times=times, values=values)
+
+
+async def request_hourly_weather(client: UpstreamClient) -> HourlyWeather:
+    """One Open-Meteo call for the hourly horizon of every borough; raises on any upstream error"""
+    lats, lons = zip(*BOROUGHS.values())
+    params = {
+        "latitude": ",".join(str(lat) for lat in lats),
+        "longitude": ",".join(str(lon) for lon in lons),
+        **UNIT_PARAMS,
+        "hourly": ",".join(HOURLY_VARIABLES.values()),
+        "past_days": PAST_DAYS,
+        "forecast_days": FORECAST_DAYS,
+    }
+
+    logger.info(f"Fetching hourly weather for {len(BOROUGHS)} boroughs")
+    # payloads are large; only logged when LOG_UPSTREAM_PAYLOADS is on, for a sample of calls
+    log_payload = should_log_payload()
+    if log_payload:
+        logger.info(f"Request params: {params}")
+
+    response = await client.get(OPEN_METEO_URL, params=params)
+    response.raise_for_status()
+    if log_payload:
+        logger.info(f"Open-Meteo response ({len(response.content)} bytes): {response.text[:2000]}")
+    return decode_hourly_response(response.json(), list(BOROUGHS))
+
+
+async def get_hourly_weather(client: UpstreamClient) -> HourlyWeather:
+    """Hourly weather for all boroughs, served from the TTL cache when possible"""
+    return await weather_cache.get_or_fetch(HOURLY_CACHE_KEY, lambda: request_hourly_weather(client))
+
+
+async def fetch_borough_weather(client: UpstreamClient, borough: str, lat: float, lon: float, date_str: Optional[str] = None):
+    """Fetch weather data for a single borough (from the shared all-borough call)"""
+    try:
+        hourly = await get_hourly_weather(client)
+        return borough, hourly.borough_weather(date_str)[borough]
+    except Exception as e:
+        logger.error(f"Error fetching weather for {borough}: {str(e)}")
+        # Return default values if there's an error
+        return borough, default_weather(borough)
@@ -0,0 +1,128 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Weather only changes on an hourly scale, so a few minutes of reuse is safe
+WEATHER_CACHE_TTL_SECONDS = float(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+# How long past the TTL an entry may still be served while it is refreshed
+WEATHER_CACHE_STALE_SECONDS = float(os.getenv("WEATHER_CACHE_STALE_SECONDS", "3600"))
+WEATHER_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "256"))
+
+
+class AsyncTTLCache:
+    """
+    In-process async cache with TTL, LRU eviction, stale-while-revalidate
+    and single-flight loading.
+
+    Concurrent misses for the same key share one in-flight fetch, so N
+    simultaneous requests trigger exactly one upstream call. Failed fetches
+    are never cached.
+    """
+
+    def __init__(
+        self,
+        ttl: float = WEATHER_CACHE_TTL_SECONDS,
+        stale_ttl: float = WEATHER_CACHE_STALE_SECONDS,
+        max_entries: int = WEATHER_CACHE_MAX_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "upstream_calls": 0,
+            "upstream_errors": 0,
+            "evictions": 0,
+        }
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of the hit/miss counters"""
+        cached = self._stats["hits"] + self._stats["stale_hits"]
+        lookups = cached + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_ratio": cached / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, calling `fetch()` at most once
+        across concurrent callers when it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = self._clock() - fetched_at
+            if age < self.ttl:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                # serve the stale value now and refresh it in the background
+                self._stats["stale_hits"] += 1
+                self._entries.move_to_end(key)
+                if key not in self._inflight:
+                    self._start_fetch(key, fetch).add_done_callback(self._log_refresh_error)
+                return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            inflight = self._start_fetch(key, fetch)
+        # shield so one cancelled caller doesn't cancel the fetch for everyone else
+        return await asyncio.shield(inflight)
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        task = asyncio.ensure_future(self._load(key, fetch))
+        self._inflight[key] = task
+        return task
+
+    async def _load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        self._stats["upstream_calls"] += 1
+        try:
+            value = await fetch()
+        except BaseException:
+            self._stats["upstream_errors"] += 1
+            raise
+        else:
+            self._store(key, value)
+            return value
+        finally:
+            self._inflight.pop(key, None)
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background weather refresh failed, serving stale value: {task.exception()}")
+
+
+# Shared by the weather endpoints
+weather_cache = AsyncTTLCache()
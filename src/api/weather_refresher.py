@@ -0,0 +1,87 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+from fastapi import Request
+from .http_client import UpstreamClient
+from .weather import HourlyWeather, request_hourly_weather
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# How often all boroughs are re-fetched in the background (0 disables the refresher)
+WEATHER_REFRESH_INTERVAL_SECONDS = float(os.getenv("WEATHER_REFRESH_INTERVAL_SECONDS", "600"))
+
+
+@dataclass(frozen=True)
+class WeatherSnapshot:
+    """
+    Immutable hourly weather for all boroughs, published by the refresher.
+    """
+    hourly: HourlyWeather
+    fetched_at: datetime
+    _fetched_monotonic: float = field(default_factory=time.monotonic, repr=False)
+
+    def age_seconds(self) -> float:
+        return time.monotonic() - self._fetched_monotonic
+
+
+class WeatherRefresher:
+    """
+    Background task that refreshes the hourly weather horizon for every
+    borough on a fixed interval and publishes it as a WeatherSnapshot.
+
+    A failed refresh leaves the last good snapshot in place.
+    """
+
+    def __init__(self, client: UpstreamClient, interval: float = WEATHER_REFRESH_INTERVAL_SECONDS):
+        self.client = client
+        self.interval = interval
+        self._snapshot: Optional[WeatherSnapshot] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[WeatherSnapshot]:
+        """Latest published snapshot (None until the first refresh succeeds)"""
+        return self._snapshot
+
+    async def refresh_once(self) -> bool:
+        """Fetch all boroughs and publish a new snapshot; returns False on failure"""
+        try:
+            hourly = await request_hourly_weather(self.client)
+        except Exception as e:
+            age = f"{self._snapshot.age_seconds():.0f}s old" if self._snapshot else "none yet"
+            logger.error(f"Weather refresh failed, keeping last snapshot ({age}): {str(e)}")
+            return False
+
+        self._snapshot = WeatherSnapshot(hourly=hourly, fetched_at=datetime.now())
+        logger.info(f"Published weather snapshot with {len(hourly.times)} hours")
+        return True
+
+    async def _run(self):
+        while True:
+            await self.refresh_once()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def get_weather_snapshot(request: Request) -> Optional[WeatherSnapshot]:
+    """FastAPI dependency returning the latest snapshot, if the refresher has one"""
+    refresher = getattr(request.app.state, "weather_refresher", None)
+    return refresher.snapshot if refresher is not None else None
@@ -0,0 +1,64 @@
+# src/modeling/calibration.py
+
+import json
+import numpy as np
+
+# Number of reference quantiles kept in the lookup table
+N_QUANTILES = 1000
+
+
+class QuantileCalibrator:
+    """
+    Rank-normalises raw crash probabilities against a fixed reference score
+    distribution.
+
+    Equivalent to QuantileTransformer(output_distribution="normal") followed
+    by the normal CDF, but learned once (at training time or startup) and
+    applied as a linear interpolation over a small lookup table, so scores
+    are comparable between requests and cost O(n) NumPy per call.
+    """
+
+    def __init__(self, quantiles):
+        self.quantiles = np.asarray(quantiles, dtype=np.float64)
+        if self.quantiles.ndim != 1 or len(self.quantiles) < 2:
+            raise ValueError("Calibrator needs at least two reference quantiles")
+        if np.any(np.diff(self.quantiles) < 0):
+            raise ValueError("Reference quantiles must be sorted")
+        self.references = np.linspace(0.0, 1.0, len(self.quantiles))
+
+    @classmethod
+    def fit(cls, raw_scores, n_quantiles: int = N_QUANTILES) -> "QuantileCalibrator":
+        """Learn the lookup table from a sample of raw model scores"""
+        raw_scores = np.asarray(raw_scores, dtype=np.float64).ravel()
+        if len(raw_scores) == 0:
+            raise ValueError("Cannot fit a calibrator on zero scores")
+        n_quantiles = max(2, min(n_quantiles, len(raw_scores)))
+        return cls(np.quantile(raw_scores, np.linspace(0.0, 1.0, n_quantiles)))
+
+    def transform(self, raw_proba) -> np.ndarray:
+        """Map raw probabilities to their rank in (0, 1) within the reference distribution"""
+        x = np.asarray(raw_proba, dtype=np.float64)
+        # average the forward and backward interpolation so tied quantiles
+        # (e.g. many identical scores) map to the middle of their range
+        ranks = 0.5 * (
+            np.interp(x, self.quantiles, self.references)
+            - np.interp(-x, -self.quantiles[::-1], -self.references[::-1])
+        )
+        # same bounds QuantileTransformer clips to before the normal CDF
+        return np.clip(ranks, 1e-7, 1 - 1e-7)
+
+    def to_dict(self) -> dict:
+        return {"n_quantiles": len(self.quantiles), "quantiles": self.quantiles.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "QuantileCalibrator":
+        return cls(data["quantiles"])
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path) -> "QuantileCalibrator":
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
@@ -0,0 +1,120 @@
+# src/modeling/features.py
+
+from datetime import datetime
+from typing import Mapping, Optional, Sequence, Union
+import numpy as np
+
+# Features in exactly the order the model expects
+FEATURE_COLUMNS = [
+    "hour", "day_of_week", "month", "is_weekend",
+    "tavg", "prcp", "snow",
+    "wdir", "wspd", "pres",
+    "nearest_intersection_lat", "nearest_intersection_lon",
+    "nearest_intersection_id"
+]
+
+# Weather features, in the order of columns 4..9 above
+WEATHER_FEATURES = ("tavg", "prcp", "snow", "wdir", "wspd", "pres")
+
+_TIME_SLICE = slice(0, 4)
+_WEATHER_SLICE = slice(4, 10)
+_LAT, _LON, _ID = 10, 11, 12
+
+
+def time_features(when: Union[str, datetime]) -> np.ndarray:
+    """hour, day_of_week, month, is_weekend for a timestamp"""
+    if isinstance(when, str):
+        try:
+            when = datetime.fromisoformat(when)
+        except ValueError:
+            # formats only pandas understands; pandas is imported only for them
+            import pandas as pd
+            when = pd.Timestamp(when)
+    day_of_week = when.weekday()
+    return np.array([when.hour, day_of_week, when.month, day_of_week >= 5], dtype=np.float32)
+
+
+def weather_matrix(borough_weather: Mapping[str, Mapping[str, float]], boroughs: Sequence[str]) -> np.ndarray:
+    """
+    Pack per-borough weather dicts into a [borough, feature] float32 array
+    whose rows line up with the borough codes in `boroughs`.
+    """
+    missing = [b for b in boroughs if b not in borough_weather]
+    if missing:
+        raise ValueError(f"No weather for boroughs: {', '.join(missing)}")
+    return np.array(
+        [[borough_weather[b][feat] for feat in WEATHER_FEATURES] for b in boroughs],
+        dtype=np.float32
+    )
+
+
+def build_feature_matrix(
+    when: Union[str, datetime],
+    lats: np.ndarray,
+    lons: np.ndarray,
+    intersection_ids: np.ndarray,
+    borough_codes: np.ndarray,
+    weather: np.ndarray,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Assemble the model's feature matrix without any DataFrame round-trips.
+
+    Args:
+        when: Timestamp the prediction is for
+        lats, lons: Coordinates of each point
+        intersection_ids: Nearest intersection id of each point
+        borough_codes: Integer row of `weather` for each point
+        weather: [borough, feature] array from weather_matrix()
+        out: Optional preallocated (n, 13) float32 C-contiguous array to fill
+
+    Returns:
+        (n, 13) float32 matrix in FEATURE_COLUMNS order
+    """
+    n = len(lats)
+    if out is None:
+        out = np.empty((n, len(FEATURE_COLUMNS)), dtype=np.float32)
+    elif out.shape != (n, len(FEATURE_COLUMNS)) or out.dtype != np.float32:
+        raise ValueError(f"out must be a float32 array of shape ({n}, {len(FEATURE_COLUMNS)})")
+
+    out[:, _TIME_SLICE] = time_features(when)
+    # borough codes index straight into the small weather array
+    out[:, _WEATHER_SLICE] = weather[borough_codes]
+    out[:, _LAT] = lats
+    out[:, _LON] = lons
+    out[:, _ID] = intersection_ids
+    return out
+
+
+def build_timeline_matrix(
+    times: Sequence[Union[str, datetime]],
+    lats: np.ndarray,
+    lons: np.ndarray,
+    intersection_ids: np.ndarray,
+    borough_codes: np.ndarray,
+    weather: np.ndarray,
+) -> np.ndarray:
+    """
+    Feature matrix for the same points at several timestamps, stacked
+    hour-major so row t * n + i is point i at times[t].
+
+    Args:
+        times: Timestamps to predict for
+        lats, lons, intersection_ids, borough_codes: Per-point columns, as in build_feature_matrix
+        weather: [time, borough, feature] array, one weather slice per timestamp
+
+    Returns:
+        (len(times) * n, 13) float32 matrix in FEATURE_COLUMNS order
+    """
+    n = len(lats)
+    if weather.shape[0] != len(times):
+        raise ValueError(f"Expected weather for {len(times)} timestamps, got {weather.shape[0]}")
+
+    out = np.empty((len(times), n, len(FEATURE_COLUMNS)), dtype=np.float32)
+    out[:, :, _TIME_SLICE] = np.stack([time_features(t) for t in times])[:, None, :]
+    out[:, :, _WEATHER_SLICE] = weather[:, borough_codes, :]
+    # spatial features are shared by every hour
+    out[:, :, _LAT] = lats
+    out[:, :, _LON] = lons
+    out[:, :, _ID] = intersection_ids
+    return out.reshape(len(times) * n, len(FEATURE_COLUMNS))
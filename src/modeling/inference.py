@@ -1,24 +1,36 @@
 # src/modeling/inference.py
 
 import os
-import joblib
-import pandas as pd
-import xgboost as xgb
-from src.preprocessing.intersections import intersections_df
-from geopy.distance import great_circle
-from sklearn.preprocessing import QuantileTransformer
+from typing import TYPE_CHECKING, Optional
+from src.preprocessing.spatial_index import get_intersection_index
+from src.modeling.features import FEATURE_COLUMNS, build_feature_matrix, build_timeline_matrix, weather_matrix
+from src.modeling.calibration import QuantileCalibrator
+from src.modeling.model_registry import LoadedModel, ModelRegistry
 import numpy as np
 import logging
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import xgboost as xgb
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 1) Load your trained Booster once at import time
+# Pickled classifier, used only while the model registry (model_registry.MODELS_DIR) is empty
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "../models/xgb_clf_full.joblib")
+# Rank-normalisation table saved next to the model by train_xgb.py
+CALIBRATION_PATH = os.path.splitext(MODEL_PATH)[0] + ".calibration.json"
+
+# Reference sample scored at startup when no calibration file was saved
+CALIBRATION_SAMPLE_POINTS = 2000
+CALIBRATION_REFERENCE_DAYS = ("2025-01-08", "2025-01-11")  # a weekday and a weekend day
 
 # Create a dummy model for development/testing
 def create_dummy_model():
+    import pandas as pd
+    import xgboost as xgb
+
     logger.warning("Using dummy model for development/testing")
     dummy_model = xgb.XGBClassifier(
         objective='binary:logistic',  # For binary classification
@@ -26,88 +38,180 @@ def create_dummy_model():
         random_state=42
     )
     # Create dummy data and fit the model
-    X = pd.DataFrame([[0] * 13], columns=[
-        "hour","day_of_week","month","is_weekend",
-        "tavg","prcp","snow","wdir","wspd","pres",
-        "nearest_intersection_lat","nearest_intersection_lon",
-        "nearest_intersection_id"
-    ])
+    X = pd.DataFrame([[0] * 13], columns=FEATURE_COLUMNS)
     y = pd.Series([0])
     return dummy_model.fit(X, y)
 
-try:
-    if os.path.exists(MODEL_PATH):
-        model: xgb.XGBClassifier = joblib.load(MODEL_PATH)
-        logger.info(f"Loaded model from {MODEL_PATH}")
-    else:
-        logger.warning(f"Model file not found at {MODEL_PATH}")
-        model = create_dummy_model()
-except Exception as e:
-    logger.error(f"Error loading model: {str(e)}")
-    model = create_dummy_model()
+def load_legacy_model():
+    """
+    The pickled classifier (or a dummy) as (booster, calibrator or None, source),
+    used while the model registry has no versions.
+    """
+    # joblib/xgboost are heavy imports, so they only happen here
+    import joblib
+
+    classifier, source = None, "dummy"
+    try:
+        if os.path.exists(MODEL_PATH):
+            classifier = joblib.load(MODEL_PATH)
+            source = MODEL_PATH
+            logger.info(f"Loaded model from {MODEL_PATH}")
+        else:
+            logger.warning(f"Model file not found at {MODEL_PATH}")
+    except Exception as e:
+        logger.error(f"Error loading model: {str(e)}")
+    if classifier is None:
+        classifier = create_dummy_model()
+
+    calibrator = None
+    if source != "dummy" and os.path.exists(CALIBRATION_PATH):
+        calibrator = QuantileCalibrator.load(CALIBRATION_PATH)
+        logger.info(f"Loaded calibration from {CALIBRATION_PATH}")
+    # the underlying Booster, scored directly with inplace_predict
+    return classifier.get_booster(), calibrator, source
+
+def find_nearest_intersection_ids(lats, lons):
+    # one KD-tree query for the whole batch of points
+    return get_intersection_index().query(lats, lons)
 
 def find_nearest_intersection_id(lat, lon):
-    # compute the distance to every known intersection
-    dists = intersections_df.apply(
-        lambda r: great_circle((lat, lon), (r.lat, r.lon)).km,
-        axis=1
-    )
-    # pick the ID of the closest one
-    return intersections_df.loc[dists.idxmin(), 'nearest_intersection_id']
+    return find_nearest_intersection_ids([lat], [lon])[0]
 
 def prepare_grid(grid_df):
     # for each point in your payload, map to the nearest intersection
-    grid_df['nearest_intersection_id'] = grid_df.apply(
-        lambda r: find_nearest_intersection_id(r.lat, r.lon),
-        axis=1
+    grid_df['nearest_intersection_id'] = find_nearest_intersection_ids(
+        grid_df["lat"].to_numpy(), grid_df["lon"].to_numpy()
     )
     return grid_df
 
+def predict_raw_probabilities(X: np.ndarray, model: Optional[LoadedModel] = None) -> np.ndarray:
+    """Crash probability for each row of a FEATURE_COLUMNS-ordered float32 matrix"""
+    booster = (model or get_active_model()).booster
+    # binary:logistic -> inplace_predict already returns P(crash)
+    return booster.inplace_predict(X, validate_features=False)
+
+def fit_reference_calibrator(booster: "xgb.Booster") -> QuantileCalibrator:
+    """
+    Learn the calibration from model scores over a fixed sample of
+    intersections, every hour of a reference weekday and weekend day, in
+    the API's fallback weather.
+    """
+    from src.preprocessing.intersection_store import get_intersection_store
+    from src.api.weather import DEFAULT_VALUES
+    store = get_intersection_store()
+    positions = store.sample_positions(CALIBRATION_SAMPLE_POINTS, seed=0)
+    weather = np.tile(DEFAULT_VALUES, (len(store.boroughs), 1))
+
+    scores = [
+        booster.inplace_predict(build_feature_matrix(
+            f"{day}T{hour:02d}:00", store.lat[positions], store.lon[positions],
+            store.id[positions], store.borough_code[positions], weather
+        ), validate_features=False)
+        for day in CALIBRATION_REFERENCE_DAYS
+        for hour in range(24)
+    ]
+    return QuantileCalibrator.fit(np.concatenate(scores))
+
+registry = ModelRegistry(legacy_loader=load_legacy_model, fallback_calibrator=fit_reference_calibrator)
+
+def get_active_model() -> LoadedModel:
+    """The active model version; grab it once per request and use it throughout"""
+    return registry.active
+
+def get_booster() -> "xgb.Booster":
+    return get_active_model().booster
+
+def get_calibrator() -> QuantileCalibrator:
+    """Calibration of the active model version"""
+    return get_active_model().calibrator
+
+def __getattr__(name):
+    # `booster` used to be a module global set at import time
+    if name == "booster":
+        return get_booster()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def warm_up():
+    """
+    Do the first-use work of the scoring path up front: load the active
+    model and its calibration and build the intersection index.
+    """
+    get_active_model()
+    get_intersection_index()
+
+def calibrate(raw_proba: np.ndarray, model: Optional[LoadedModel] = None) -> np.ndarray:
+    # rank of each raw score within the fixed reference distribution
+    return (model or get_active_model()).calibrator.transform(raw_proba)
+
+def predict_accident_arrays(
+    date: str,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    intersection_ids: np.ndarray,
+    borough_codes: np.ndarray,
+    weather: np.ndarray,
+    model: Optional[LoadedModel] = None
+) -> np.ndarray:
+    """
+    Calibrated crash probabilities for column arrays of points.
+
+    Args:
+        date: Timestamp the prediction is for
+        lats, lons, intersection_ids: Per-point spatial features
+        borough_codes: Row of `weather` for each point
+        weather: [borough, feature] array from features.weather_matrix()
+        model: Model version to use (default: the active one)
+    """
+    model = model or get_active_model()
+    X = build_feature_matrix(date, lats, lons, intersection_ids, borough_codes, weather)
+    return calibrate(predict_raw_probabilities(X, model), model)
+
+def predict_accident_timeline(
+    times: list,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    intersection_ids: np.ndarray,
+    borough_codes: np.ndarray,
+    weather: np.ndarray
+) -> np.ndarray:
+    """
+    Calibrated crash probabilities for the same points at several timestamps,
+    scored in a single model invocation.
+
+    Args:
+        times: Timestamps to predict for
+        lats, lons, intersection_ids, borough_codes: Per-point columns
+        weather: [time, borough, feature] array
+
+    Returns:
+        [time, point] array of probabilities
+    """
+    model = get_active_model()
+    X = build_timeline_matrix(times, lats, lons, intersection_ids, borough_codes, weather)
+    return calibrate(predict_raw_probabilities(X, model), model).reshape(len(times), len(lats))
+
 def predict_accident_probabilities(
-    grid_df: pd.DataFrame,
+    grid_df: "pd.DataFrame",
     date: str,
     borough_weather: dict
-) -> pd.DataFrame:
-    # --- (1) date/time features ---
-    dt = pd.to_datetime(date)
-    grid_df["hour"]        = dt.hour
-    grid_df["day_of_week"] = dt.dayofweek
-    grid_df["month"]       = dt.month
-    grid_df["is_weekend"]  = dt.dayofweek >= 5
-
-    # --- (2) weather features from API (already converted to model units upstream) ---
-    for feat in ("tavg", "prcp", "snow", "wdir", "wspd", "pres"):
-        grid_df[feat] = grid_df["borough"].map(lambda b: borough_weather[b][feat])
-
-    # --- (3) spatial features ---
-    # raw lat/lon of grid cell
-    grid_df["nearest_intersection_lat"] = grid_df["lat"]
-    grid_df["nearest_intersection_lon"] = grid_df["lon"]
-    # map to the real intersection ID
-    #grid_df["nearest_intersection_id"] = grid_df.apply(
-       # lambda r: find_nearest_intersection_id(r.lat, r.lon),
-       # axis=1)
-    grid_df["nearest_intersection_id"] = 0
-
-    # --- (4) assemble features in exactly the order the model expects ---
-    feature_columns = [
-        "hour","day_of_week","month","is_weekend",
-        "tavg","prcp","snow",
-        "wdir","wspd","pres",
-        "nearest_intersection_lat","nearest_intersection_lon",
-        "nearest_intersection_id"
-    ]
-    X = grid_df[feature_columns]
-    # 1) get raw probabilities
-    raw_proba = model.predict_proba(X)[:, 1].reshape(-1, 1)
-    # 2) normal‐quantile transform → z‑scores
-    qt = QuantileTransformer(output_distribution="normal", random_state=42)
-    z_scores = qt.fit_transform(raw_proba).flatten()
-    # 3) map z‑scores to (0,1) via Normal CDF
-    from scipy.stats import norm
-    scaled = norm.cdf(z_scores)
+) -> "pd.DataFrame":
+    import pandas as pd
 
-    grid_df["probability"] = scaled
+    # borough names -> codes into a small [borough, feature] weather array
+    boroughs = pd.Categorical(grid_df["borough"])
+    weather = weather_matrix(borough_weather, list(boroughs.categories))
 
+    lats = grid_df["lat"].to_numpy()
+    lons = grid_df["lon"].to_numpy()
+    # raw lat/lon of grid cell, mapped to the real intersection ID
+    probabilities = predict_accident_arrays(
+        date, lats, lons, find_nearest_intersection_ids(lats, lons), boroughs.codes, weather
+    )
 
-    return grid_df[["lat", "lon", "borough", "probability"]]
+    # new frame; the caller's grid_df is left untouched
+    return pd.DataFrame({
+        "lat": lats,
+        "lon": lons,
+        "borough": grid_df["borough"].to_numpy(),
+        "probability": probabilities
+    }, index=grid_df.index)
@@ -0,0 +1,296 @@
+# src/modeling/model_registry.py
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+from src.modeling.features import FEATURE_COLUMNS
+from src.modeling.calibration import QuantileCalibrator
+
+if TYPE_CHECKING:
+    import xgboost as xgb
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# One sub-directory per model version: <MODELS_DIR>/<version>/{model.ubj, manifest.json}
+MODELS_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", Path(__file__).parent.parent / "models" / "registry"))
+# Pin a version; otherwise the one named in CURRENT_FILE, otherwise the newest
+MODEL_VERSION = os.getenv("MODEL_VERSION", "")
+
+MODEL_FILE = "model.ubj"
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+MANIFEST_FORMAT = 1
+
+
+class ModelSchemaError(ValueError):
+    """A model artifact does not match the features inference builds"""
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    One fully-initialised model version. Requests grab a reference once and
+    use its booster and calibrator together, so a swap never mixes versions.
+    """
+    version: str
+    booster: "xgb.Booster"
+    calibrator: QuantileCalibrator
+    feature_columns: Tuple[str, ...]
+    source: str
+    loaded_at: datetime = field(default_factory=datetime.now)
+    # (version, manifest mtime) used to notice changed files
+    signature: Optional[Tuple[str, int]] = None
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at.isoformat(),
+            "n_features": len(self.feature_columns),
+        }
+
+
+def validate_schema(feature_columns, booster: "xgb.Booster"):
+    """Raise ModelSchemaError unless the model expects exactly FEATURE_COLUMNS"""
+    if list(feature_columns) != FEATURE_COLUMNS:
+        raise ModelSchemaError(f"Model features {list(feature_columns)} do not match {FEATURE_COLUMNS}")
+    if booster.num_features() != len(FEATURE_COLUMNS):
+        raise ModelSchemaError(f"Booster has {booster.num_features()} features, expected {len(FEATURE_COLUMNS)}")
+    if booster.feature_names is not None and list(booster.feature_names) != FEATURE_COLUMNS:
+        raise ModelSchemaError(f"Booster feature names {booster.feature_names} do not match {FEATURE_COLUMNS}")
+
+
+def write_model_version(
+    booster: "xgb.Booster",
+    calibrator: Optional[QuantileCalibrator],
+    models_dir=MODELS_DIR,
+    version: Optional[str] = None,
+    make_current: bool = True,
+    extra: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """
+    Export a Booster in native UBJSON format plus its manifest as a new version.
+
+    The version directory is written under a temporary name and renamed into
+    place, so a watching server never sees a half-written model.
+
+    Returns:
+        Path of the version directory
+    """
+    import xgboost as xgb
+
+    models_dir = Path(models_dir)
+    version = version or datetime.now().strftime("%Y%m%d-%H%M%S")
+    models_dir.mkdir(parents=True, exist_ok=True)
+    final = models_dir / version
+    if final.exists():
+        raise FileExistsError(f"Model version {version} already exists in {models_dir}")
+
+    tmp = Path(tempfile.mkdtemp(prefix=f".{version}.", dir=models_dir))
+    try:
+        booster.save_model(str(tmp / MODEL_FILE))
+        manifest = {
+            "format": MANIFEST_FORMAT,
+            "version": version,
+            "created_at": datetime.now().isoformat(),
+            "xgboost_version": xgb.__version__,
+            "model_file": MODEL_FILE,
+            "feature_columns": list(booster.feature_names or FEATURE_COLUMNS),
+            "calibration": calibrator.to_dict() if calibrator is not None else None,
+            **(extra or {}),
+        }
+        with open(tmp / MANIFEST_FILE, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, final)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    if make_current:
+        set_current_version(version, models_dir)
+    return final
+
+
+def require_version(version: str, models_dir=MODELS_DIR):
+    """
+    Raise FileNotFoundError unless `version` is one of list_versions(models_dir).
+
+    Versions can come from API requests, so they are matched against the
+    registry's own directory names before being joined onto a path ("../x"
+    or an absolute path never reaches the filesystem).
+    """
+    if version not in list_versions(models_dir):
+        raise FileNotFoundError(f"No model version {version} in {models_dir}")
+
+
+def set_current_version(version: str, models_dir=MODELS_DIR):
+    """Point CURRENT at `version` (atomically), which watching servers pick up"""
+    models_dir = Path(models_dir)
+    require_version(version, models_dir)
+    tmp = models_dir / f".{CURRENT_FILE}.tmp"
+    tmp.write_text(version + "\n")
+    os.replace(tmp, models_dir / CURRENT_FILE)
+
+
+def list_versions(models_dir=MODELS_DIR) -> List[str]:
+    """Complete versions in the registry, oldest first"""
+    models_dir = Path(models_dir)
+    if not models_dir.is_dir():
+        return []
+    return sorted(
+        p.name for p in models_dir.iterdir()
+        if p.is_dir() and not p.name.startswith(".") and (p / MANIFEST_FILE).exists()
+    )
+
+
+class ModelRegistry:
+    """
+    Loads model versions from MODELS_DIR and holds the active one.
+
+    A new version is loaded, validated and calibrated completely before a
+    single reference assignment makes it active; requests already holding
+    the previous LoadedModel finish on it. A version that fails to load or
+    validate never replaces the active model.
+
+    Args:
+        models_dir: Registry directory
+        pinned_version: Always serve this version (ignores CURRENT)
+        legacy_loader: Returns (booster, calibrator or None, source) when the registry is empty
+        fallback_calibrator: Fits a calibration for a booster whose manifest has none
+    """
+
+    def __init__(
+        self,
+        models_dir=MODELS_DIR,
+        pinned_version: str = MODEL_VERSION,
+        legacy_loader: Optional[Callable[[], Tuple["xgb.Booster", Optional[QuantileCalibrator], str]]] = None,
+        fallback_calibrator: Optional[Callable[["xgb.Booster"], QuantileCalibrator]] = None,
+    ):
+        self.models_dir = Path(models_dir)
+        self.pinned_version = pinned_version or None
+        self.legacy_loader = legacy_loader
+        self.fallback_calibrator = fallback_calibrator
+        self._active: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        # files that already failed to load, so polling doesn't retry them until they change
+        self._failed_signature: Optional[Tuple[str, int]] = None
+
+    @property
+    def active(self) -> LoadedModel:
+        """The model serving requests, loaded on first access"""
+        active = self._active
+        if active is None:
+            with self._lock:
+                if self._active is None:
+                    self._active = self._load(self.target_version())
+                active = self._active
+        return active
+
+    def target_version(self) -> Optional[str]:
+        """Version that should be active: pinned, else CURRENT, else newest; None if the registry is empty"""
+        if self.pinned_version:
+            return self.pinned_version
+        current = self.models_dir / CURRENT_FILE
+        if current.exists():
+            version = current.read_text().strip()
+            if version:
+                return version
+        versions = list_versions(self.models_dir)
+        return versions[-1] if versions else None
+
+    def _signature(self, version: Optional[str]) -> Optional[Tuple[str, int]]:
+        if version is None:
+            return None
+        manifest = self.models_dir / version / MANIFEST_FILE
+        try:
+            return version, manifest.stat().st_mtime_ns
+        except FileNotFoundError:
+            return version, -1
+
+    def load_version(self, version: str) -> LoadedModel:
+        """Load and validate one version from the registry (does not activate it)"""
+        import xgboost as xgb
+
+        require_version(version, self.models_dir)
+        directory = self.models_dir / version
+        with open(directory / MANIFEST_FILE) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ModelSchemaError(f"Unsupported manifest format {manifest.get('format')} in {directory}")
+
+        booster = xgb.Booster()
+        booster.load_model(str(directory / manifest.get("model_file", MODEL_FILE)))
+        validate_schema(manifest["feature_columns"], booster)
+
+        if manifest.get("calibration"):
+            calibrator = QuantileCalibrator.from_dict(manifest["calibration"])
+        elif self.fallback_calibrator is not None:
+            logger.warning(f"Model {version} has no calibration, fitting on a reference sample")
+            calibrator = self.fallback_calibrator(booster)
+        else:
+            raise ModelSchemaError(f"Model {version} has no calibration")
+
+        return LoadedModel(
+            version=version,
+            booster=booster,
+            calibrator=calibrator,
+            feature_columns=tuple(manifest["feature_columns"]),
+            source=str(directory),
+            signature=self._signature(version),
+        )
+
+    def _load(self, version: Optional[str]) -> LoadedModel:
+        if version is not None:
+            loaded = self.load_version(version)
+        elif self.legacy_loader is not None:
+            booster, calibrator, source = self.legacy_loader()
+            validate_schema(booster.feature_names or FEATURE_COLUMNS, booster)
+            if calibrator is None:
+                calibrator = self.fallback_calibrator(booster)
+            loaded = LoadedModel(
+                version="legacy", booster=booster, calibrator=calibrator,
+                feature_columns=tuple(FEATURE_COLUMNS), source=source
+            )
+        else:
+            raise FileNotFoundError(f"No model versions in {self.models_dir}")
+        logger.info(f"Loaded model version {loaded.version} from {loaded.source}")
+        return loaded
+
+    def reload(self, version: Optional[str] = None) -> LoadedModel:
+        """
+        Load `version` (default: the target version) and make it active.
+        Raises, leaving the active model untouched, if it cannot be loaded.
+        """
+        with self._lock:
+            loaded = self._load(version or self.target_version())
+            previous = self._active
+            # the swap: one reference assignment, in-flight requests keep `previous`
+            self._active = loaded
+        logger.info(f"Active model: {previous.version if previous else None} -> {loaded.version}")
+        return loaded
+
+    def check_for_update(self) -> bool:
+        """Reload if the target version or its manifest changed on disk; returns True on a swap"""
+        active = self._active
+        if active is None:
+            return False
+        target = self.target_version()
+        signature = self._signature(target)
+        if target is None or signature in (active.signature, self._failed_signature):
+            return False
+        try:
+            self.reload(target)
+            return True
+        except Exception as e:
+            self._failed_signature = signature
+            logger.error(f"Keeping model {active.version}, could not load {target}: {str(e)}")
+            return False
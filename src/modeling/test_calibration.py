@@ -0,0 +1,25 @@
+import numpy as np
+from scipy.stats import norm
+from sklearn.preprocessing import QuantileTransformer
+from src.modeling.calibration import QuantileCalibrator
+
+
+def test_matches_quantile_transformer_then_normal_cdf():
+    raw = np.random.default_rng(0).beta(2, 5, 5000)
+
+    qt = QuantileTransformer(output_distribution="normal", random_state=42)
+    expected = norm.cdf(qt.fit_transform(raw.reshape(-1, 1)).ravel())
+
+    assert np.allclose(QuantileCalibrator.fit(raw).transform(raw), expected, atol=1e-9)
+
+
+def test_scores_are_comparable_and_persisted(tmp_path):
+    reference = np.random.default_rng(1).uniform(0, 1, 10000)
+    calibrator = QuantileCalibrator.fit(reference)
+    calibrator.save(tmp_path / "calibration.json")
+    loaded = QuantileCalibrator.load(tmp_path / "calibration.json")
+
+    # the same raw score maps to the same value regardless of the batch it is in
+    assert loaded.transform([0.25])[0] == loaded.transform([0.25, 0.9, 0.01])[0]
+    assert abs(loaded.transform([0.25])[0] - 0.25) < 0.02
+    assert np.all(np.diff(loaded.transform(np.linspace(0, 1, 50))) >= 0)
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from src.modeling.features import (
+    FEATURE_COLUMNS,
+    WEATHER_FEATURES,
+    build_feature_matrix,
+    build_timeline_matrix,
+    weather_matrix,
+)
+
+BOROUGH_WEATHER = {
+    "Queens": {"tavg": 59.3, "prcp": 0.146, "snow": 0.0, "wdir": 147.0, "wspd": 13.0, "pres": 1018.0},
+    "Bronx": {"tavg": 59.9, "prcp": 0.48, "snow": 0.0, "wdir": 143.0, "wspd": 13.3, "pres": 1017.9},
+}
+
+
+def test_matches_dataframe_assembly():
+    grid_df = pd.DataFrame({
+        "lat": [40.5, 40.8, 40.7],
+        "lon": [-73.7, -73.9, -73.8],
+        "borough": ["Queens", "Bronx", "Queens"],
+        "nearest_intersection_id": [11, 22, 33],
+    })
+    when = "2025-05-10T17:30:00"  # a Saturday
+
+    # the old column-by-column construction
+    expected = grid_df.copy()
+    dt = pd.Timestamp(when)
+    expected["hour"], expected["day_of_week"], expected["month"] = dt.hour, dt.dayofweek, dt.month
+    expected["is_weekend"] = dt.dayofweek >= 5
+    for feat in WEATHER_FEATURES:
+        expected[feat] = expected["borough"].map(lambda b: BOROUGH_WEATHER[b][feat])
+    expected["nearest_intersection_lat"] = expected["lat"]
+    expected["nearest_intersection_lon"] = expected["lon"]
+
+    boroughs = ["Bronx", "Queens"]
+    codes = pd.Categorical(grid_df["borough"], categories=boroughs).codes
+    X = build_feature_matrix(
+        when, grid_df["lat"].to_numpy(), grid_df["lon"].to_numpy(),
+        grid_df["nearest_intersection_id"].to_numpy(), codes,
+        weather_matrix(BOROUGH_WEATHER, boroughs)
+    )
+
+    assert X.dtype == np.float32 and X.flags.c_contiguous
+    assert np.allclose(X, expected[FEATURE_COLUMNS].to_numpy(dtype=np.float32))
+
+
+def test_fills_preallocated_output():
+    out = np.zeros((2, len(FEATURE_COLUMNS)), dtype=np.float32)
+    X = build_feature_matrix(
+        "2025-05-06", np.array([40.5, 40.8]), np.array([-73.7, -73.9]), np.array([1, 2]),
+        np.array([0, 0]), weather_matrix(BOROUGH_WEATHER, ["Queens"]), out=out
+    )
+    assert X is out
+    assert out[1, FEATURE_COLUMNS.index("tavg")] == np.float32(59.3)
+
+
+def test_timeline_matrix_stacks_hourly_matrices():
+    lats, lons, ids = np.array([40.5, 40.8, 40.7]), np.array([-73.7, -73.9, -73.8]), np.array([1, 2, 3])
+    codes = np.array([1, 0, 1])
+    times = ["2025-05-06T00:00", "2025-05-06T06:00", "2025-05-10T12:00"]
+    weather = np.random.default_rng(0).uniform(0, 100, (len(times), 2, len(WEATHER_FEATURES))).astype(np.float32)
+
+    X = build_timeline_matrix(times, lats, lons, ids, codes, weather)
+    expected = np.vstack([
+        build_feature_matrix(t, lats, lons, ids, codes, weather[i]) for i, t in enumerate(times)
+    ])
+    assert np.array_equal(X, expected)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+import xgboost as xgb
+from src.modeling.calibration import QuantileCalibrator
+from src.modeling.features import FEATURE_COLUMNS
+from src.modeling.model_registry import (
+    ModelRegistry, ModelSchemaError, list_versions, set_current_version, write_model_version
+)
+
+
+def train_booster(seed, feature_names=FEATURE_COLUMNS):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, len(feature_names))).astype(np.float32)
+    y = (X[:, 0] + rng.normal(size=200) > 0).astype(int)
+    dtrain = xgb.DMatrix(X, label=y, feature_names=list(feature_names))
+    return xgb.train({"objective": "binary:logistic", "seed": seed}, dtrain, num_boost_round=5)
+
+
+def test_round_trip_and_latest_version(tmp_path):
+    booster = train_booster(0)
+    calibrator = QuantileCalibrator.fit(np.linspace(0, 1, 50))
+    write_model_version(booster, calibrator, tmp_path, version="v1", make_current=False)
+    write_model_version(train_booster(1), calibrator, tmp_path, version="v2", make_current=False)
+    assert list_versions(tmp_path) == ["v1", "v2"]
+
+    registry = ModelRegistry(tmp_path)
+    assert registry.active.version == "v2"
+
+    loaded = registry.load_version("v1")
+    X = np.random.default_rng(2).normal(size=(10, len(FEATURE_COLUMNS))).astype(np.float32)
+    assert np.array_equal(loaded.booster.inplace_predict(X), booster.inplace_predict(X))
+    assert np.array_equal(loaded.calibrator.quantiles, calibrator.quantiles)
+
+
+def test_hot_reload_keeps_in_flight_reference(tmp_path):
+    calibrator = QuantileCalibrator.fit(np.linspace(0, 1, 50))
+    write_model_version(train_booster(0), calibrator, tmp_path, version="v1")
+    registry = ModelRegistry(tmp_path)
+    in_flight = registry.active
+    assert registry.check_for_update() is False
+
+    write_model_version(train_booster(1), calibrator, tmp_path, version="v2")
+    assert registry.check_for_update() is True
+    assert registry.active.version == "v2"
+    # a request that grabbed the old version still has a usable model
+    assert in_flight.version == "v1" and in_flight.booster.num_features() == len(FEATURE_COLUMNS)
+
+    set_current_version("v1", tmp_path)
+    assert registry.check_for_update() is True
+    assert registry.active.version == "v1"
+
+
+def test_schema_mismatch_never_becomes_active(tmp_path):
+    calibrator = QuantileCalibrator.fit(np.linspace(0, 1, 50))
+    write_model_version(train_booster(0), calibrator, tmp_path, version="v1")
+    registry = ModelRegistry(tmp_path)
+    assert registry.active.version == "v1"
+
+    reordered = list(reversed(FEATURE_COLUMNS))
+    write_model_version(train_booster(1, reordered), calibrator, tmp_path, version="v2")
+    with pytest.raises(ModelSchemaError):
+        registry.reload("v2")
+    assert registry.check_for_update() is False
+    assert registry.active.version == "v1"
+
+
+def test_unknown_or_path_like_versions_are_rejected(tmp_path):
+    calibrator = QuantileCalibrator.fit(np.linspace(0, 1, 50))
+    write_model_version(train_booster(0), calibrator, tmp_path / "models", version="v1")
+    # a complete version outside the registry directory
+    write_model_version(train_booster(1), calibrator, tmp_path / "elsewhere", version="v2")
+    registry = ModelRegistry(tmp_path / "models")
+
+    for version in ("../elsewhere/v2", str(tmp_path / "elsewhere" / "v2"), "v3"):
+        with pytest.raises(FileNotFoundError):
+            registry.reload(version)
+        with pytest.raises(FileNotFoundError):
+            set_current_version(version, tmp_path / "models")
+    assert registry.active.version == "v1"
+    assert (tmp_path / "models" / "CURRENT").read_text().strip() == "v1"
@@ -0,0 +1,188 @@
+# src/preprocessing/borough_raster.py
+
+import os
+import json
+import threading
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from src.preprocessing.nyc_grid import BOROUGH_CENTERS, NYC_BOUNDS
+from src.preprocessing.geo import nearest
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Borough boundary polygons (e.g. NYC Open Data "Borough Boundaries" GeoJSON); centroids are used without it
+BOUNDARIES_PATH = Path(os.getenv("BOROUGH_BOUNDARIES_PATH", DATA_DIR / "borough_boundaries.geojson"))
+
+# Raster cell size in degrees (~50 m) and margin around the NYC bounding box
+RASTER_RESOLUTION = float(os.getenv("BOROUGH_RASTER_RESOLUTION", "0.0005"))
+RASTER_MARGIN = 0.02
+
+# Borough codes index into this list everywhere
+BOROUGH_NAMES: List[str] = list(BOROUGH_CENTERS)
+
+# GeoJSON property names that hold the borough name in common boundary datasets
+_NAME_PROPERTIES = ("boro_name", "BoroName", "borough", "name")
+
+
+def nearest_centroid_codes(lats, lons) -> np.ndarray:
+    """Code of the nearest borough centroid by great-circle distance"""
+    center_lats, center_lons = zip(*BOROUGH_CENTERS.values())
+    codes, _ = nearest(lats, lons, center_lats, center_lons)
+    return codes.astype(np.int8)
+
+
+def _fill_polygon_rows(mask: np.ndarray, rings: Sequence[np.ndarray], south: float, west: float, resolution: float):
+    """
+    Scanline-fill rings (arrays of [lon, lat] vertices) into `mask` using the
+    even-odd rule on cell centres, so holes are handled without special cases.
+    """
+    edges = np.concatenate([np.column_stack((ring, np.roll(ring, -1, axis=0))) for ring in rings])
+    x0, y0, x1, y1 = edges.T
+    n_rows, n_cols = mask.shape
+    row_lo = max(int(np.floor((edges[:, [1, 3]].min() - south) / resolution)), 0)
+    row_hi = min(int(np.ceil((edges[:, [1, 3]].max() - south) / resolution)), n_rows)
+    col_centres = west + (np.arange(n_cols) + 0.5) * resolution
+
+    for row in range(row_lo, row_hi):
+        y = south + (row + 0.5) * resolution
+        crossing = (y0 <= y) != (y1 <= y)
+        if not crossing.any():
+            continue
+        xs = x0[crossing] + (y - y0[crossing]) * (x1[crossing] - x0[crossing]) / (y1[crossing] - y0[crossing])
+        xs.sort()
+        # cells whose centre has an odd number of crossings to its left are inside
+        inside = np.searchsorted(xs, col_centres) % 2 == 1
+        mask[row] |= inside
+
+
+class BoroughRaster:
+    """
+    Precomputed lat/lon grid of borough codes.
+
+    Looking up a point is two integer divisions and one array index, so
+    millions of points are assigned in milliseconds. Points outside the
+    raster fall back to the nearest centroid.
+    """
+
+    def __init__(self, codes: np.ndarray, south: float, west: float, resolution: float, source: str = "centroids"):
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.south = south
+        self.west = west
+        self.resolution = resolution
+        self.source = source
+
+    @classmethod
+    def from_centroids(cls, resolution: float = RASTER_RESOLUTION):
+        """Every cell gets the borough whose centroid is closest to the cell centre"""
+        south, west, n_rows, n_cols = _raster_shape(resolution)
+        lats = south + (np.arange(n_rows) + 0.5) * resolution
+        lons = west + (np.arange(n_cols) + 0.5) * resolution
+        lon_mesh, lat_mesh = np.meshgrid(lons, lats)
+        codes = nearest_centroid_codes(lat_mesh.ravel(), lon_mesh.ravel()).reshape(n_rows, n_cols)
+        return cls(codes, south, west, resolution, source="centroids")
+
+    @classmethod
+    def from_polygons(cls, polygons: Dict[str, List[Sequence[np.ndarray]]], resolution: float = RASTER_RESOLUTION):
+        """
+        Cells inside a borough's boundary get that borough; cells inside none
+        (water, outside the city) get the nearest centroid.
+
+        Args:
+            polygons: Borough name -> list of polygons, each a list of [lon, lat] rings
+        """
+        raster = cls.from_centroids(resolution)
+        n_rows, n_cols = raster.codes.shape
+        for name, borough_polygons in polygons.items():
+            mask = np.zeros((n_rows, n_cols), dtype=bool)
+            for rings in borough_polygons:
+                polygon_mask = np.zeros_like(mask)
+                _fill_polygon_rows(polygon_mask, rings, raster.south, raster.west, resolution)
+                mask |= polygon_mask
+            raster.codes[mask] = BOROUGH_NAMES.index(name)
+        raster.source = "polygons"
+        return raster
+
+    @classmethod
+    def from_geojson(cls, path, resolution: float = RASTER_RESOLUTION):
+        with open(path) as f:
+            collection = json.load(f)
+
+        polygons: Dict[str, list] = {}
+        for feature in collection["features"]:
+            props = feature.get("properties") or {}
+            name = next((props[k] for k in _NAME_PROPERTIES if k in props), None)
+            if name not in BOROUGH_CENTERS:
+                logger.warning(f"Skipping boundary feature with unknown borough {name!r}")
+                continue
+            geometry = feature["geometry"]
+            parts = geometry["coordinates"] if geometry["type"] == "MultiPolygon" else [geometry["coordinates"]]
+            polygons.setdefault(name, []).extend(
+                [np.asarray(ring, dtype=np.float64)[:, :2] for ring in part] for part in parts
+            )
+        return cls.from_polygons(polygons, resolution)
+
+    def lookup(self, lats, lons) -> np.ndarray:
+        """
+        Borough code of every point.
+
+        Returns:
+            int8 array of indices into BOROUGH_NAMES
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        rows = np.floor((lats - self.south) / self.resolution).astype(np.int64)
+        cols = np.floor((lons - self.west) / self.resolution).astype(np.int64)
+        n_rows, n_cols = self.codes.shape
+        inside = (rows >= 0) & (rows < n_rows) & (cols >= 0) & (cols < n_cols)
+
+        codes = np.empty(len(lats), dtype=np.int8)
+        codes[inside] = self.codes[rows[inside], cols[inside]]
+        if not inside.all():
+            codes[~inside] = nearest_centroid_codes(lats[~inside], lons[~inside])
+        return codes
+
+    def lookup_names(self, lats, lons) -> np.ndarray:
+        """Borough name of every point"""
+        return np.asarray(BOROUGH_NAMES, dtype=object)[self.lookup(lats, lons)]
+
+
+def _raster_shape(resolution: float):
+    south = NYC_BOUNDS["south"] - RASTER_MARGIN
+    west = NYC_BOUNDS["west"] - RASTER_MARGIN
+    n_rows = int(np.ceil((NYC_BOUNDS["north"] + RASTER_MARGIN - south) / resolution))
+    n_cols = int(np.ceil((NYC_BOUNDS["east"] + RASTER_MARGIN - west) / resolution))
+    return south, west, n_rows, n_cols
+
+
+_raster: Optional[BoroughRaster] = None
+_raster_lock = threading.Lock()
+
+
+def get_borough_raster() -> BoroughRaster:
+    """Shared raster, built on first use from the boundary file if present, otherwise from centroids"""
+    global _raster
+    if _raster is None:
+        with _raster_lock:
+            if _raster is None:
+                if BOUNDARIES_PATH.exists():
+                    _raster = BoroughRaster.from_geojson(BOUNDARIES_PATH)
+                else:
+                    _raster = BoroughRaster.from_centroids()
+                logger.info(f"Built {_raster.codes.shape[0]}x{_raster.codes.shape[1]} borough raster from {_raster.source}")
+    return _raster
+
+
+def lookup_boroughs(lats, lons) -> np.ndarray:
+    """Borough code (index into BOROUGH_NAMES) of every point"""
+    return get_borough_raster().lookup(lats, lons)
+
+
+def lookup_borough_names(lats, lons) -> np.ndarray:
+    """Borough name of every point"""
+    return get_borough_raster().lookup_names(lats, lons)
@@ -0,0 +1,209 @@
+# src/preprocessing/intersection_store.py
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Binary columnar store generated by scripts/enrich_intersections.py
+STORE_PATH = Path(os.getenv("INTERSECTION_STORE_PATH", DATA_DIR / "intersections_store"))
+
+# JSON output of scripts/enrich_intersections.py (the API used to read the copy under src/api/data)
+ENRICHED_JSON_PATHS = [
+    DATA_DIR / "intersections_enriched.json",
+    Path(__file__).parent.parent / "api" / "data" / "intersections_enriched.json",
+]
+
+# One .npy file per column so each can be memory-mapped on its own
+COLUMNS = {
+    "lat": np.float32,
+    "lon": np.float32,
+    "id": np.int32,
+    "borough": np.int8,
+}
+META_FILE = "meta.json"
+
+
+class IntersectionStore:
+    """
+    Read-only columnar view of the enriched intersection table.
+
+    Columns are NumPy arrays (memory-mapped when loaded from disk, so every
+    worker process shares the same pages). Boroughs are stored as int8 codes
+    into the `boroughs` tuple.
+    """
+
+    def __init__(self, lat, lon, ids, borough_codes, boroughs: Sequence[str]):
+        self.lat = lat
+        self.lon = lon
+        self.id = ids
+        self.borough_code = borough_codes
+        self.boroughs = tuple(boroughs)
+        self._samples = {}
+        self._sample_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.id)
+
+    def borough_names(self, positions=None) -> np.ndarray:
+        """Decode borough codes (optionally only at `positions`) to names"""
+        codes = self.borough_code if positions is None else self.borough_code[positions]
+        return np.asarray(self.boroughs, dtype=object)[codes]
+
+    def sample_positions(self, n: int, seed: int = 42) -> np.ndarray:
+        """
+        Row positions of a fixed random sample of `n` intersections.
+
+        Uses the same generator as DataFrame.sample(n, random_state=seed), and
+        is computed once per (n, seed) rather than on every request.
+        """
+        key = (n, seed)
+        positions = self._samples.get(key)
+        if positions is None:
+            with self._sample_lock:
+                positions = self._samples.get(key)
+                if positions is None:
+                    if n >= len(self):
+                        positions = np.arange(len(self))
+                    else:
+                        positions = np.random.RandomState(seed).choice(len(self), size=n, replace=False)
+                    positions.setflags(write=False)
+                    self._samples[key] = positions
+        return positions
+
+    def to_dataframe(self, positions=None) -> "pd.DataFrame":
+        """Materialise (a subset of) the store as a lat/lon/borough DataFrame"""
+        import pandas as pd
+
+        if positions is None:
+            positions = slice(None)
+        return pd.DataFrame({
+            "lat": self.lat[positions],
+            "lon": self.lon[positions],
+            "borough": self.borough_names(positions),
+            "nearest_intersection_id": self.id[positions],
+        })
+
+
+def write_intersection_store(path, ids, lats, lons, boroughs) -> Path:
+    """
+    Write intersections to a columnar store directory.
+
+    Args:
+        path: Destination directory (replaced atomically if it exists)
+        ids: Intersection ids
+        lats: Latitudes in degrees
+        lons: Longitudes in degrees
+        boroughs: Borough name per intersection
+
+    Returns:
+        Path of the written store
+    """
+    path = Path(path)
+    names, codes = np.unique(np.asarray(boroughs, dtype=str), return_inverse=True)
+    columns = {
+        "lat": np.asarray(lats),
+        "lon": np.asarray(lons),
+        "id": np.asarray(ids),
+        "borough": codes,
+    }
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=".intersections_store-", dir=path.parent))
+    try:
+        for name, dtype in COLUMNS.items():
+            np.save(tmp_dir / f"{name}.npy", columns[name].astype(dtype))
+        with open(tmp_dir / META_FILE, "w") as f:
+            json.dump({"count": int(len(codes)), "boroughs": names.tolist()}, f, indent=2)
+
+        if path.exists():
+            shutil.rmtree(path)
+        os.replace(tmp_dir, path)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return path
+
+
+def load_intersection_store(path) -> IntersectionStore:
+    """Memory-map a store directory written by write_intersection_store"""
+    path = Path(path)
+    with open(path / META_FILE) as f:
+        meta = json.load(f)
+    arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in COLUMNS}
+    return IntersectionStore(arrays["lat"], arrays["lon"], arrays["id"], arrays["borough"], meta["boroughs"])
+
+
+def _assign_nearest_borough(lats, lons) -> np.ndarray:
+    from src.preprocessing.borough_raster import lookup_borough_names
+    return lookup_borough_names(lats, lons)
+
+
+def _build_store() -> IntersectionStore:
+    # 1) preferred: the prebuilt binary store
+    if (STORE_PATH / META_FILE).exists():
+        store = load_intersection_store(STORE_PATH)
+        logger.info(f"Memory-mapped {len(store)} intersections from {STORE_PATH}")
+        return store
+
+    # 2) enriched JSON from scripts/enrich_intersections.py, kept in memory; the
+    #    store is only ever written by that script, never by a (possibly
+    #    multi-worker) server racing to create it
+    json_path: Optional[Path] = next((p for p in ENRICHED_JSON_PATHS if p.exists()), None)
+    if json_path is not None:
+        logger.warning(
+            f"Intersection store not found at {STORE_PATH}, loading {json_path} into memory "
+            "(run scripts/enrich_intersections.py to build the shared store)"
+        )
+        import pandas as pd
+        with open(json_path) as f:
+            enriched = pd.DataFrame(json.load(f))
+        ids = enriched["id"].to_numpy()
+        lats = enriched["lat"].to_numpy()
+        lons = enriched["lon"].to_numpy()
+        boroughs = enriched["nearest_borough"].to_numpy()
+    else:
+        # 3) raw intersections table (or its dev placeholder), kept in memory only
+        from src.preprocessing.intersections import intersections_df
+        logger.warning("Enriched intersections not found, building store from raw intersections")
+        ids = intersections_df["nearest_intersection_id"].to_numpy()
+        lats = intersections_df["lat"].to_numpy()
+        lons = intersections_df["lon"].to_numpy()
+        boroughs = _assign_nearest_borough(lats, lons)
+
+    names, codes = np.unique(np.asarray(boroughs, dtype=str), return_inverse=True)
+    return IntersectionStore(
+        np.asarray(lats, dtype=np.float32),
+        np.asarray(lons, dtype=np.float32),
+        np.asarray(ids, dtype=np.int32),
+        codes.astype(np.int8),
+        names.tolist(),
+    )
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_intersection_store() -> IntersectionStore:
+    """Returns the process-wide intersection store, loading it on first use"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = _build_store()
+    return _store
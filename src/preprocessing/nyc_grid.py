@@ -1,5 +1,17 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
 import numpy as np
-import pandas as pd
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Define bounding box for NYC coordinates
 NYC_BOUNDS = {
@@ -18,7 +30,27 @@ BOROUGH_CENTERS = {
     "Bronx": (40.837048, -73.865433)
 }
 
-def generate_nyc_grid(resolution=0.01):
+DEFAULT_RESOLUTION = 0.01
+# Grids kept in memory, least recently used evicted first
+GRID_CACHE_MAX_ENTRIES = int(os.getenv("NYC_GRID_CACHE_MAX_ENTRIES", "3"))
+# Directory for persisted grids; empty disables persistence
+GRID_CACHE_DIR = os.getenv("NYC_GRID_CACHE_DIR", "")
+
+
+def assign_boroughs(lats, lons) -> np.ndarray:
+    """
+    Borough code (position in BOROUGH_CENTERS) of every point, from the
+    shared borough raster.
+
+    Returns:
+        int8 array of borough codes
+    """
+    # imported here: the raster module reads NYC_BOUNDS / BOROUGH_CENTERS from this one
+    from src.preprocessing.borough_raster import lookup_boroughs
+    return lookup_boroughs(lats, lons)
+
+
+def generate_nyc_grid(resolution=DEFAULT_RESOLUTION):
     """
     Generate a grid of coordinates covering NYC with specified resolution.
 
@@ -26,7 +58,7 @@ def generate_nyc_grid(resolution=0.01):
         resolution: Distance between grid points in degrees (approx. 0.01° ≈ 1km)
 
     Returns:
-        DataFrame with columns lat, lon, borough
+        DataFrame with columns lat, lon, borough (categorical)
     """
     # Create the coordinate grid
     lat_grid = np.arange(NYC_BOUNDS["south"], NYC_BOUNDS["north"], resolution)
@@ -36,29 +68,83 @@ def generate_nyc_grid(resolution=0.01):
     lon_mesh, lat_mesh = np.meshgrid(lon_grid, lat_grid)
 
     # Flatten to 1D arrays
-    lats = lat_mesh.flatten()
-    lons = lon_mesh.flatten()
+    lats = lat_mesh.ravel()
+    lons = lon_mesh.ravel()
+
+    return _grid_frame(lats, lons, assign_boroughs(lats, lons))
+
 
-    # Create dataframe
-    grid_df = pd.DataFrame({
+def _grid_frame(lats, lons, codes) -> "pd.DataFrame":
+    import pandas as pd
+
+    # categorical boroughs: one int8 per point instead of a Python string
+    return pd.DataFrame({
         "lat": lats,
-        "lon": lons
+        "lon": lons,
+        "borough": pd.Categorical.from_codes(codes, categories=list(BOROUGH_CENTERS))
     })
 
-    # Assign each point to nearest borough
-    grid_df["borough"] = grid_df.apply(
-        lambda row: min(
-            BOROUGH_CENTERS.items(),
-            key=lambda x: (row["lat"] - x[1][0])**2 + (row["lon"] - x[1][1])**2
-        )[0],
-        axis=1
-    )
 
+def _grid_path(resolution) -> Path:
+    return Path(GRID_CACHE_DIR) / f"nyc_grid_{resolution:g}.npz"
+
+
+def _load_or_generate(resolution) -> "pd.DataFrame":
+    path = _grid_path(resolution) if GRID_CACHE_DIR else None
+    if path is not None and path.exists():
+        with np.load(path, allow_pickle=False) as saved:
+            if list(saved["boroughs"]) == list(BOROUGH_CENTERS):
+                logger.info(f"Loaded NYC grid at {resolution}° from {path}")
+                return _grid_frame(saved["lat"], saved["lon"], saved["borough"])
+        logger.warning(f"Ignoring {path}: borough list changed")
+
+    grid_df = generate_nyc_grid(resolution)
+    logger.info(f"Generated NYC grid at {resolution}°: {len(grid_df)} points")
+
+    if path is not None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write then rename so a crash never leaves a truncated file behind
+            tmp = path.with_suffix(".tmp.npz")
+            np.savez(
+                tmp,
+                lat=grid_df["lat"].to_numpy(),
+                lon=grid_df["lon"].to_numpy(),
+                borough=grid_df["borough"].cat.codes.to_numpy(),
+                boroughs=np.array(list(BOROUGH_CENTERS))
+            )
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not persist NYC grid to {path}: {e}")
     return grid_df
 
-# Generate grid with default resolution
-nyc_grid = generate_nyc_grid()
 
-def get_nyc_grid():
-    """Returns the NYC coordinate grid"""
-    return nyc_grid
\ No newline at end of file
+_grids: "OrderedDict[float, pd.DataFrame]" = OrderedDict()
+_grids_lock = threading.Lock()
+
+
+def get_nyc_grid(resolution=DEFAULT_RESOLUTION):
+    """Returns the NYC coordinate grid, generated on first use and cached per resolution"""
+    resolution = float(resolution)
+    with _grids_lock:
+        grid_df = _grids.get(resolution)
+        if grid_df is None:
+            grid_df = _load_or_generate(resolution)
+            _grids[resolution] = grid_df
+        _grids.move_to_end(resolution)
+        while len(_grids) > GRID_CACHE_MAX_ENTRIES:
+            evicted, _ = _grids.popitem(last=False)
+            logger.info(f"Evicted NYC grid at {evicted}° from memory")
+        return grid_df
+
+
+def clear_grid_cache():
+    with _grids_lock:
+        _grids.clear()
+
+
+def __getattr__(name):
+    # `nyc_grid` used to be built at import time; keep it importable, but lazy
+    if name == "nyc_grid":
+        return get_nyc_grid()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,172 @@
+# src/preprocessing/spatial_index.py
+
+import threading
+import logging
+import numpy as np
+from src.preprocessing.geo import EARTH_RADIUS_KM
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def to_unit_vectors(lats, lons) -> np.ndarray:
+    """
+    Convert lat/lon degrees to points on the unit sphere.
+
+    Straight-line (chord) distance between unit vectors grows monotonically
+    with great-circle distance, so a KD-tree over them returns exactly the
+    same nearest neighbour as a great_circle scan.
+
+    Returns:
+        (n, 3) float64 array of x/y/z coordinates
+    """
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Convert unit-sphere chord lengths to great-circle distances in km"""
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2.0, 0.0, 1.0))
+
+
+class IntersectionIndex:
+    """
+    KD-tree over intersection coordinates on the unit sphere.
+
+    Built once, then answers nearest-intersection lookups for whole
+    arrays of points in a single vectorized call.
+    """
+
+    def __init__(self, lats, lons, ids, leaf_size: int = 40):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.ids = np.asarray(ids)
+        if not (len(self.lats) == len(self.lons) == len(self.ids)):
+            raise ValueError("lats, lons and ids must have the same length")
+        if len(self.ids) == 0:
+            raise ValueError("Cannot build an index over zero intersections")
+        # sklearn is a heavy import, only paid when an index is actually built
+        from sklearn.neighbors import KDTree
+        self._tree = KDTree(to_unit_vectors(self.lats, self.lons), leaf_size=leaf_size)
+
+    @classmethod
+    def from_dataframe(cls, df, id_column: str = "nearest_intersection_id"):
+        """Build the index from a DataFrame with lat, lon and id columns"""
+        return cls(df["lat"].to_numpy(), df["lon"].to_numpy(), df[id_column].to_numpy())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def query_positions(self, lats, lons):
+        """
+        Find the row position of the nearest intersection for each point.
+
+        Returns:
+            Tuple of (positions, distances_km), both 1-D arrays of len(lats)
+        """
+        points = to_unit_vectors(np.atleast_1d(lats), np.atleast_1d(lons))
+        if len(points) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+        dist, pos = self._tree.query(points, k=1)
+        return pos[:, 0], chord_to_km(dist[:, 0])
+
+    def query(self, lats, lons, return_distance: bool = False):
+        """
+        Map each lat/lon pair to the id of its nearest intersection.
+
+        Args:
+            lats: Array-like of latitudes in degrees
+            lons: Array-like of longitudes in degrees
+            return_distance: Also return the distance to each match in km
+
+        Returns:
+            Array of intersection ids (and distances in km if requested)
+        """
+        pos, dist = self.query_positions(lats, lons)
+        if return_distance:
+            return self.ids[pos], dist
+        return self.ids[pos]
+
+
+class GridIndex:
+    """
+    Uniform lat/lon bucket grid for bounding-box queries.
+
+    Point positions are sorted by grid cell with CSR-style offsets, so a
+    viewport query only touches the cells it overlaps (one contiguous slice
+    per row of cells) before an exact bounds filter.
+    """
+
+    def __init__(self, lats, lons, cell_deg: float = 0.005):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_deg = cell_deg
+        self.south = float(self.lats.min()) if len(self.lats) else 0.0
+        self.west = float(self.lons.min()) if len(self.lons) else 0.0
+        self.n_rows = int((self.lats.max() - self.south) // cell_deg) + 1 if len(self.lats) else 1
+        self.n_cols = int((self.lons.max() - self.west) // cell_deg) + 1 if len(self.lons) else 1
+
+        cells = self._rows(self.lats) * self.n_cols + self._cols(self.lons)
+        self.order = np.argsort(cells, kind="stable")
+        # offsets[c]:offsets[c + 1] is the slice of `order` in cell c
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(cells, minlength=self.n_rows * self.n_cols))))
+
+    def __len__(self):
+        return len(self.order)
+
+    def _rows(self, lats):
+        return np.clip(((lats - self.south) // self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+
+    def _cols(self, lons):
+        return np.clip(((lons - self.west) // self.cell_deg).astype(np.int64), 0, self.n_cols - 1)
+
+    def query_bbox(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Positions of all points inside the bounding box (inclusive), in ascending order"""
+        if len(self) == 0 or north < south or east < west:
+            return np.empty(0, dtype=np.intp)
+        r0, r1 = self._rows(np.array([south, north]))
+        c0, c1 = self._cols(np.array([west, east]))
+        candidates = np.concatenate([
+            self.order[self.offsets[r * self.n_cols + c0]:self.offsets[r * self.n_cols + c1 + 1]]
+            for r in range(r0, r1 + 1)
+        ])
+        lats, lons = self.lats[candidates], self.lons[candidates]
+        inside = (lats >= south) & (lats <= north) & (lons >= west) & (lons <= east)
+        return np.sort(candidates[inside])
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_intersection_index() -> IntersectionIndex:
+    """Returns the process-wide intersection index, building it on first use"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from src.preprocessing.intersection_store import get_intersection_store
+                store = get_intersection_store()
+                _index = IntersectionIndex(store.lat, store.lon, store.id)
+                logger.info(f"Built intersection index over {len(_index)} intersections")
+    return _index
+
+
+_grid_index = None
+_grid_index_lock = threading.Lock()
+
+
+def get_grid_index() -> GridIndex:
+    """Returns the process-wide bounding-box index over the intersection store"""
+    global _grid_index
+    if _grid_index is None:
+        with _grid_index_lock:
+            if _grid_index is None:
+                from src.preprocessing.intersection_store import get_intersection_store
+                store = get_intersection_store()
+                _grid_index = GridIndex(store.lat, store.lon)
+                logger.info(f"Built grid index over {len(_grid_index)} intersections")
+    return _grid_index
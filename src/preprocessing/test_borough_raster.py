@@ -0,0 +1,37 @@
+import numpy as np
+from src.preprocessing.borough_raster import BOROUGH_NAMES, BoroughRaster, nearest_centroid_codes
+
+
+def test_centroid_raster_matches_nearest_centroid():
+    raster = BoroughRaster.from_centroids(resolution=0.001)
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(40.50, 40.91, 20000)
+    lons = rng.uniform(-74.25, -73.70, 20000)
+
+    agree = raster.lookup(lats, lons) == nearest_centroid_codes(lats, lons)
+    # only points within a cell of a Voronoi edge may differ
+    assert agree.mean() > 0.99
+
+    # cell centres are exact
+    rows = np.floor((lats - raster.south) / raster.resolution)
+    cols = np.floor((lons - raster.west) / raster.resolution)
+    centre_lats = raster.south + (rows + 0.5) * raster.resolution
+    centre_lons = raster.west + (cols + 0.5) * raster.resolution
+    assert np.array_equal(raster.lookup(centre_lats, centre_lons), nearest_centroid_codes(centre_lats, centre_lons))
+
+
+def test_points_outside_raster_use_nearest_centroid():
+    raster = BoroughRaster.from_centroids(resolution=0.01)
+    lats, lons = np.array([42.0, 39.0]), np.array([-73.9, -74.2])
+    assert np.array_equal(raster.lookup(lats, lons), nearest_centroid_codes(lats, lons))
+
+
+def test_polygon_raster_with_hole():
+    # a square "Staten Island" with a square hole, placed over Manhattan's centroid
+    outer = np.array([[-74.00, 40.75], [-73.94, 40.75], [-73.94, 40.80], [-74.00, 40.80]])
+    hole = np.array([[-73.98, 40.77], [-73.96, 40.77], [-73.96, 40.78], [-73.98, 40.78]])
+    raster = BoroughRaster.from_polygons({"Staten Island": [[outer, hole]]}, resolution=0.001)
+
+    names = np.asarray(BOROUGH_NAMES)[raster.lookup([40.76, 40.775, 40.60], [-73.99, -73.97, -74.15])]
+    assert names.tolist() == ["Staten Island", "Manhattan", "Staten Island"]
+    assert raster.source == "polygons"
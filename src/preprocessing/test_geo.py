@@ -0,0 +1,39 @@
+import numpy as np
+from geopy.distance import great_circle
+from src.preprocessing.geo import equirectangular_km, haversine_km, nearest, pairwise_km
+
+
+def random_points(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.uniform(40.50, 40.91, n), rng.uniform(-74.25, -73.70, n)
+
+
+def test_haversine_matches_geopy():
+    lats, lons = random_points(200, 0)
+    expected = [great_circle((lats[0], lons[0]), (a, b)).km for a, b in zip(lats, lons)]
+    assert np.allclose(haversine_km(lats[0], lons[0], lats, lons), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_equirectangular_close_at_city_scale():
+    lats, lons = random_points(200, 1)
+    exact = haversine_km(lats[0], lons[0], lats, lons)
+    approx = equirectangular_km(lats[0], lons[0], lats, lons)
+    assert np.allclose(approx, exact, rtol=1e-3, atol=1e-6)
+
+
+def test_pairwise_broadcasts():
+    lats, lons = random_points(7, 2)
+    t_lats, t_lons = random_points(3, 3)
+    d = pairwise_km(lats, lons, t_lats, t_lons)
+    assert d.shape == (7, 3)
+    assert np.isclose(d[4, 2], haversine_km(lats[4], lons[4], t_lats[2], t_lons[2]))
+
+
+def test_nearest_is_independent_of_chunk_size():
+    lats, lons = random_points(1000, 4)
+    t_lats, t_lons = random_points(50, 5)
+    idx, dist = nearest(lats, lons, t_lats, t_lons, chunk_size=10_000)
+    idx_small, dist_small = nearest(lats, lons, t_lats, t_lons, chunk_size=64)
+    assert np.array_equal(idx, idx_small)
+    assert np.array_equal(dist, dist_small)
+    assert np.allclose(dist, pairwise_km(lats, lons, t_lats, t_lons).min(axis=1))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from src.preprocessing import intersection_store
+from src.preprocessing.intersection_store import (
+    load_intersection_store,
+    write_intersection_store,
+)
+
+
+def make_enriched(n=1200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "id": np.arange(n) + 10,
+        "lat": rng.uniform(40.50, 40.91, n),
+        "lon": rng.uniform(-74.25, -73.70, n),
+        "nearest_borough": rng.choice(["Bronx", "Brooklyn", "Manhattan", "Queens", "Staten Island"], n),
+    })
+
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    enriched = make_enriched()
+    write_intersection_store(tmp_path / "store", enriched["id"], enriched["lat"],
+                             enriched["lon"], enriched["nearest_borough"])
+
+    store = load_intersection_store(tmp_path / "store")
+    assert len(store) == len(enriched)
+    assert isinstance(store.lat, np.memmap)
+    assert store.lat.dtype == np.float32 and store.id.dtype == np.int32
+    assert np.array_equal(store.id, enriched["id"])
+    assert np.allclose(store.lat, enriched["lat"], atol=1e-5)
+    assert list(store.borough_names()) == list(enriched["nearest_borough"])
+
+
+def test_sample_matches_dataframe_sample(tmp_path):
+    enriched = make_enriched()
+    write_intersection_store(tmp_path / "store", enriched["id"], enriched["lat"],
+                             enriched["lon"], enriched["nearest_borough"])
+    store = load_intersection_store(tmp_path / "store")
+
+    expected = enriched.sample(n=500, random_state=42)
+    sampled = store.to_dataframe(store.sample_positions(500, seed=42))
+    assert list(sampled["nearest_intersection_id"]) == list(expected["id"])
+    assert list(sampled["borough"]) == list(expected["nearest_borough"])
+    # cached, not re-sampled
+    assert store.sample_positions(500, seed=42) is store.sample_positions(500, seed=42)
+
+
+def test_enriched_json_is_loaded_without_writing_a_store(tmp_path, monkeypatch):
+    enriched = make_enriched(n=50)
+    enriched.to_json(tmp_path / "enriched.json", orient="records")
+    monkeypatch.setattr(intersection_store, "STORE_PATH", tmp_path / "store")
+    monkeypatch.setattr(intersection_store, "ENRICHED_JSON_PATHS", [tmp_path / "enriched.json"])
+
+    store = intersection_store._build_store()
+    assert len(store) == 50
+    assert list(store.borough_names()) == list(enriched["nearest_borough"])
+    # only scripts/enrich_intersections.py writes the store
+    assert not (tmp_path / "store").exists()
@@ -0,0 +1,35 @@
+from src.preprocessing import nyc_grid
+from src.preprocessing.nyc_grid import BOROUGH_CENTERS, generate_nyc_grid, get_nyc_grid
+from src.preprocessing.borough_raster import lookup_borough_names
+
+
+def test_grid_boroughs_come_from_shared_raster():
+    grid_df = generate_nyc_grid(0.02)
+    expected = lookup_borough_names(grid_df["lat"].to_numpy(), grid_df["lon"].to_numpy())
+    assert grid_df["borough"].astype(str).tolist() == expected.tolist()
+    assert list(grid_df["borough"].cat.categories) == list(BOROUGH_CENTERS)
+
+
+def test_grid_cached_per_resolution_with_eviction(monkeypatch):
+    monkeypatch.setattr(nyc_grid, "GRID_CACHE_MAX_ENTRIES", 2)
+    nyc_grid.clear_grid_cache()
+    coarse = get_nyc_grid(0.05)
+    assert get_nyc_grid(0.05) is coarse
+    get_nyc_grid(0.04)
+    get_nyc_grid(0.03)
+    assert list(nyc_grid._grids) == [0.04, 0.03]
+    assert get_nyc_grid(0.05) is not coarse
+    nyc_grid.clear_grid_cache()
+
+
+def test_grid_persisted_to_disk(monkeypatch, tmp_path):
+    monkeypatch.setattr(nyc_grid, "GRID_CACHE_DIR", str(tmp_path))
+    nyc_grid.clear_grid_cache()
+    generated = get_nyc_grid(0.05)
+    assert (tmp_path / "nyc_grid_0.05.npz").exists()
+
+    nyc_grid.clear_grid_cache()
+    loaded = get_nyc_grid(0.05)
+    assert loaded is not generated
+    assert loaded.equals(generated)
+    nyc_grid.clear_grid_cache()
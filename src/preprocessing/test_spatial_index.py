@@ -0,0 +1,53 @@
+import numpy as np
+from src.preprocessing.geo import haversine_km
+from src.preprocessing.spatial_index import GridIndex, IntersectionIndex
+
+
+def make_intersections(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(40.50, 40.91, n)
+    lons = rng.uniform(-74.25, -73.70, n)
+    ids = np.arange(n) + 1000
+    return lats, lons, ids
+
+
+def test_matches_great_circle_brute_force():
+    lats, lons, ids = make_intersections()
+    index = IntersectionIndex(lats, lons, ids)
+
+    rng = np.random.default_rng(1)
+    q_lats = rng.uniform(40.50, 40.91, 50)
+    q_lons = rng.uniform(-74.25, -73.70, 50)
+
+    found = index.query(q_lats, q_lons)
+    for lat, lon, got in zip(q_lats, q_lons, found):
+        assert got == ids[int(np.argmin(haversine_km(lat, lon, lats, lons)))]
+
+
+def test_query_returns_distances():
+    lats, lons, ids = make_intersections(n=10)
+    index = IntersectionIndex(lats, lons, ids)
+
+    found, dist = index.query(lats, lons, return_distance=True)
+    assert np.array_equal(found, ids)
+    assert np.allclose(dist, 0.0)
+
+
+def test_empty_query():
+    lats, lons, ids = make_intersections(n=10)
+    index = IntersectionIndex(lats, lons, ids)
+    assert len(index.query([], [])) == 0
+
+
+def test_grid_index_bbox_matches_brute_force():
+    lats, lons, _ = make_intersections(n=5000)
+    index = GridIndex(lats, lons, cell_deg=0.01)
+
+    for south, west, north, east in [
+        (40.60, -74.10, 40.70, -73.90),
+        (40.00, -75.00, 41.50, -73.00),  # covers everything
+        (40.70, -73.95, 40.70001, -73.94),  # thinner than a cell
+        (41.00, -73.00, 41.10, -72.90),  # outside the data
+    ]:
+        expected = np.flatnonzero((lats >= south) & (lats <= north) & (lons >= west) & (lons <= east))
+        assert np.array_equal(index.query_bbox(south, west, north, east), expected)
@@ -1,38 +1,182 @@
 from flask import Flask, render_template, request, jsonify
 import folium
+from folium.plugins import FastMarkerCluster
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import requests
+import threading
+import time
 import json
+import os
 
 app = Flask(__name__)
 
 # Configuration
-API_URL = "http://localhost:8000/accident-prediction"  # Update this with your actual API URL
+API_URL = os.getenv("API_URL", "http://localhost:8000/api/accident-prediction")
+# "markers" draws one marker per prediction; "tiles" (opt-in) overlays server-rendered
+# heatmap tiles that the browser fetches from the API directly
+MAP_MODE = os.getenv("MAP_MODE", "markers")
+# Tile endpoint as seen from the browser
+TILE_URL = os.getenv("TILE_URL", "http://localhost:8000/api/accident-prediction/tiles/{z}/{x}/{y}.png")
+
+# Upstream API connection settings
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", "3"))
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", "30"))
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", "10"))
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "2"))
+# Predictions and rendered maps are reused for this long per (hour, mode)
+MAP_CACHE_TTL_SECONDS = float(os.getenv("MAP_CACHE_TTL_SECONDS", "300"))
+MAP_CACHE_MAX_ENTRIES = int(os.getenv("MAP_CACHE_MAX_ENTRIES", "64"))
+
+# Columnar JSON: parallel arrays instead of one object per prediction
+COLUMNAR_JSON = "application/vnd.nyc-risk.columnar+json"
+
+# Draws each clustered point as a circle coloured like the old per-point markers
+MARKER_CALLBACK = """
+function (row) {
+    var prob = row[2];
+    var color = prob > 0.7 ? 'red' : prob > 0.3 ? 'orange' : 'green';
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {radius: 8, color: color, fill: true});
+    marker.bindPopup('Probability: ' + prob.toFixed(2));
+    marker.bindTooltip('Crash Probability: ' + prob.toFixed(2));
+    return marker;
+};
+"""
+
+
+def create_session():
+    """One pooled keep-alive session shared by all requests, retrying idempotent failures"""
+    session = requests.Session()
+    retry = Retry(
+        total=API_MAX_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=None  # the prediction POST is safe to repeat
+    )
+    adapter = HTTPAdapter(pool_connections=API_POOL_SIZE, pool_maxsize=API_POOL_SIZE, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+session = create_session()
+
+
+class TTLCache:
+    """
+    Small thread-safe TTL + LRU cache. Concurrent misses for the same key
+    wait for a single load instead of all calling the API.
+    """
+
+    def __init__(self, ttl, max_entries, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get_or_load(self, key, load):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[1] < self.ttl:
+                # re-insert to keep LRU order
+                self._entries[key] = self._entries.pop(key)
+                return entry[0]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # another thread may have loaded it while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and self._clock() - entry[1] < self.ttl:
+                    return entry[0]
+            try:
+                value = load()
+                with self._lock:
+                    self._entries.pop(key, None)
+                    self._entries[key] = (value, self._clock())
+                    while len(self._entries) > self.max_entries:
+                        del self._entries[next(iter(self._entries))]
+            finally:
+                # drop the per-key lock even if load() raised, or failing keys pile up
+                with self._lock:
+                    self._key_locks.pop(key, None)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prediction_cache = TTLCache(MAP_CACHE_TTL_SECONDS, MAP_CACHE_MAX_ENTRIES)
+map_cache = TTLCache(MAP_CACHE_TTL_SECONDS, MAP_CACHE_MAX_ENTRIES)
+
+
+def round_to_hour(dt):
+    # The model only sees the hour, so every minute within it shares one map
+    return dt.replace(minute=0, second=0, microsecond=0)
+
+
+def fetch_predictions(formatted_datetime):
+    """Predictions for one timestamp as parallel lat/lon/prob arrays"""
+    def load():
+        response = session.post(
+            API_URL,
+            json={'date': formatted_datetime},
+            headers={'Accept': f'{COLUMNAR_JSON}, application/json;q=0.5'},
+            timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+        )
+        response.raise_for_status()
+        data = response.json()
+        if 'predictions' in data:
+            # API without columnar support
+            points = data['predictions']
+            return {
+                'lat': [p['lat'] for p in points],
+                'lon': [p['lon'] for p in points],
+                'prob': [p['probability'] for p in points],
+            }
+        return data
+
+    return prediction_cache.get_or_load(formatted_datetime, load)
+
 
 def create_map(accident_data):
     # Create a map centered on Manhattan
     m = folium.Map(location=[40.7831, -73.9712], zoom_start=12)
 
-    # Add accident probability markers
-    for point in accident_data:
-        lat = point['lat']
-        lon = point['lon']
-        prob = point['probability']
+    # All markers go through one clustered layer built client-side from the raw rows
+    rows = [[lat, lon, prob] for lat, lon, prob in zip(accident_data['lat'], accident_data['lon'], accident_data['prob'])]
+    FastMarkerCluster(rows, callback=MARKER_CALLBACK, name="Crash probability").add_to(m)
 
-        # Color based on probability (red = high, yellow = medium, green = low)
-        color = 'red' if prob > 0.7 else 'orange' if prob > 0.3 else 'green'
+    return m._repr_html_()
+
+def create_tile_map(formatted_datetime):
+    # Same base map, with the risk heatmap tiles fetched by the browser from the API
+    m = folium.Map(location=[40.7831, -73.9712], zoom_start=12)
 
-        folium.CircleMarker(
-            location=[lat, lon],
-            radius=8,
-            color=color,
-            fill=True,
-            popup=f'Probability: {prob:.2f}',
-            tooltip=f'Crash Probability: {prob:.2f}'
-        ).add_to(m)
+    folium.TileLayer(
+        tiles=f"{TILE_URL}?date={formatted_datetime}",
+        attr="NYC crash risk",
+        name="Crash probability",
+        overlay=True,
+        opacity=0.8,
+        max_zoom=18
+    ).add_to(m)
 
     return m._repr_html_()
 
+def get_map_html(formatted_datetime):
+    """Rendered map HTML for one (rounded) timestamp, cached per mode"""
+    if MAP_MODE == "tiles":
+        # No predictions pass through the webapp; the map only references tile URLs
+        return map_cache.get_or_load(("tiles", formatted_datetime), lambda: create_tile_map(formatted_datetime))
+    return map_cache.get_or_load(
+        ("markers", formatted_datetime), lambda: create_map(fetch_predictions(formatted_datetime))
+    )
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
@@ -47,19 +191,10 @@ def index():
         selected_datetime = datetime.now()
 
     # Format datetime for API request
-    formatted_datetime = selected_datetime.strftime('%Y-%m-%dT%H:%M:%S')
+    formatted_datetime = round_to_hour(selected_datetime).strftime('%Y-%m-%dT%H:%M:%S')
 
     try:
-        # Make API request
-        response = requests.post(
-            API_URL,
-            json={'date': formatted_datetime}
-        )
-        response.raise_for_status()
-        accident_data = response.json()
-
-        # Create map
-        map_html = create_map(accident_data['predictions'])
+        map_html = get_map_html(formatted_datetime)
 
         return render_template('index.html',
                              map_html=map_html,
@@ -71,4 +206,4 @@ def index():
                              selected_datetime=selected_datetime.strftime('%Y-%m-%dT%H:%M'))
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)